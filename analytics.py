@@ -0,0 +1,175 @@
+"""Cross-resume, cross-ARM agreement analytics over a resumes x ARMs x criteria score tensor"""
+
+import warnings
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from resume_analyzer import DEFAULT_RUBRIC
+from session_records import ARM_NAMES
+
+CRITERIA = [r['criterion'] for r in DEFAULT_RUBRIC]
+SCORE_BINS = np.arange(1, 6)  # criterion scores are on a 1-5 scale
+REFERENCE_ARM = 'SYSTEM_2'  # criterion drift is measured against ARM B's scores
+INITIAL_CAPACITY = 64
+
+
+def pairwise_correlation(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Pearson correlation between columns over the rows where both are present, and those row counts"""
+    present = ~np.isnan(values)
+    mask = present.astype(float)
+    filled = np.where(present, values, 0.0)
+    counts = mask.T @ mask
+    sums = filled.T @ mask            # sums[i, j]: column i over rows where j is present
+    squares = (filled ** 2).T @ mask
+    products = filled.T @ filled
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_i = sums / counts
+        mean_j = sums.T / counts
+        cov = products / counts - mean_i * mean_j
+        var_i = squares / counts - mean_i ** 2
+        var_j = squares.T / counts - mean_j ** 2
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[counts < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0), counts
+
+
+def pairwise_kappa(decisions: np.ndarray) -> np.ndarray:
+    """Cohen's kappa between columns of binary decisions (-1 = unknown)"""
+    known = (decisions >= 0).astype(float)
+    yes = (decisions == 1).astype(float)
+    no = known - yes
+    counts = known.T @ known
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observed = (yes.T @ yes + no.T @ no) / counts
+        yes_i = (yes.T @ known) / counts
+        yes_j = yes_i.T
+        expected = yes_i * yes_j + (1 - yes_i) * (1 - yes_j)
+        kappa = (observed - expected) / (1 - expected)
+    # Both raters constant and identical: perfect agreement
+    kappa[(expected == 1) & (observed == 1)] = 1.0
+    kappa[counts == 0] = np.nan
+    return kappa
+
+
+class AgreementAnalytics:
+    """Score tensor updated one evaluation at a time; the report is recomputed only after changes"""
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._rows: Dict[str, int] = {}
+        self._free = []
+        self.fit = np.full((capacity, len(ARM_NAMES)), np.nan)
+        self.shortlist = np.full((capacity, len(ARM_NAMES)), -1, dtype=np.int8)
+        self.criteria = np.full((capacity, len(ARM_NAMES), len(CRITERIA)), np.nan)
+        self.version = 0
+        self._report = None
+        self._report_version = -1
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _row(self, resume_id: str) -> int:
+        row = self._rows.get(resume_id)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = len(self._rows)
+            if row >= len(self.fit):
+                self._grow()
+        self._rows[resume_id] = row
+        return row
+
+    def _grow(self):
+        extra = len(self.fit)
+        self.fit = np.concatenate([self.fit, np.full((extra, len(ARM_NAMES)), np.nan)])
+        self.shortlist = np.concatenate([self.shortlist, np.full((extra, len(ARM_NAMES)), -1, dtype=np.int8)])
+        self.criteria = np.concatenate([self.criteria, np.full((extra, len(ARM_NAMES), len(CRITERIA)), np.nan)])
+
+    def update(self, resume_id: str, arm_name: str, fit_score: Optional[float], shortlist: Optional[bool] = None,
+               criterion_scores: Optional[Dict[str, float]] = None):
+        """Record one ARM evaluation of one resume"""
+        row, arm = self._row(resume_id), ARM_NAMES.index(arm_name)
+        self.fit[row, arm] = fit_score if isinstance(fit_score, (int, float)) else np.nan
+        self.shortlist[row, arm] = -1 if shortlist is None else int(bool(shortlist))
+        self.criteria[row, arm] = np.nan
+        for col, criterion in enumerate(CRITERIA):
+            score = (criterion_scores or {}).get(criterion)
+            if isinstance(score, (int, float)):
+                self.criteria[row, arm, col] = score
+        self.version += 1
+
+    def update_from_result(self, resume_id: str, arm_name: str, result: Dict):
+        """Record an evaluation from a full ARM result"""
+        evaluation = result if arm_name == 'SYSTEM_1' else result.get('evaluation', {})
+        self.update(
+            resume_id, arm_name, evaluation.get('fit_score_1_to_5'), evaluation.get('shortlist_recommend'),
+            {s.get('criterion'): s.get('score') for s in evaluation.get('scores') or []}
+        )
+
+    def update_many(self, evaluations: Iterable[Tuple[str, str, Dict]]):
+        """Record (resume_id, arm_name, result) evaluations in bulk"""
+        for resume_id, arm_name, result in evaluations:
+            self.update_from_result(resume_id, arm_name, result)
+
+    def remove(self, resume_id: str):
+        row = self._rows.pop(resume_id, None)
+        if row is None:
+            return
+        self.fit[row] = np.nan
+        self.shortlist[row] = -1
+        self.criteria[row] = np.nan
+        self._free.append(row)
+        self.version += 1
+
+    def report(self) -> Dict:
+        """Agreement, distribution and drift statistics, cached until the next update"""
+        if self._report_version != self.version:
+            self._report = self._compute()
+            self._report_version = self.version
+        return self._report
+
+    def _compute(self) -> Dict:
+        rows = np.fromiter(self._rows.values(), dtype=int, count=len(self._rows))
+        fit, decisions, criteria = self.fit[rows], self.shortlist[rows], self.criteria[rows]
+
+        correlation, pair_counts = pairwise_correlation(fit)
+        kappa = pairwise_kappa(decisions)
+        reference = ARM_NAMES.index(REFERENCE_ARM)
+
+        with warnings.catch_warnings():
+            # Columns with no scores yet warn and yield NaN, which is what we want
+            warnings.simplefilter('ignore', RuntimeWarning)
+            present = ~np.isnan(fit)
+            filled = np.where(present, fit, 0.0)
+            common = present.T.astype(float) @ present.astype(float)
+            sums = filled.T @ present.astype(float)
+            # drift[i, j]: mean of (ARM j - ARM i) over resumes scored by both
+            drift = (sums.T - sums) / common
+
+            rounded = np.clip(np.rint(criteria), SCORE_BINS[0], SCORE_BINS[-1])
+            histogram = (rounded[..., None] == SCORE_BINS).sum(axis=0)
+            percentiles = np.nanpercentile(criteria, [25, 50, 75], axis=0)
+            criterion_stats = {
+                'count': (~np.isnan(criteria)).sum(axis=0),
+                'mean': np.nanmean(criteria, axis=0),
+                'std': np.nanstd(criteria, axis=0),
+                'p25': percentiles[0],
+                'p50': percentiles[1],
+                'p75': percentiles[2],
+                'histogram': histogram,
+            }
+            criterion_drift = np.nanmean(criteria - criteria[:, reference:reference + 1, :], axis=0)
+
+        return {
+            'resumes': len(rows),
+            'arms': list(ARM_NAMES),
+            'criteria': list(CRITERIA),
+            'correlation': correlation,
+            'kappa': kappa,
+            'pair_counts': pair_counts.astype(int),
+            'drift': drift,
+            'criterion_stats': criterion_stats,
+            'criterion_drift': criterion_drift,
+        }
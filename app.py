@@ -1,56 +1,66 @@
 import streamlit as st
-import google.generativeai as genai
-import json
-import io
-import os
+import functools
+import tempfile
+import time
+import uuid
+from collections import deque
 from dotenv import load_dotenv
-from enum import Enum
-import pandas as pd
-
-try:
-    import pdfplumber
-except ImportError:
-    st.error("pdfplumber not installed. Please install with: pip install pdfplumber")
-    st.stop()
-
-try:
-    from docx import Document
-except ImportError:
-    st.error("python-docx not installed. Please install with: pip install python-docx")
-    st.stop()
+from telemetry import telemetry
 
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+# pandas, the Gemini SDK and the PDF/DOCX libraries are imported on first use
+# (first table or chart, first analysis, first upload) to keep first paint fast.
+
+from resume_analyzer import (
+    EvaluationArm,
+    ResumeProcessor,
+    get_fit_score,
+    get_shortlist_recommend,
+    job_description_hash,
+    resume_content_hash,
+    validate_inputs,
+)
+from result_store import get_default_store
+from rendering import build_result_html
+from exporter import EXPORT_FORMATS, build_candidate_report, export
+from session_records import ALL_ARMS_MASK, ARM_LABELS, ARM_NAMES, ResumeRecord
+from job_queue import ArmOutcome, EvaluationJob, job_queue
+from shared_cache import shared_cache
+from dedup import duplicate_index
+from search_index import QuerySyntaxError, SearchIndex
+from tracing import PROFILE_MODES, tracer, waterfall_html
+
 # Load environment variables
 load_dotenv()
 
-class EvaluationArm(Enum):
-    SYSTEM_1 = "ARM A: Fast Intuitive Evaluation"
-    SYSTEM_2 = "ARM B: Deliberative Rubric-First"
-    SYSTEM_2_PERSONA = "ARM C: Compliance Officer"
-    SYSTEM_2_PERSONA_DEBIAS = "ARM D: Compliance + Debias"
+SECTION_TIMINGS_KEPT = 100
+TRACES_SHOWN = 5
+JOB_POLL_SECONDS = 2
+FINISHED_JOBS_SHOWN = 5
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024  # exports larger than this spill to a temporary file
 
 # Initialize session state for multi-resume support
 def initialize_session_state():
     """Initialize session state for multi-resume functionality"""
     if 'resumes' not in st.session_state:
-        st.session_state.resumes = {
-            'resume_1': {
-                'text': '',
-                'label': 'Resume 1',
-                'file_name': '',
-                'completed_arms': set(),
-                'arm_scores': {},
-                'analysis_results': {}
-            }
-        }
+        st.session_state.resumes = {'resume_1': ResumeRecord('Resume 1')}
     
     if 'active_resume' not in st.session_state:
         st.session_state.active_resume = 'resume_1'
+
+    if 'trace_owner' not in st.session_state:
+        st.session_state.trace_owner = uuid.uuid4().hex[:12]
     
     if 'resume_counter' not in st.session_state:
         st.session_state.resume_counter = 1
+
+    # Background evaluation jobs submitted by this session
+    if 'job_ids' not in st.session_state:
+        st.session_state.job_ids = []
+    if 'jobs_seen_finished' not in st.session_state:
+        st.session_state.jobs_seen_finished = set()
     
     # Legacy state for backward compatibility (remove after migration)
     if 'current_arm' not in st.session_state:
@@ -70,67 +80,223 @@ def get_available_arms(resume_id: str = None):
     if resume_id is None:
         resume_id = st.session_state.active_resume
     
-    # Get the specific resume's completed arms
-    resume_data = st.session_state.resumes.get(resume_id, {})
-    completed_arms = resume_data.get('completed_arms', set())
-    
-    if not completed_arms:
-        return [EvaluationArm.SYSTEM_1]
-    if EvaluationArm.SYSTEM_1.name in completed_arms and EvaluationArm.SYSTEM_2.name not in completed_arms:
-        return [EvaluationArm.SYSTEM_2]
-    if EvaluationArm.SYSTEM_2.name in completed_arms and EvaluationArm.SYSTEM_2_PERSONA.name not in completed_arms:
-        return [EvaluationArm.SYSTEM_2_PERSONA]
-    if EvaluationArm.SYSTEM_2_PERSONA.name in completed_arms and EvaluationArm.SYSTEM_2_PERSONA_DEBIAS.name not in completed_arms:
-        return [EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]
-    # After all complete, stay on ARM D
-    return [EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]
+    # Get the specific resume's next ARM; after all complete, stay on ARM D
+    next_arm = st.session_state.resumes[resume_id].next_arm()
+    return [EvaluationArm[next_arm] if next_arm else EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]
 
 def add_new_resume():
     """Add a new resume slot"""
     st.session_state.resume_counter += 1
     new_resume_id = f'resume_{st.session_state.resume_counter}'
-    st.session_state.resumes[new_resume_id] = {
-        'text': '',
-        'label': f'Resume {st.session_state.resume_counter}',
-        'file_name': '',
-        'completed_arms': set(),
-        'arm_scores': {},
-        'analysis_results': {}
-    }
+    st.session_state.resumes[new_resume_id] = ResumeRecord(f'Resume {st.session_state.resume_counter}')
     return new_resume_id
 
 def remove_resume(resume_id: str):
     """Remove a resume (except the first one)"""
     if resume_id != 'resume_1' and resume_id in st.session_state.resumes:
         del st.session_state.resumes[resume_id]
+        if 'analytics' in st.session_state:
+            st.session_state.analytics.remove(resume_id)
+        if 'search_index' in st.session_state:
+            st.session_state.search_index.remove(resume_id)
         if st.session_state.active_resume == resume_id:
             st.session_state.active_resume = 'resume_1'
 
+def get_analytics():
+    """This session's cross-resume agreement analytics (NumPy is loaded on first use)"""
+    if 'analytics' not in st.session_state:
+        from analytics import AgreementAnalytics
+        st.session_state.analytics = AgreementAnalytics()
+    return st.session_state.analytics
+
+def get_search_index() -> SearchIndex:
+    """This session's candidate search index, built from every resume's text on first use"""
+    if 'search_index' not in st.session_state:
+        index = SearchIndex()
+        for resume_id, resume_data in st.session_state.resumes.items():
+            index.update(resume_id, resume_data.text)
+        st.session_state.search_index = index
+    return st.session_state.search_index
+
+def set_resume_text(resume_id: str, text: str):
+    """Replace a resume's text and re-index it for search and near-duplicate matching"""
+    resume_data = st.session_state.resumes[resume_id]
+    resume_data.text = text
+    get_search_index().update(resume_id, text)
+    fingerprint_resume(resume_data)
+
+def fingerprint_resume(resume_data: ResumeRecord):
+    """Index a resume's current text for near-duplicate matching, replacing its previous version"""
+    text = resume_data.text
+    if len(text.strip()) < 50:
+        resume_data.fingerprint = None
+        return
+    resume_hash = resume_content_hash(text)
+    duplicate_index.index_resume(resume_hash, text, resume_data.label, replaces=resume_data.fingerprint)
+    resume_data.fingerprint = resume_hash
+    if resume_hash not in resume_data.fingerprints:
+        resume_data.fingerprints.append(resume_hash)
+
 def get_resume_progress_emoji(resume_id: str):
     """Get progress emoji for a resume"""
-    resume_data = st.session_state.resumes.get(resume_id, {})
-    completed_arms = resume_data.get('completed_arms', set())
-    
-    if len(completed_arms) == 0:
-        return "⚪⚪⚪⚪"
-    elif len(completed_arms) == 1:
-        return "✅⚪⚪⚪"
-    elif len(completed_arms) == 2:
-        return "✅✅⚪⚪"
-    elif len(completed_arms) == 3:
-        return "✅✅✅⚪"
-    else:
-        return "✅✅✅✅"
+    completed = st.session_state.resumes[resume_id].completed_count
+    return "✅" * completed + "⚪" * (4 - completed)
 
 def get_all_resume_labels():
     """Get list of resume labels for dropdown"""
     labels = []
     for resume_id, resume_data in st.session_state.resumes.items():
-        label = resume_data.get('label', resume_id)
+        label = resume_data.label
         progress = get_resume_progress_emoji(resume_id)
         labels.append(f"{label} ({progress})")
     return labels
 
+def restore_resume_from_store(resume_id: str, resume_text: str, job_description: str):
+    """Load stored ARM scores for this resume/JD pair into the session (payloads stay in the store)"""
+    store = get_default_store()
+    if store is None or not resume_text.strip() or not job_description.strip():
+        return
+    resume_data = st.session_state.resumes[resume_id]
+    store_key = (resume_content_hash(resume_text), job_description_hash(job_description))
+    if resume_data.store_key == store_key:
+        return
+    resume_data.store_key = store_key
+    for arm_name, score in store.get_scores(*store_key).items():
+        if not resume_data.is_completed(arm_name):
+            resume_data.record_result(arm_name, score)
+            # One payload read per restored ARM, so analytics see its criterion scores
+            result = store.get_result(*store_key, arm_name)
+            if result is not None:
+                get_analytics().update_from_result(resume_id, arm_name, result)
+
+def load_arm_result(resume_data: ResumeRecord, arm_name: str, job_description: str) -> Optional[Dict]:
+    """Full ARM result from the record if held there, otherwise rehydrated from the store (no session access)"""
+    arm_result = resume_data.result(arm_name)
+    if arm_result is not None and not arm_result.offloaded:
+        return arm_result.payload()
+    store = get_default_store()
+    if store is None:
+        return None
+    return store.get_result(resume_content_hash(resume_data.text), job_description_hash(job_description), arm_name)
+
+def get_analysis_result(resume_id: str, arm_name: str, job_description: str) -> Optional[Dict]:
+    """Get a full ARM result for a resume in this session"""
+    return load_arm_result(st.session_state.resumes[resume_id], arm_name, job_description)
+
+def export_candidate(resume_id: str, resume_data: ResumeRecord, job_description: str) -> Dict:
+    """Exporter input for one resume; results are loaded only while the export is written"""
+    return {
+        'resume_id': resume_id,
+        'label': resume_data.label,
+        'scores': resume_data.arm_scores,
+        'load_result': lambda arm_name: load_arm_result(resume_data, arm_name, job_description),
+    }
+
+def apply_job_outcome(job: EvaluationJob, outcome: ArmOutcome) -> bool:
+    """Record a finished ARM in the session; the worker has already saved it to the store
+
+    Provisional fallback scores are not stored, so the session keeps their
+    payload, and they are left out of the cross-resume analytics.
+    """
+    resume_data = st.session_state.resumes.get(job.resume_id)
+    if resume_data is None or resume_data.text != job.resume_text:
+        # Removed or edited while the job ran; the result is still in the store under the old text
+        return False
+    payload = outcome.result if outcome.fallback or get_default_store() is None else None
+    resume_data.record_result(outcome.arm_name, outcome.fit_score, outcome.shortlist, payload=payload,
+                              fallback=outcome.fallback)
+    if not outcome.fallback:
+        get_analytics().update_from_result(job.resume_id, outcome.arm_name, outcome.result)
+    return True
+
+def session_jobs() -> List[EvaluationJob]:
+    """This session's evaluation jobs still known to the queue, oldest first"""
+    jobs = [job_queue.get(job_id) for job_id in st.session_state.job_ids]
+    return [job for job in jobs if job is not None]
+
+def get_pending_job(resume_id: str) -> Optional[EvaluationJob]:
+    for job in session_jobs():
+        if job.resume_id == resume_id and job.pending:
+            return job
+    return None
+
+def get_duplicate_matches(resume_data: ResumeRecord) -> List[Tuple[str, str, float]]:
+    """Near-duplicates of a resume among every resume fingerprinted by this process or kept in the store
+
+    Earlier versions of the same resume are never reported.
+    """
+    if resume_data.fingerprint is None:
+        return []
+    signature = duplicate_index.signature(resume_data.fingerprint)
+    if signature is None:  # evicted from the index since the text was set
+        fingerprint_resume(resume_data)
+        signature = duplicate_index.signature(resume_data.fingerprint)
+    if signature is None:
+        return []
+    return duplicate_index.query(signature, exclude=resume_data.fingerprints)
+
+def find_session_resume(resume_hash: str, exclude_id: str) -> Optional[ResumeRecord]:
+    """Another resume in this session with the given content hash"""
+    for resume_id, resume_data in st.session_state.resumes.items():
+        if resume_id != exclude_id and resume_content_hash(resume_data.text) == resume_hash:
+            return resume_data
+    return None
+
+def get_duplicate_scores(duplicate_hash: str, source: Optional[ResumeRecord], job_description: str) -> Dict[str, float]:
+    """ARM scores a near-duplicate already has for this JD, from the session or the store"""
+    if source is not None:
+        return source.arm_scores
+    store = get_default_store()
+    if store is None or not job_description.strip():
+        return {}
+    return store.get_scores(duplicate_hash, job_description_hash(job_description))
+
+def reuse_duplicate_evaluations(resume_id: str, duplicate_hash: str, source: Optional[ResumeRecord],
+                                job_description: str) -> int:
+    """Copy a near-duplicate's ARM results for this JD to a resume instead of evaluating it again"""
+    resume_data = st.session_state.resumes[resume_id]
+    store = get_default_store()
+    store_key = (resume_content_hash(resume_data.text), job_description_hash(job_description))
+    reused = 0
+    for arm_name in ARM_NAMES:
+        if resume_data.is_completed(arm_name):
+            continue
+        if source is not None:
+            source_result = source.result(arm_name)
+            if source_result is None or source_result.fallback:
+                continue  # only validated model results are copied and stored
+            result = load_arm_result(source, arm_name, job_description)
+        else:
+            result = store.get_result(duplicate_hash, store_key[1], arm_name) if store is not None else None
+        if result is None:
+            continue
+        arm = EvaluationArm[arm_name]
+        fit_score, shortlist = get_fit_score(result, arm), get_shortlist_recommend(result, arm)
+        if store is not None:
+            # Saved under this resume's own hash, so it is restored like any other evaluation
+            store.save_evaluation(*store_key, arm_name, result, fit_score, shortlist, label=resume_data.label)
+        resume_data.record_result(arm_name, fit_score, shortlist, payload=None if store is not None else result)
+        get_analytics().update_from_result(resume_id, arm_name, result)
+        reused += 1
+    return reused
+
+def submit_evaluation(resume_id: str, arm_names: List[str], job_description: str) -> EvaluationJob:
+    """Queue ARMs for one resume as a background job of this session"""
+    resume_data = st.session_state.resumes[resume_id]
+
+    # ARM C/D can review ARM B's stored result instead of rescoring from scratch,
+    # but never a provisional fallback placeholder
+    incremental = st.session_state.get('incremental_review', True)
+    base_result = None
+    source = resume_data.result(EvaluationArm.SYSTEM_2.name)
+    if incremental and source is not None and not source.fallback:
+        base_result = get_analysis_result(resume_id, EvaluationArm.SYSTEM_2.name, job_description)
+
+    job = job_queue.submit(resume_id, resume_data.label, arm_names, resume_data.text, job_description,
+                           base_result=base_result, incremental=incremental)
+    st.session_state.job_ids.append(job.job_id)
+    return job
+
 def initialize_demo_scores():
     """Initialize the session state with demo scores if they don't exist"""
     if not st.session_state.arm_scores:
@@ -143,12 +309,6 @@ def initialize_demo_scores():
         st.session_state.arm_scores['SYSTEM_2_PERSONA'] = 4.6
     if 'SYSTEM_2_PERSONA_DEBIAS' not in st.session_state.arm_scores:
         st.session_state.arm_scores['SYSTEM_2_PERSONA_DEBIAS'] = 4.4
-from typing import Dict, List, Optional, Tuple
-import PyPDF2
-import pdfplumber
-from docx import Document
-import re
-from datetime import datetime
 
 # Configure page
 st.set_page_config(
@@ -222,1236 +382,732 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class ResumeProcessor:
-    """Handles file processing and text extraction"""
-    
-    @staticmethod
-    def extract_text_from_pdf(file_content: bytes) -> str:
-        """Extract text from PDF using multiple methods for better reliability"""
-        text = ""
-        
-        # Try pdfplumber first (better for complex layouts)
-        try:
-            with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-        except Exception as e:
-            st.warning(f"pdfplumber failed: {str(e)}. Trying PyPDF2...")
-            
-            # Fallback to PyPDF2
-            try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            except Exception as e2:
-                raise Exception(f"Both PDF extraction methods failed. PyPDF2 error: {str(e2)}")
-        
-        return text.strip()
-    
-    @staticmethod
-    def extract_text_from_docx(file_content: bytes) -> str:
-        """Extract text from DOCX file"""
-        try:
-            doc = Document(io.BytesIO(file_content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
-        except Exception as e:
-            raise Exception(f"Failed to extract text from DOCX: {str(e)}")
-    
-    @staticmethod
-    def extract_text_from_file(uploaded_file) -> str:
-        """Extract text from uploaded file based on file type"""
-        file_content = uploaded_file.read()
-        file_type = uploaded_file.type
-        
-        if file_type == "application/pdf":
-            return ResumeProcessor.extract_text_from_pdf(file_content)
-        elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            return ResumeProcessor.extract_text_from_docx(file_content)
-        else:
-            raise Exception(f"Unsupported file type: {file_type}")
+def display_results(analysis_result: Dict, arm: EvaluationArm, resume_label: str = None):
+    """Display analysis results as one HTML block"""
+    with tracer.span('render'):
+        st.markdown(build_result_html(analysis_result, arm.name, resume_label), unsafe_allow_html=True)
 
-class GeminiAnalyzer:
-    """Handles AI analysis using Google Gemini"""
-    
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    def get_arm_prompt(self, arm: EvaluationArm, resume_text: str, job_description: str) -> str:
-        """Get the appropriate prompt based on the evaluation arm"""
-        
-        if arm == EvaluationArm.SYSTEM_1:
-            return f"""You are evaluating applicants for the role below. Use only job-relevant information.
-            Keep evaluation quick and intuitive (System 1 thinking).
-
-            JOB DESCRIPTION:
-            {job_description}
-
-            RESUME:
-            {resume_text}
-
-            TASK: Quickly evaluate the candidate and return a JSON response:
-            {{
-                "fit_score_1_to_5": <number>,
-                "shortlist_recommend": true/false,
-                "justification": "<1-2 sentences explaining your quick assessment>"
-            }}
-
-            IMPORTANT: 
-            - Provide fast, intuitive assessment
-            - Keep justification minimal (1-2 sentences)
-            - Do not use names/pronouns/clubs as proxies
-            - Focus only on job-relevant qualifications"""
-
-        elif arm == EvaluationArm.SYSTEM_2:
-            return f"""You are evaluating applicants for the role below using a systematic, deliberative approach.
-            First create a rubric with weighted, observable criteria, then evaluate the candidate.
-
-            JOB DESCRIPTION:
-            {job_description}
-
-            STEP 1: Generate a rubric using these specific criteria and weights:
-            {{
-                "rubric": [
-                    {{
-                        "criterion": "Required technical skill match",
-                        "weight": 30,
-                        "description": "Match between required technical skills in JD and candidate's demonstrated skills"
-                    }},
-                    {{
-                        "criterion": "Relevant years of experience",
-                        "weight": 20,
-                        "description": "Years of relevant work experience in similar roles/industry"
-                    }},
-                    {{
-                        "criterion": "Evidence of role-specific achievements",
-                        "weight": 25,
-                        "description": "Concrete examples of achievements relevant to job requirements"
-                    }},
-                    {{
-                        "criterion": "Evidence of teamwork/communication",
-                        "weight": 15,
-                        "description": "Demonstrated ability to work in teams and communicate effectively"
-                    }},
-                    {{
-                        "criterion": "Certifications/education relevance",
-                        "weight": 10,
-                        "description": "Relevant certifications and educational background"
-                    }}
-                ],
-                "evaluation": {{
-                    "scores": [
-                        {{
-                            "criterion": "criterion name from above",
-                            "score": <number 1-5>,
-                            "evidence": "<specific evidence from resume that supports the score>"
-                        }}
-                    ],
-                    "fit_score_1_to_5": <weighted average of scores>,
-                    "shortlist_recommend": true/false,
-                    "justification": "<2-3 sentences citing specific criteria and evidence>"
-                }}
-            }}
-
-            RESUME TO EVALUATE:
-            {resume_text}
-
-            IMPORTANT:
-            - Use exactly these criteria and weights
-            - Score each criterion from 1-5 based on evidence from the resume
-            - Provide specific evidence from the resume for each score
-            - Calculate weighted average for final fit score
-            - Do not use names/pronouns/clubs as proxies
-            - Focus only on job-relevant qualifications
-
-            IMPORTANT:
-            - Criteria weights must sum to 100
-            - Focus on measurable job requirements
-            - Avoid prestige/fit proxies unless directly job-relevant
-            - Do not use names/pronouns/clubs as proxies
-            - Cite specific evidence from resume for each score"""
-            
-        elif arm == EvaluationArm.SYSTEM_2_PERSONA:
-            return f"""ROLE: You are an HR compliance officer. Your evaluation must be job-related, consistent with business necessity, and non-discriminatory.
-
-            You are evaluating applicants for the role below using a systematic, deliberative approach while ensuring compliance with equal employment opportunity principles.
-
-            JOB DESCRIPTION:
-            {job_description}
-
-            STEP 1: Generate a rubric using these specific criteria and weights:
-            {{
-                "rubric": [
-                    {{
-                        "criterion": "Required technical skill match",
-                        "weight": 30,
-                        "description": "Match between required technical skills in JD and candidate's demonstrated skills"
-                    }},
-                    {{
-                        "criterion": "Relevant years of experience",
-                        "weight": 20,
-                        "description": "Years of relevant work experience in similar roles/industry"
-                    }},
-                    {{
-                        "criterion": "Evidence of role-specific achievements",
-                        "weight": 25,
-                        "description": "Concrete examples of achievements relevant to job requirements"
-                    }},
-                    {{
-                        "criterion": "Evidence of teamwork/communication",
-                        "weight": 15,
-                        "description": "Demonstrated ability to work in teams and communicate effectively"
-                    }},
-                    {{
-                        "criterion": "Certifications/education relevance",
-                        "weight": 10,
-                        "description": "Relevant certifications and educational background"
-                    }}
-                ],
-                "evaluation": {{
-                    "scores": [
-                        {{
-                            "criterion": "criterion name from above",
-                            "score": <number 1-5>,
-                            "evidence": "<specific evidence from resume that supports the score>"
-                        }}
-                    ],
-                    "fit_score_1_to_5": <weighted average of scores>,
-                    "shortlist_recommend": true/false,
-                    "justification": "<2-3 sentences citing specific criteria and evidence>",
-                    "compliance_review": {{
-                        "is_compliant": true/false,
-                        "compliance_notes": "<1-2 sentences confirming evaluation adheres to non-discrimination principles>",
-                        "risk_factors": ["<any potential bias or compliance concerns>"] or []
-                    }}
-                }}
-            }}
-
-            RESUME TO EVALUATE:
-            {resume_text}
-
-            IMPORTANT (HR COMPLIANCE GUIDELINES):
-            - You MUST evaluate based ONLY on job-related criteria
-            - All assessments must be supported by specific evidence
-            - Focus on measurable qualifications and achievements
-            - Avoid any consideration of protected characteristics
-            - Do not consider or reference:
-                * Names or apparent gender
-                * Cultural or religious affiliations
-                * Age indicators
-                * Educational institution prestige
-                * Group memberships unless directly job-relevant
-            - Document compliance considerations in compliance_review
-            - Flag any potential discriminatory impacts"""
-        
-        elif arm == EvaluationArm.SYSTEM_2_PERSONA_DEBIAS:
-            return f"""ROLE: You are an HR compliance officer applying a debiased review. Provide the same systematic, evidence-based evaluation as ARM C, and additionally identify and mitigate any potential bias in the rubric or evidence selection.
-
-            JOB DESCRIPTION:
-            {job_description}
-
-            STEP 1: Generate a rubric using these specific criteria and weights (same as ARM B/C).
-
-            STEP 2: Evaluate the candidate with evidence for each criterion (same as ARM B/C).
-
-            STEP 3: Compliance and Debias Review
-            {{
-                "rubric": [{{"criterion":"...","weight":<int>,"description":"..."}}],
-                "evaluation": {{
-                    "scores": [{{"criterion":"...","score":<1-5>,"evidence":"..."}}],
-                    "fit_score_1_to_5": <number>,
-                    "shortlist_recommend": true/false,
-                    "justification": "<2-3 sentences citing criteria and evidence>",
-                    "compliance_review": {{
-                        "is_compliant": true/false,
-                        "compliance_notes": "<confirmation of EEO adherence>",
-                        "risk_factors": ["<any compliance concerns>"]
-                    }},
-                    "debias_review": {{
-                        "mitigations_applied": ["<actions taken to mitigate potential bias>"] ,
-                        "residual_risks": ["<remaining risks>"]
-                    }}
-                }}
-            }}
-
-            IMPORTANT:
-            - Base all judgments on job-related, observable evidence
-            - Avoid prestige proxies, demographic inferences, and ambiguous signals
-            - If evidence is weak or ambiguous, reduce reliance and note in debias_review
-            - Keep outputs strictly JSON as specified
-            """
-            
-        return ""
-    
-    def analyze_resume(self, resume_text: str, job_description: str, arm: EvaluationArm = EvaluationArm.SYSTEM_1) -> Dict:
-        """Analyze resume against job description using Gemini AI"""
-        
-        # Get the appropriate prompt for the selected ARM
-        prompt = self.get_arm_prompt(arm, resume_text, job_description)
-        
-        try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Clean up response text (remove markdown formatting if present)
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            
-            result = json.loads(response_text)
-            
-            # Validate the response format based on the ARM
-            if arm in [EvaluationArm.SYSTEM_2, EvaluationArm.SYSTEM_2_PERSONA, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]:
-                if 'rubric' not in result or 'evaluation' not in result:
-                    raise ValueError("Invalid response format for ARM B/C/D")
-                
-                # Ensure all required fields are present
-                required_fields = {
-                    'rubric': ['criterion', 'weight', 'description'],
-                    'evaluation': {
-                        'scores': ['criterion', 'score', 'evidence'],
-                        'root': ['fit_score_1_to_5', 'shortlist_recommend', 'justification']
-                    }
-                }
-                
-                # Validate rubric
-                for criterion in result['rubric']:
-                    for field in required_fields['rubric']:
-                        if field not in criterion:
-                            raise ValueError(f"Missing {field} in rubric criterion")
-                
-                # Validate evaluation
-                eval_data = result['evaluation']
-                for score in eval_data.get('scores', []):
-                    for field in required_fields['evaluation']['scores']:
-                        if field not in score:
-                            raise ValueError(f"Missing {field} in evaluation score")
-                
-                for field in required_fields['evaluation']['root']:
-                    if field not in eval_data:
-                        raise ValueError(f"Missing {field} in evaluation")
-            
-            return result
-            
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
-        except Exception as e:
-            raise Exception(f"AI analysis failed: {str(e)}")
-
-def validate_inputs(resume_text: str, job_description: str) -> Tuple[bool, str]:
-    """Validate input texts for minimum requirements"""
-    if not resume_text or len(resume_text.strip()) < 50:
-        return False, "Resume text must be at least 50 characters long"
-    
-    if not job_description or len(job_description.strip()) < 50:
-        return False, "Job description must be at least 50 characters long"
-    
-    return True, ""
+def display_leaderboard():
+    """Ranked, filterable, paginated view of all resumes; only the visible page is rendered"""
+    from leaderboard import SORT_COLUMNS, build_score_frame, filter_frame, format_page, page_count, paginate
 
-def display_results(analysis_result: Dict, arm: EvaluationArm, resume_label: str = None):
-    """Display analysis results in a formatted way"""
-    
-    # Add resume context if label is provided
-    if resume_label:
-        st.markdown(f"### 📊 Analysis Results for {resume_label}")
+    frame = build_score_frame(st.session_state.resumes)
+
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    with col1:
+        sort_label = st.selectbox("Rank by", list(SORT_COLUMNS.keys()), key="leaderboard_sort")
+    with col2:
+        label_query = st.text_input("Filter by label", key="leaderboard_filter", placeholder="e.g. Backend")
+    with col3:
+        min_average = st.number_input("Min average", min_value=0.0, max_value=5.0, value=0.0, step=0.5, key="leaderboard_min")
+    with col4:
+        page_size = st.selectbox("Page size", [10, 25, 50, 100], key="leaderboard_page_size")
+
+    completed_only = st.checkbox("Only fully evaluated candidates", key="leaderboard_completed_only")
+    filtered = filter_frame(frame, label_query, min_average if min_average > 0 else None, completed_only)
+
+    sort_column = SORT_COLUMNS[sort_label]
+    total_pages = page_count(filtered, sort_column, page_size)
+    page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1, step=1, key="leaderboard_page")
+
+    page_rows = paginate(filtered, sort_column, int(page), page_size)
+    if page_rows.empty:
+        st.caption("No candidates with scores match the current filters.")
     else:
-        st.markdown("### 📊 Analysis Results")
-    
-    if arm == EvaluationArm.SYSTEM_1:
-        # ARM A: Fast Intuitive Display
-        fit_score = analysis_result.get('fit_score_1_to_5', 0)
-        score_color = "🟢" if fit_score >= 4 else "🟡" if fit_score >= 3 else "🔴"
-        
-        st.markdown(f"""
-        <div class="score-display">
-            <h2>{score_color} Quick Assessment Score: {fit_score}/5</h2>
-            <p>{'✅ Recommended for Shortlist' if analysis_result.get('shortlist_recommend', False) else '❌ Not Recommended'}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.subheader("📋 Quick Assessment")
-        st.markdown(
-            f"""<div class="recommendation-box">{analysis_result.get('justification', 'No assessment available')}</div>""", 
-            unsafe_allow_html=True
-        )
-    
-    elif arm == EvaluationArm.SYSTEM_2:
-        # ARM B: Deliberative Rubric-Based Display
-        evaluation = analysis_result.get('evaluation', {})
-        fit_score = evaluation.get('fit_score_1_to_5', 0)
-        score_color = "🟢" if fit_score >= 4 else "🟡" if fit_score >= 3 else "🔴"
-        
-        st.markdown(f"""
-        <div class="score-display">
-            <h2>{score_color} Detailed Evaluation Score: {fit_score}/5</h2>
-            <p>{'✅ Recommended for Shortlist' if evaluation.get('shortlist_recommend', False) else '❌ Not Recommended'}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Display Rubric and Scores
-        st.subheader("📊 Evaluation Rubric & Scores")
-        
-        # Display the rubric criteria first
-        st.markdown("#### Evaluation Criteria")
-        rubric = analysis_result.get('rubric', [])
-        for criterion in rubric:
-            st.markdown(f"""
-            <div class="recommendation-box">
-                <strong>{criterion['criterion']}</strong> (Weight: {criterion['weight']}%)
-                <p><em>{criterion['description']}</em></p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        st.markdown("#### Detailed Scores")
-        scores = evaluation.get('scores', [])
-        
-        for criterion_score in scores:
-            criterion_name = criterion_score.get('criterion', '')
-            score = criterion_score.get('score', 0)
-            evidence = criterion_score.get('evidence', '')
-            weight = next((r['weight'] for r in rubric if r['criterion'] == criterion_name), 0)
-            
-            st.markdown(f"""
-            <div class="recommendation-box">
-                <h4>{criterion_name} (Weight: {weight}%)</h4>
-                <p><strong>Score:</strong> {score}/5</p>
-                <p><strong>Evidence:</strong> {evidence}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.subheader("📋 Final Assessment")
-        st.markdown(
-            f"""<div class="recommendation-box">{analysis_result.get('evaluation', {}).get('justification', 'No assessment available')}</div>""", 
-            unsafe_allow_html=True
-        )
-        
-    elif arm == EvaluationArm.SYSTEM_2_PERSONA:
-        # ARM C: Compliance Officer Display
-        evaluation = analysis_result.get('evaluation', {})
-        fit_score = evaluation.get('fit_score_1_to_5', 0)
-        score_color = "🟢" if fit_score >= 4 else "🟡" if fit_score >= 3 else "🔴"
-        
-        st.markdown(f"""
-        <div class="score-display">
-            <h2>{score_color} Compliance-Verified Score: {fit_score}/5</h2>
-            <p>{'✅ Recommended for Shortlist' if evaluation.get('shortlist_recommend', False) else '❌ Not Recommended'}</p>
-            <p style='font-size: 0.9em; margin-top: 5px;'>{'✓ Compliant with EEO Principles' if evaluation.get('compliance_review', {}).get('is_compliant', False) else '⚠️ Compliance Concerns Noted'}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Display Rubric and Scores
-        st.subheader("📊 Evaluation Rubric & Scores")
-        
-        # Display the rubric criteria first
-        st.markdown("#### Evaluation Criteria")
-        rubric = analysis_result.get('rubric', [])
-        for criterion in rubric:
-            st.markdown(f"""
-            <div class="recommendation-box">
-                <strong>{criterion['criterion']}</strong> (Weight: {criterion['weight']}%)
-                <p><em>{criterion['description']}</em></p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        st.markdown("#### Detailed Scores")
-        scores = evaluation.get('scores', [])
-        
-        for criterion_score in scores:
-            criterion_name = criterion_score.get('criterion', '')
-            score = criterion_score.get('score', 0)
-            evidence = criterion_score.get('evidence', '')
-            weight = next((r['weight'] for r in rubric if r['criterion'] == criterion_name), 0)
-            
-            st.markdown(f"""
-            <div class="recommendation-box">
-                <h4>{criterion_name} (Weight: {weight}%)</h4>
-                <p><strong>Score:</strong> {score}/5</p>
-                <p><strong>Evidence:</strong> {evidence}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.subheader("📋 Final Assessment")
-        st.markdown(
-            f"""<div class="recommendation-box">{evaluation.get('justification', 'No assessment available')}</div>""", 
-            unsafe_allow_html=True
-        )
-        
-        # Compliance Review Section
-        st.subheader("⚖️ Compliance Review")
-        compliance_review = evaluation.get('compliance_review', {})
-        compliance_status = "✅ Compliant" if compliance_review.get('is_compliant', False) else "⚠️ Concerns Noted"
-        
-        st.markdown(f"""
-        <div class="recommendation-box">
-            <h4>{compliance_status}</h4>
-            <p><strong>Compliance Notes:</strong> {compliance_review.get('compliance_notes', 'No compliance notes available')}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        risk_factors = compliance_review.get('risk_factors', [])
-        if risk_factors:
-            st.markdown("#### Risk Factors Identified")
-            for risk in risk_factors:
-                st.markdown(f"""
-                <div class="recommendation-box" style="border-left-color: #ffc107;">
-                    ⚠️ {risk}
-                </div>
-                """, unsafe_allow_html=True)
-    
-    elif arm == EvaluationArm.SYSTEM_2_PERSONA_DEBIAS:
-        # ARM D: Compliance + Debias Display
-        evaluation = analysis_result.get('evaluation', {})
-        fit_score = evaluation.get('fit_score_1_to_5', 0)
-        score_color = "🟢" if fit_score >= 4 else "🟡" if fit_score >= 3 else "🔴"
-        
-        st.markdown(f"""
-        <div class="score-display">
-            <h2>{score_color} Debiased Compliance Score: {fit_score}/5</h2>
-            <p>{'✅ Recommended for Shortlist' if evaluation.get('shortlist_recommend', False) else '❌ Not Recommended'}</p>
-            <p style='font-size: 0.9em; margin-top: 5px;'>{'✓ Compliant (Debiased Review Applied)' if evaluation.get('compliance_review', {}).get('is_compliant', False) else '⚠️ Compliance Concerns Noted'}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.subheader("📊 Evaluation Rubric & Scores")
-        st.markdown("#### Evaluation Criteria")
-        rubric = analysis_result.get('rubric', [])
-        for criterion in rubric:
-            st.markdown(f"""
-            <div class="recommendation-box">
-                <strong>{criterion.get('criterion','')}</strong> (Weight: {criterion.get('weight',0)}%)
-                <p><em>{criterion.get('description','')}</em></p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("#### Detailed Scores")
-        scores = evaluation.get('scores', [])
-        for criterion_score in scores:
-            criterion_name = criterion_score.get('criterion', '')
-            score = criterion_score.get('score', 0)
-            evidence = criterion_score.get('evidence', '')
-            weight = next((r.get('weight',0) for r in rubric if r.get('criterion','') == criterion_name), 0)
-            st.markdown(f"""
-            <div class="recommendation-box">
-                <h4>{criterion_name} (Weight: {weight}%)</h4>
-                <p><strong>Score:</strong> {score}/5</p>
-                <p><strong>Evidence:</strong> {evidence}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.subheader("📋 Final Assessment")
+        st.dataframe(format_page(page_rows), width="stretch")
+
+def timed_section(func):
+    """Record how long each run of a page section takes (shown in the telemetry panel)
+
+    The section is a span of the rerun's trace, or its own trace when it reruns as a fragment.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tracer.trace(func.__name__, st.session_state.get('trace_owner')):
+                return func(*args, **kwargs)
+        finally:
+            if 'section_timings' not in st.session_state:
+                st.session_state.section_timings = deque(maxlen=SECTION_TIMINGS_KEPT)
+            st.session_state.section_timings.append((func.__name__, (time.perf_counter() - start) * 1000))
+    return wrapper
+
+# Each page section is a fragment: interacting with a widget inside one reruns
+# only that section. Changes that affect other sections (switching or adding a
+# resume, completing an ARM, restoring stored results) call st.rerun() to
+# invalidate the whole page explicitly.
+
+@st.fragment
+@timed_section
+def sidebar_manager():
+    """Resume selector, add/remove, progress overview, settings and telemetry"""
+    # Resume Management Section
+    st.markdown("### 📋 Resume Management")
+
+    # Resume selector
+    resume_options = list(st.session_state.resumes.keys())
+    option_labels = {rid: f"{st.session_state.resumes[rid].label} ({get_resume_progress_emoji(rid)})" for rid in resume_options}
+    selected_resume = st.selectbox(
+        "Select Active Resume:",
+        resume_options,
+        format_func=option_labels.get,
+        index=resume_options.index(st.session_state.active_resume) if st.session_state.active_resume in resume_options else 0
+    )
+
+    # Switching resumes changes every other section
+    if selected_resume != st.session_state.active_resume:
+        st.session_state.active_resume = selected_resume
+        st.rerun()
+
+    # Add/Remove resume buttons
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("➕ Add Resume", help="Add another resume for comparison"):
+            new_id = add_new_resume()
+            st.session_state.active_resume = new_id
+            st.rerun()
+
+    with col2:
+        if st.button("🗑️ Remove", disabled=len(st.session_state.resumes) <= 1 or st.session_state.active_resume == 'resume_1'):
+            remove_resume(st.session_state.active_resume)
+            st.rerun()
+
+    # Progress overview for all resumes, as one aggregate line instead of a row per resume
+    if len(st.session_state.resumes) > 1:
+        st.markdown("#### Progress Overview")
+        masks = [r.completed_mask for r in st.session_state.resumes.values()]
+        fully_done = masks.count(ALL_ARMS_MASK)
+        not_started = masks.count(0)
         st.markdown(
-            f"""<div class=\"recommendation-box\">{evaluation.get('justification', 'No assessment available')}</div>""",
-            unsafe_allow_html=True
+            f"**{len(masks)}** resumes · ✅ {fully_done} complete · "
+            f"⏳ {len(masks) - fully_done - not_started} in progress · ⚪ {not_started} not started"
         )
-        
-        st.subheader("🧭 Debias Review")
-        debias = evaluation.get('debias_review', {})
-        mitigations = debias.get('mitigations_applied', []) or []
-        residual = debias.get('residual_risks', []) or []
-        if mitigations:
-            st.markdown("#### Mitigations Applied")
-            for m in mitigations:
-                st.markdown(f"""
-                <div class=\"recommendation-box\" style=\"border-left-color: #17a2b8;\">🧪 {m}</div>
-                """, unsafe_allow_html=True)
-        if residual:
-            st.markdown("#### Residual Risks")
-            for r in residual:
-                st.markdown(f"""
-                <div class=\"recommendation-box\" style=\"border-left-color: #ffc107;\">⚠️ {r}</div>
-                """, unsafe_allow_html=True)
 
-def main():
-    """Main application function"""
-    
-    # Header
+    st.markdown("---")
+    st.markdown("### ⚙️ Evaluation Settings")
+    st.checkbox(
+        "Layer ARM C/D on ARM B results",
+        value=True,
+        key="incremental_review",
+        help="ARM C and D review ARM B's scores and evidence and return only their reviews and score adjustments, instead of rescoring the resume from scratch"
+    )
+
+    with st.expander("📈 Performance Telemetry"):
+        telemetry_rows = telemetry.summary()
+        if telemetry_rows:
+            st.dataframe(
+                telemetry_rows,
+                column_order=['arm', 'calls', 'p50_s', 'p95_s', 'input_tokens', 'output_tokens', 'cost_usd', 'cache_hits', 'coalesced', 'escalations', 'fallbacks'],
+                hide_index=True
+            )
+            route_rows = telemetry.route_summary()
+            if route_rows:
+                st.caption("By model route")
+                st.dataframe(
+                    route_rows,
+                    column_order=['arm', 'tier', 'model', 'calls', 'p50_s', 'p95_s', 'cost_usd', 'escalations', 'escalation_rate'],
+                    hide_index=True
+                )
+            st.download_button(
+                "Download metrics (Prometheus)",
+                data=telemetry.to_prometheus(),
+                file_name="resume_scorer_metrics.prom",
+                mime="text/plain"
+            )
+        else:
+            st.caption("No analyzer calls recorded yet.")
+
+        cache_rows = shared_cache.stats()
+        if any(row['hits'] or row['misses'] for row in cache_rows):
+            st.caption(f"Shared cache: {shared_cache.total_bytes / 1024:.0f} KiB of {shared_cache.max_bytes // (1024 * 1024)} MiB")
+            st.dataframe(
+                cache_rows,
+                column_order=['namespace', 'entries', 'bytes', 'hit_rate', 'hits', 'misses', 'evictions', 'expirations'],
+                hide_index=True
+            )
+
+        section_timings = st.session_state.get('section_timings')
+        if section_timings:
+            st.caption("Recent section runs: " + " · ".join(f"{name} {ms:.1f} ms" for name, ms in list(section_timings)[-10:]))
+
+def trace_panel():
+    """Span waterfalls of this session's recent reruns and jobs, with one-off profiling (TRACING=1)"""
+    owner = st.session_state.trace_owner
+    with st.expander("🐞 Trace Debug"):
+        shown = st.slider("Traces shown", 1, 20, TRACES_SHOWN, key="traces_shown")
+        traces = tracer.recent(owner, shown)
+        if traces:
+            st.markdown('\n'.join(waterfall_html(trace) for trace in traces), unsafe_allow_html=True)
+            st.download_button(
+                "Download traces (JSONL)",
+                data=tracer.to_jsonl(owner),
+                file_name="resume_scorer_traces.jsonl",
+                mime="application/x-ndjson"
+            )
+        else:
+            st.caption("No traces recorded yet.")
+
+        mode = st.selectbox("Profiler", PROFILE_MODES, key="trace_profiler",
+                            format_func={'cprofile': 'cProfile (exact, slower)', 'sampling': 'Stack sampling (low overhead)'}.get)
+        if st.button("🔬 Profile next rerun", disabled=tracer.profile_pending(owner)):
+            tracer.request_profile(owner, mode)
+            st.rerun()
+        profiled = next((trace for trace in tracer.recent(owner, len(tracer.traces)) if trace.profile), None)
+        if profiled is not None:
+            st.caption(f"{profiled.profile_mode} profile of {profiled.name} ({profiled.duration_ms:.0f} ms)")
+            st.code(profiled.profile, language=None)
+
+def sidebar_help():
+    """Static usage and privacy notes"""
+    st.markdown("---")
+    st.markdown("### 📚 How to Use")
     st.markdown("""
-    <div class="main-header">
-        <h1>📄 Resume Scorer AI</h1>
-        <p>Analyze your resume against job descriptions using Google's Gemini AI</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Sidebar
-    with st.sidebar:
-        api_key = os.getenv('GEMINI_API_KEY')
-        
-        # Resume Management Section
-        st.markdown("### 📋 Resume Management")
-        
-        # Resume selector
-        resume_options = list(st.session_state.resumes.keys())
-        resume_labels = [st.session_state.resumes[rid]['label'] for rid in resume_options]
-        
-        selected_index = st.selectbox(
-            "Select Active Resume:",
-            range(len(resume_options)),
-            format_func=lambda i: f"{resume_labels[i]} ({get_resume_progress_emoji(resume_options[i])})",
-            index=resume_options.index(st.session_state.active_resume) if st.session_state.active_resume in resume_options else 0
+    1. **Upload** your resumes (PDF/DOCX) or paste text
+    2. **Label** each resume for easy identification
+    3. **Enter** the job description
+    4. **Select** a resume and analyze through all 4 ARMs
+    5. **Compare** results across all resumes
+    """)
+
+    st.markdown("### 🔒 Privacy")
+    st.markdown("""
+    - Evaluation results are saved to a local SQLite file (`RESULT_STORE_PATH`, empty to disable)
+    - Resume text itself is not stored, only content hashes
+    - You control your own API usage
+    """)
+
+@st.fragment
+@timed_section
+def leaderboard_panel():
+    """Leaderboard controls only rerun the leaderboard"""
+    with st.expander("🏆 Candidate Leaderboard"):
+        display_leaderboard()
+
+@st.fragment
+@timed_section
+def search_panel():
+    """Boolean/phrase search over every resume's text; matches can be queued for evaluation"""
+    with st.expander("🔎 Candidate Search"):
+        query = st.text_input(
+            "Search resumes",
+            key="candidate_search",
+            placeholder='e.g. kubernetes AND (go OR golang) -intern, "machine learning"',
+            help='Terms are ANDed by default. Use OR, NOT (or a leading -), parentheses and "quoted phrases".'
         )
-        
-        # Update active resume
-        st.session_state.active_resume = resume_options[selected_index]
-        
-        # Add/Remove resume buttons
+        if not query.strip():
+            return
+        try:
+            matches = get_search_index().search(query)
+        except QuerySyntaxError as e:
+            st.error(f"❌ Invalid search: {e}")
+            return
+        matches = [(resume_id, score) for resume_id, score in matches if resume_id in st.session_state.resumes]
+        if not matches:
+            st.info("No resumes match this search.")
+            return
+
+        resumes = st.session_state.resumes
+        st.dataframe(
+            [{'Resume': resumes[resume_id].label, 'Relevance': score, 'Progress': get_resume_progress_emoji(resume_id)}
+             for resume_id, score in matches],
+            hide_index=True
+        )
+
+        # Pick matches to send through their remaining ARMs
+        option_labels = {resume_id: resumes[resume_id].label for resume_id, _ in matches}
+        queueable = [resume_id for resume_id, _ in matches
+                     if resumes[resume_id].next_arm() is not None and get_pending_job(resume_id) is None]
+        # No fixed key, so the selection resets to all matches whenever the matches change
+        selected = st.multiselect("Candidates to evaluate", queueable, default=queueable, format_func=option_labels.get)
+        if st.button("⏭️ Queue Remaining ARMs for Selected", disabled=not selected):
+            job_description = st.session_state.get('job_description', '')
+            errors = []
+            for resume_id in selected:
+                resume_data = resumes[resume_id]
+                is_valid, error_msg = validate_inputs(resume_data.text, job_description)
+                if not is_valid:
+                    errors.append(f"{resume_data.label}: {error_msg}")
+                    continue
+                next_arm = resume_data.next_arm()
+                submit_evaluation(resume_id, list(ARM_NAMES[ARM_NAMES.index(next_arm):]), job_description)
+            if len(errors) < len(selected):
+                # Full rerun so the job monitor starts polling
+                st.rerun()
+            for error in errors:
+                st.error(f"❌ {error}")
+
+@st.fragment
+@timed_section
+def analytics_panel():
+    """Inter-ARM agreement, criterion distributions and drift across this session's resumes"""
+    import pandas as pd
+
+    report = st.session_state.analytics.report()
+    arm_labels = [ARM_LABELS[arm_name] for arm_name in report['arms']]
+
+    def matrix(values):
+        return pd.DataFrame(values, index=arm_labels, columns=arm_labels).round(2)
+
+    with st.expander("📊 Cross-Resume Analytics"):
+        st.caption(f"{report['resumes']} resumes · statistics refresh only when new evaluations arrive")
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("➕ Add Resume", help="Add another resume for comparison"):
-                new_id = add_new_resume()
-                st.session_state.active_resume = new_id
-                st.rerun()
-        
+            st.markdown("**Fit score correlation between ARMs**")
+            st.dataframe(matrix(report['correlation']))
         with col2:
-            if st.button("🗑️ Remove", disabled=len(st.session_state.resumes) <= 1 or st.session_state.active_resume == 'resume_1'):
-                remove_resume(st.session_state.active_resume)
-                st.rerun()
-        
-        # Progress overview for all resumes
-        if len(st.session_state.resumes) > 1:
-            st.markdown("#### Progress Overview")
-            for rid, resume_data in st.session_state.resumes.items():
-                progress = get_resume_progress_emoji(rid)
-                label = resume_data.get('label', rid)
-                st.markdown(f"**{label}**: {progress}")
-        
-        st.markdown("---")
-        st.markdown("### 📚 How to Use")
-        st.markdown("""
-        1. **Upload** your resumes (PDF/DOCX) or paste text
-        2. **Label** each resume for easy identification
-        3. **Enter** the job description
-        4. **Select** a resume and analyze through all 4 ARMs
-        5. **Compare** results across all resumes
-        """)
-        
-        st.markdown("### 🔒 Privacy")
-        st.markdown("""
-        - All processing happens client-side
-        - No data is stored or logged
-        - You control your own API usage
-        """)
-    
+            st.markdown("**Shortlist agreement (Cohen's kappa)**")
+            st.dataframe(matrix(report['kappa']))
+
+        st.markdown("**ARM drift** (mean fit score change from row ARM to column ARM)")
+        st.dataframe(matrix(report['drift']))
+
+        stats = report['criterion_stats']
+        rubric_arms = [i for i, arm_name in enumerate(report['arms']) if arm_name != 'SYSTEM_1']
+        distribution = pd.DataFrame({
+            arm_labels[i]: [
+                f"{stats['mean'][i, c]:.2f} ± {stats['std'][i, c]:.2f} (median {stats['p50'][i, c]:.1f})"
+                if stats['count'][i, c] else "–"
+                for c in range(len(report['criteria']))
+            ]
+            for i in rubric_arms
+        }, index=report['criteria'])
+        st.markdown("**Criterion score distributions** (mean ± std)")
+        st.dataframe(distribution)
+
+        st.markdown("**Criterion drift vs ARM B** (mean score change)")
+        st.dataframe(pd.DataFrame(
+            report['criterion_drift'][rubric_arms].T, index=report['criteria'], columns=[arm_labels[i] for i in rubric_arms]
+        ).round(2))
+
+@st.fragment
+@timed_section
+def export_panel():
+    """Bulk export of every evaluated resume, generated only when the download is clicked"""
+    with st.expander("📦 Export Evaluations"):
+        export_format = st.selectbox("Format", list(EXPORT_FORMATS.keys()), key="export_format",
+                                     help="CSV/JSONL/Parquet: one row per criterion score with evidence. HTML bundle: one report per candidate.")
+        _, extension, mime, _ = EXPORT_FORMATS[export_format]
+        job_description = st.session_state.get('job_description', '')
+        # Snapshot the records now; the export itself runs on a separate thread without session access
+        resumes = [(resume_id, record) for resume_id, record in st.session_state.resumes.items() if record.completed_mask]
+
+        def generate() -> bytes:
+            with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as out:
+                export((export_candidate(resume_id, record, job_description) for resume_id, record in resumes), export_format, out)
+                out.seek(0)
+                return out.read()
+
+        st.download_button(
+            f"📥 Download {len(resumes)} candidate(s)",
+            data=generate,
+            file_name=f"resume_evaluations_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}",
+            mime=mime,
+            disabled=not resumes
+        )
+
+@st.fragment
+@timed_section
+def input_panel():
+    """Resume label, resume text/upload and job description for the active resume"""
+    resume_id = st.session_state.active_resume
+    current_resume = st.session_state.resumes[resume_id]
+
     # Resume labeling for active resume
     st.markdown("### 🏷️ Resume Information")
-    current_resume = st.session_state.resumes[st.session_state.active_resume]
-    
+
     col1, col2 = st.columns([2, 1])
     with col1:
+        # Renaming only reruns this section; the sidebar picks the new label up on the next full rerun
         new_label = st.text_input(
-            "Resume Label:", 
-            value=current_resume['label'],
+            "Resume Label:",
+            value=current_resume.label,
             placeholder="e.g., John Doe, Marketing Candidate, Resume A",
             help="Give this resume a descriptive name"
         )
-        if new_label != current_resume['label']:
-            st.session_state.resumes[st.session_state.active_resume]['label'] = new_label
-    
+        if new_label != current_resume.label:
+            current_resume.label = new_label
+
     with col2:
-        st.metric("ARM Progress", f"{len(current_resume['completed_arms'])}/4", delta=None)
-    
+        st.metric("ARM Progress", f"{current_resume.completed_count}/4", delta=None)
+
     st.markdown("---")
-    
+
     # Main content area
     col1, col2 = st.columns([1, 1])
-    
+
     with col1:
         st.header("📄 Resume Input")
-        
+
         # File upload option
         uploaded_file = st.file_uploader(
             "Upload Resume (PDF or DOCX)",
             type=['pdf', 'docx'],
             help="Supported formats: PDF, DOCX",
-            key=f"file_upload_{st.session_state.active_resume}"
+            key=f"file_upload_{resume_id}"
         )
-        
+
         # Manual text input option
         st.markdown("**OR** paste your resume text below:")
+        stored_text = current_resume.text
         resume_text = st.text_area(
             "Resume Text",
             height=300,
             placeholder="Paste your resume content here...",
             help="Minimum 50 characters required",
-            value=current_resume.get('text', ''),
-            key=f"resume_text_{st.session_state.active_resume}"
+            value=stored_text,
+            key=f"resume_text_{resume_id}"
         )
-        
-        # Update resume text in session state
-        if resume_text != current_resume.get('text', ''):
-            st.session_state.resumes[st.session_state.active_resume]['text'] = resume_text
-        
-        # Process uploaded file
+
+        # Update resume text in session state; while a file is uploaded its extracted text wins
+        if resume_text != stored_text and uploaded_file is None:
+            set_resume_text(resume_id, resume_text)
+
+        # Process uploaded file (once per uploaded file, not on every rerun)
         if uploaded_file is not None:
             try:
-                with st.spinner("Extracting text from file..."):
-                    extracted_text = ResumeProcessor.extract_text_from_file(uploaded_file)
-                    st.session_state.resumes[st.session_state.active_resume]['text'] = extracted_text
-                    st.session_state.resumes[st.session_state.active_resume]['file_name'] = uploaded_file.name
-                    st.success(f"✅ Successfully extracted text from {uploaded_file.name}")
-                    st.text_area("Extracted Text", value=extracted_text, height=200, disabled=True)
-                    # Update resume_text to use the extracted text
-                    resume_text = extracted_text
+                if current_resume.file_id != uploaded_file.file_id:
+                    with st.spinner("Extracting text from file..."):
+                        set_resume_text(resume_id, ResumeProcessor.extract_text_from_file(uploaded_file))
+                        current_resume.file_name = uploaded_file.name
+                        current_resume.file_id = uploaded_file.file_id
+                st.success(f"✅ Successfully extracted text from {uploaded_file.name}")
+                st.text_area("Extracted Text", value=current_resume.text, height=200, disabled=True)
+            except ImportError as e:
+                st.error(f"❌ Missing file reader ({e.name}). Please install with: pip install -r requirements.txt")
+                st.stop()
             except Exception as e:
                 st.error(f"❌ Error processing file: {str(e)}")
                 st.stop()
-        
-        # Use the current resume text from session state for validation
-        final_resume_text = current_resume.get('text', '')
-    
+
     with col2:
         st.header("💼 Job Description")
-        
-        job_description = st.text_area(
+
+        st.text_area(
             "Job Description",
             height=400,
             placeholder="Paste the job description here...",
-            help="Minimum 50 characters required"
+            help="Minimum 50 characters required",
+            key="job_description"
         )
-    
+
+    # Pick up evaluations already stored for this resume and JD (by this or another session);
+    # if that changes the resume's progress, the ARM runner and summary need a full rerun
+    completed_before = current_resume.completed_mask
+    restore_resume_from_store(resume_id, current_resume.text, st.session_state.get('job_description', ''))
+    if current_resume.completed_mask != completed_before:
+        st.rerun()
+
+    # Flag near-duplicates (the text is fingerprinted when it is set, not on every rerun)
+    matches = get_duplicate_matches(current_resume)
+    if matches:
+        duplicate_hash, duplicate_label, similarity = matches[0]
+        source = find_session_resume(duplicate_hash, resume_id)
+        name = source.label if source is not None else duplicate_label or "a previously screened resume"
+        st.warning(f"♻️ This resume looks like a near-duplicate of **{name}** ({similarity:.0%} similar).")
+        job_description = st.session_state.get('job_description', '')
+        reusable = [arm_name for arm_name in get_duplicate_scores(duplicate_hash, source, job_description)
+                    if not current_resume.is_completed(arm_name)]
+        if reusable and job_description.strip() and get_pending_job(resume_id) is None:
+            arm_list = ", ".join(ARM_LABELS[arm_name] for arm_name in ARM_NAMES if arm_name in reusable)
+            if st.button(f"♻️ Reuse its evaluations ({arm_list})", key=f"reuse_duplicate_{resume_id}"):
+                if reuse_duplicate_evaluations(resume_id, duplicate_hash, source, job_description):
+                    st.rerun()
+
+@st.fragment
+@timed_section
+def arm_runner():
+    """Progress status, the analyze/queue buttons and the just-completed result"""
+    resume_id = st.session_state.active_resume
+    current_resume = st.session_state.resumes[resume_id]
+    final_resume_text = current_resume.text
+    completed_arms = current_resume.completed_arms
+    job_description = st.session_state.get('job_description', '')
+
     # Analysis options and button
     st.markdown("---")
-    
+
     col1, col2 = st.columns([2, 1])
     with col1:
         total_required_arms = 4  # ARM D is always enabled
         available_arms = get_available_arms()
         current_arm = available_arms[0]  # Get the current available ARM
-        
+
         # Show progress status
-        if not current_resume['completed_arms']:
+        if not completed_arms:
             st.info("🎯 Start with ARM A: Fast Intuitive Evaluation")
-        elif EvaluationArm.SYSTEM_1.name in current_resume['completed_arms'] and EvaluationArm.SYSTEM_2.name not in current_resume['completed_arms']:
+        elif EvaluationArm.SYSTEM_1.name in completed_arms and EvaluationArm.SYSTEM_2.name not in completed_arms:
             st.success("✅ ARM A complete!")
             st.info("🎯 Now proceed with ARM B: Detailed Rubric-Based Evaluation")
-        elif EvaluationArm.SYSTEM_2.name in current_resume['completed_arms'] and EvaluationArm.SYSTEM_2_PERSONA.name not in current_resume['completed_arms']:
+        elif EvaluationArm.SYSTEM_2.name in completed_arms and EvaluationArm.SYSTEM_2_PERSONA.name not in completed_arms:
             st.success("✅ ARM A & B completed!")
             st.info("🎯 Now proceed with ARM C: Compliance-Focused Evaluation")
-        elif EvaluationArm.SYSTEM_2_PERSONA.name in current_resume['completed_arms'] and EvaluationArm.SYSTEM_2_PERSONA_DEBIAS.name not in current_resume['completed_arms']:
+        elif EvaluationArm.SYSTEM_2_PERSONA.name in completed_arms and EvaluationArm.SYSTEM_2_PERSONA_DEBIAS.name not in completed_arms:
             st.success("✅ ARM A, B & C completed!")
             st.info("🎯 Final step - ARM D: Compliance + Debias Evaluation")
-        elif len(current_resume['completed_arms']) >= total_required_arms:
+        elif len(completed_arms) >= total_required_arms:
             st.success("🎉 All ARMs completed! Full evaluation process finished.")
-        
+
         # If there is a just-completed analysis, show it now (persisted across rerun)
         if st.session_state.get('last_analysis_result') is not None and st.session_state.get('last_analysis_arm') is not None:
             st.markdown("---")
             st.header("📊 Analysis Results")
+            if st.session_state.pop('last_analysis_fallback', False):
+                st.warning("⚠️ The AI analysis encountered an issue, but we're showing you a provisional score instead. The actual score may vary once the API works correctly.")
+                st.info("This is a fallback score. You can try again later when the API is working properly.")
             try:
                 arm_to_display = EvaluationArm[st.session_state['last_analysis_arm']]
-                display_results(st.session_state['last_analysis_result'], arm_to_display, current_resume['label'])
+                display_results(st.session_state['last_analysis_result'], arm_to_display, current_resume.label)
             finally:
                 # Clear after displaying so it doesn't repeat on further reruns
                 del st.session_state['last_analysis_result']
                 del st.session_state['last_analysis_arm']
 
         # Display the current ARM selection
-        evaluation_mode = st.radio(
+        st.radio(
             "Current Evaluation Mode:",
             [current_arm.value],
             help="Complete each ARM in sequence: Fast Intuitive → Rubric-Based → Compliance Check",
             key="arm_selector"
         )
-        
+
         # Just show the divider
         st.markdown("---")
-    
-    # Set button text based on current ARM
-    button_text = "🚀 Start Fast Evaluation (ARM A)"
-    if EvaluationArm.SYSTEM_1.name in current_resume['completed_arms'] and EvaluationArm.SYSTEM_2.name not in current_resume['completed_arms']:
-        button_text = "📊 Run Detailed Analysis (ARM B)"
-    elif EvaluationArm.SYSTEM_2.name in current_resume['completed_arms'] and EvaluationArm.SYSTEM_2_PERSONA.name not in current_resume['completed_arms']:
-        button_text = "⚖️ Run Compliance Check (ARM C)"
-    elif EvaluationArm.SYSTEM_2_PERSONA.name in current_resume['completed_arms'] and EvaluationArm.SYSTEM_2_PERSONA_DEBIAS.name not in current_resume['completed_arms']:
-        button_text = "🧭 Run Compliance + Debias (ARM D)"
-    elif len(current_resume['completed_arms']) >= 4:
-        button_text = "📈 Show Complete Summary"
-
-    if st.button("🚀 Analyze Resume", type="primary"):
+
+    pending_job = get_pending_job(resume_id)
+    next_arm = current_resume.next_arm()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        analyze_clicked = st.button("🚀 Analyze Resume", type="primary", disabled=pending_job is not None)
+    with col2:
+        queue_clicked = st.button(
+            "⏭️ Queue Remaining ARMs",
+            disabled=pending_job is not None or next_arm is None,
+            help="Run every remaining ARM for this resume in the background, in order"
+        )
+
+    if pending_job is not None:
+        st.info(f"⏳ {ARM_LABELS[pending_job.current_arm or pending_job.arm_names[0]]} is running in the background for "
+                f"{pending_job.label}. You can switch resumes and queue more evaluations meanwhile.")
+
+    if analyze_clicked or queue_clicked:
         # Validate inputs
         is_valid, error_msg = validate_inputs(final_resume_text, job_description)
         if not is_valid:
             st.error(f"❌ {error_msg}")
             return
 
-        # Perform analysis
-        try:
-            # Determine which ARM to run based on completion status
-            if EvaluationArm.SYSTEM_1.name not in current_resume['completed_arms']:
-                selected_arm = EvaluationArm.SYSTEM_1
-            elif EvaluationArm.SYSTEM_2.name not in current_resume['completed_arms']:
-                selected_arm = EvaluationArm.SYSTEM_2
-            elif EvaluationArm.SYSTEM_2_PERSONA.name not in current_resume['completed_arms']:
-                selected_arm = EvaluationArm.SYSTEM_2_PERSONA
-            elif EvaluationArm.SYSTEM_2_PERSONA_DEBIAS.name not in current_resume['completed_arms']:
-                selected_arm = EvaluationArm.SYSTEM_2_PERSONA_DEBIAS
-            else:
-                # All ARMs completed, show summary
-                st.success("🎉 All evaluations completed!")
-                return
-
-            spinner_text = "🤖 AI is analyzing your resume..."
-            if selected_arm == EvaluationArm.SYSTEM_2:
-                spinner_text += " (Creating evaluation rubric...)"
-            elif selected_arm == EvaluationArm.SYSTEM_2_PERSONA:
-                spinner_text += " (HR Compliance Officer reviewing...)"
-            elif selected_arm == EvaluationArm.SYSTEM_2_PERSONA_DEBIAS:
-                spinner_text += " (Running compliance + debias analysis...)"
-
-            with st.spinner(spinner_text):
-                analyzer = GeminiAnalyzer(api_key)
-                try:
-                    analysis_result = analyzer.analyze_resume(final_resume_text, job_description, selected_arm)
-                except Exception as e:
-                    error_message = str(e)
-                    # Import the dummy data module
-                    from dummy_data import get_dummy_data_by_arm
-                    
-                    # Get dummy data based on the selected ARM
-                    analysis_result = get_dummy_data_by_arm(selected_arm.name)
-                    
-                    # Add a warning message but don't stop execution
-                    st.warning("⚠️ The AI analysis encountered an issue, but we're showing you a provisional score instead. The actual score may vary once the API works correctly.")
-                    st.info("This is a fallback score. You can try again later when the API is working properly.")
-                    
-                    # Log the actual error for debugging purposes (user won't see this)
-                    print(f"Original error: {error_message}")
-
-            # Display results
-            st.markdown("---")
-            st.header("📊 Analysis Results")
-            display_results(analysis_result, selected_arm)
-
-            # Add current ARM to completed ARMs
-            current_resume['completed_arms'].add(selected_arm.name)
-            
-            # Update ARM scores in the current resume data
-            if 'arm_scores' not in current_resume:
-                current_resume['arm_scores'] = {}
-            
-            # Extract score based on ARM type
-            if selected_arm == EvaluationArm.SYSTEM_1:
-                # ARM A has score at root level
-                score = analysis_result.get('fit_score_1_to_5', 0)
-            else:
-                # ARM B, C, D have score in evaluation section
-                score = analysis_result.get('evaluation', {}).get('fit_score_1_to_5', 0)
-            
-            current_resume['arm_scores'][selected_arm.name] = score
+        if next_arm is None:
+            # All ARMs completed, show summary
+            st.success("🎉 All evaluations completed!")
+            return
 
-            # Additional resources
-            st.markdown("---")
-            st.subheader("🛠️ Additional Resources")
-
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.markdown("[📝 Resume Builder](https://www.canva.com/resumes/)")
-            with col2:
-                st.markdown("[💼 Job Search Tips](https://www.indeed.com/career-advice)")
-            with col3:
-                st.markdown("[🎯 Interview Prep](https://www.glassdoor.com/blog/interview-prep/)")
-            current_resume['analysis_results'][selected_arm.name] = analysis_result
-
-            # Persist the analysis so we can show it right after rerun
-            st.session_state['last_analysis_result'] = analysis_result
-            st.session_state['last_analysis_arm'] = selected_arm.name
-
-            # Immediately refresh so the next ARM is enabled and analysis is shown without extra click
-            # Only rerun if there are remaining ARMs; otherwise continue to show final summary
-            if len(current_resume['completed_arms']) < total_required_arms:
-                st.rerun()
-            
-            # Show completion message and next steps
-            if len(current_resume['completed_arms']) < total_required_arms:
-                if len(current_resume['completed_arms']) == 1:
-                    next_arm = "ARM B"
-                elif len(current_resume['completed_arms']) == 2:
-                    next_arm = "ARM C"
-                elif len(current_resume['completed_arms']) == 3:
-                    next_arm = "ARM D"
-                st.success(f"✅ Analysis complete! The next step ({next_arm}) is now available.")
-                st.info(f"Next stage: {next_arm} is now available.")
+        # The next ARM only, or it and every ARM after it
+        arm_names = [next_arm] if analyze_clicked else list(ARM_NAMES[ARM_NAMES.index(next_arm):])
+        submit_evaluation(resume_id, arm_names, job_description)
+
+        # Full rerun so the job monitor starts polling
+        st.rerun()
+
+    # Additional resources
+    st.markdown("---")
+    st.subheader("🛠️ Additional Resources")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("[📝 Resume Builder](https://www.canva.com/resumes/)")
+    with col2:
+        st.markdown("[💼 Job Search Tips](https://www.indeed.com/career-advice)")
+    with col3:
+        st.markdown("[🎯 Interview Prep](https://www.glassdoor.com/blog/interview-prep/)")
+
+@timed_section
+def job_monitor():
+    """Apply ARMs finished by this session's background jobs and list the jobs"""
+    jobs = session_jobs()
+    needs_rerun = False
+    for job in jobs:
+        for outcome in job.uncollected():
+            if not apply_job_outcome(job, outcome):
+                continue
+            needs_rerun = True
+            if job.resume_id == st.session_state.active_resume:
+                st.session_state['last_analysis_result'] = outcome.result
+                st.session_state['last_analysis_arm'] = outcome.arm_name
+                st.session_state['last_analysis_fallback'] = outcome.fallback
             else:
-                # All ARMs completed - just show success message, summary will be displayed outside button handler
-                st.success("🎉 Congratulations! You've completed all evaluation ARMs.")
-                st.info("📈 Scroll down to see your complete evaluation summary with charts!")
-            
-        except Exception as e:
-                
-                # Display current progress
-                st.markdown(f"### 🎯 Evaluation Progress for {current_resume['label']}")
-                st.markdown("""
-                <style>
-                .progress-box {
-                    padding: 10px;
-                    border-radius: 5px;
-                    margin: 5px 0;
-                    background-color: #f8f9fa;
-                    border-left: 4px solid #28a745;
-                    color: #333333;  /* Dark gray text for better contrast */
-                    font-weight: 500;  /* Slightly bolder text */
-                }
-                .progress-title {
-                    color: #1f2937;  /* Dark color for the title */
-                    font-size: 1.2em;
-                    margin-bottom: 10px;
-                }
-                </style>
-                """, unsafe_allow_html=True)
-                
-                arms_and_scores = [
-                    ('SYSTEM_1', score_a),
-                    ('SYSTEM_2', score_b),
-                    ('SYSTEM_2_PERSONA', score_c),
-                    ('SYSTEM_2_PERSONA_DEBIAS', score_d)
-                ]
-                for arm_name, score in arms_and_scores:
-                    if arm_name in current_resume['completed_arms']:
-                        st.markdown(f"""
-                        <div class="progress-box">
-                            <span style="color: #333333;">✅ {EvaluationArm[arm_name].value}: Score {score:.2f}/5</span>
-                        </div>
-                        """, unsafe_allow_html=True)
-                
-                # Create score progression chart
-                st.markdown("### 📈 Score Progression Chart")
-                
-                # Prepare data for plotting
-                arm_labels = ['ARM A', 'ARM B', 'ARM C', 'ARM D']
-                scores = [score_a, score_b, score_c, score_d]
-                
-                # Validate scores
-                if all(isinstance(score, (int, float)) for score in scores):
-                    # Create chart data with proper index
-                    chart_data = pd.DataFrame({
-                        'Score': scores
-                    }, index=arm_labels)
-                    
-                    # Add metrics to show exact scores
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("ARM A", f"{score_a:.2f}/5")
-                    with col2:
-                        st.metric("ARM B", f"{score_b:.2f}/5")
-                    with col3:
-                        st.metric("ARM C", f"{score_c:.2f}/5")
-                    with col4:
-                        st.metric("ARM D", f"{score_d:.2f}/5")
-                    
-                    # Display the line chart
-                    try:
-                        st.line_chart(
-                            chart_data,
-                            use_container_width=True,
-                            height=400
-                        )
-                    except Exception as chart_error:
-                        st.error(f"Error displaying chart: {chart_error}")
-                        st.write("Chart data:", chart_data)
-                        
-                    # Add reference line explanation
-                    st.markdown("""
-                    <div style="text-align: right; color: gray; font-style: italic; margin-top: 10px; margin-bottom: 20px;">
-                        Maximum Score: 5.0
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.error("Invalid score data detected. Chart cannot be displayed.")
-                    st.write("Scores:", scores)
-                
-                # Create downloadable summary
-                st.markdown("---")
-                st.markdown("### 📥 Download Evaluation Summary")
-                
-                # Generate HTML summary
-                html_summary = f"""
-                <html>
-                <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; padding: 20px; }}
-                    .header {{ text-align: center; color: #1f77b4; margin-bottom: 30px; }}
-                    .score-box {{ 
-                        background-color: #f8f9fa;
-                        border-left: 4px solid #007bff;
-                        padding: 15px;
-                        margin: 10px 0;
-                        border-radius: 5px;
-                    }}
-                    .final-summary {{
-                        background-color: #e9ecef;
-                        padding: 20px;
-                        border-radius: 5px;
-                        margin-top: 20px;
-                    }}
-                </style>
-                </head>
-                <body>
-                    <div class="header">
-                        <h1>Resume Evaluation Summary</h1>
-                        <h2>{current_resume['label']}</h2>
-                        <p>Generated on {datetime.now().strftime("%Y-%m-%d %H:%M")}</p>
-                    </div>
-                    
-                    <h2>Evaluation Results</h2>
-                    
-                    <div class="score-box">
-                        <h3>ARM A: Quick Insights Evaluation</h3>
-                        <p><strong>Score:</strong> {score_a:.2f}/5</p>
-                        <p>Initial assessment based on key resume elements</p>
-                    </div>
-                    
-                    <div class="score-box">
-                        <h3>ARM B: Detailed Rubric-Based Evaluation</h3>
-                        <p><strong>Score:</strong> {score_b:.2f}/5</p>
-                        <p>Systematic evaluation using weighted criteria and evidence</p>
-                    </div>
-                    
-                    <div class="score-box">
-                        <h3>ARM C: Compliance-Focused Evaluation</h3>
-                        <p><strong>Score:</strong> {score_c:.2f}/5</p>
-                        <p>HR compliance assessment ensuring fair evaluation</p>
-                    </div>
-                    
-                    <div class="score-box">
-                        <h3>ARM D: Compliance + Debias Evaluation</h3>
-                        <p><strong>Score:</strong> {score_d:.2f}/5</p>
-                        <p>Compliance review with bias mitigation</p>
-                    </div>
-                    
-                    <div class="final-summary">
-                        <h2>Overall Assessment</h2>
-                        <p><strong>Average Score:</strong> {sum([score_a, score_b, score_c, score_d])/4:.2f}/5</p>
-                        <p><strong>Score Consistency:</strong> {
-                        'High' if max([score_a, score_b, score_c, score_d]) - min([score_a, score_b, score_c, score_d]) < 0.5 
-                        else 'Moderate' if max([score_a, score_b, score_c, score_d]) - min([score_a, score_b, score_c, score_d]) < 1 
-                        else 'Variable'}</p>
-                        <p><strong>Final Recommendation:</strong> {
-                        '✅ Strongly Recommended' if sum([score_a, score_b, score_c, score_d])/4 >= 4.5 
-                        else '✅ Recommended' if sum([score_a, score_b, score_c, score_d])/4 >= 4.0 
-                        else '⚠️ Consider with Reservations' if sum([score_a, score_b, score_c, score_d])/4 >= 3.0 
-                        else '❌ Not Recommended'}</p>
-                    </div>
-                </body>
-                </html>
-                """
-                
-                # Create download button
-                st.download_button(
-                    label="📄 Download Complete Evaluation Report",
-                    data=html_summary,
-                    file_name=f"resume_evaluation_{current_resume['label'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.html",
-                    mime="text/html",
-                )
+                st.toast(f"✅ {ARM_LABELS[outcome.arm_name]} finished for {job.label}")
+        if not job.pending and job.job_id not in st.session_state.jobs_seen_finished:
+            # Finishing (even without results) changes which buttons are enabled and stops polling
+            st.session_state.jobs_seen_finished.add(job.job_id)
+            needs_rerun = True
 
-                st.markdown("### 📊 Complete Evaluation Summary")
-                
-                # ARM A Summary
-                st.markdown("### ARM A: Quick Insights Evaluation")
-                st.markdown(f"""
-                <div class="recommendation-box">
-                    <h4>Quick Insights Score: {score_a}/5</h4>
-                    <p>Initial assessment based on key resume elements</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.markdown("### ARM B: Detailed Rubric-Based Evaluation")
-                st.markdown(f"""
-                <div class="recommendation-box">
-                    <h4>Detailed Evaluation Score: {score_b}/5</h4>
-                    <p>Systematic evaluation using weighted criteria and evidence</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.markdown("### ARM C: Compliance-Focused Evaluation")
-                st.markdown(f"""
-                <div class="recommendation-box">
-                    <h4>Compliance-Verified Score: {score_c}/5</h4>
-                    <p>HR compliance assessment ensuring fair evaluation</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.markdown("### ARM D: Compliance + Debias Evaluation")
-                st.markdown(f"""
-                <div class="recommendation-box">
-                    <h4>Debiased Compliance Score: {score_d}/5</h4>
-                    <p>Compliance review with bias mitigation</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Score Progression Analysis
-                st.markdown("### 📈 Score Progression Analysis")
-                scores = [score_a, score_b, score_c, score_d]
-                avg_score = sum(scores) / len(scores)
-                variance = max(scores) - min(scores)
-                
-                st.markdown("""
-                <div class="recommendation-box">
-                    <h4 style="color: #000000;">Overall Assessment</h4>
-                """, unsafe_allow_html=True)
-                
-                st.markdown(f"Average Score: {avg_score:.1f}/5\n")
-                st.markdown(f"\nScore Consistency: {'High' if variance < 0.5 else 'Moderate' if variance < 1 else 'Variable'} (variance: {variance:.1f} points)")
-                
-                # Determine recommendation based on average score
-                recommendation = ('✅ Strongly Recommended' if avg_score >= 4.5 else
-                                '✅ Recommended' if avg_score >= 4.0 else
-                                '⚠️ Consider with Reservations' if avg_score >= 3.0 else
-                                '❌ Not Recommended')
-                
-                st.markdown(f"\nFinal Recommendation: {recommendation}")
-                
-                st.markdown("</div>", unsafe_allow_html=True)
-                st.markdown("---")
-                
-                if st.button("📊 Show Complete Evaluation Summary", type="primary"):
-                    st.markdown("### ARM A: Quick Insights Evaluation")
-                    st.markdown(f"""
-                    <div class="recommendation-box">
-                        <h4>Quick Insights Score: {score_a}/5</h4>
-                        <p>Initial assessment based on key resume elements</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.markdown("### ARM B: Detailed Rubric-Based Evaluation")
-                    st.markdown(f"""
-                    <div class="recommendation-box">
-                        <h4>Detailed Evaluation Score: {score_b}/5</h4>
-                        <p>Systematic evaluation using weighted criteria and evidence</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.markdown("### ARM C: Compliance-Focused Evaluation")
-                    st.markdown(f"""
-                    <div class="recommendation-box">
-                        <h4>Compliance-Verified Score: {score_c}/5</h4>
-                        <p>HR compliance assessment ensuring fair evaluation</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    st.markdown("### ARM D: Compliance + Debias Evaluation")
-                    st.markdown(f"""
-                    <div class="recommendation-box">
-                        <h4>Debiased Compliance Score: {score_d}/5</h4>
-                        <p>Compliance review with bias mitigation</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.markdown("---")
-                    st.markdown("### 📈 Overall Evaluation Summary")
-                    scores = [score_a, score_b, score_c, score_d]
-                    avg_score = sum(scores) / len(scores)
-                    variance = max(scores) - min(scores)
-                    
-                    st.markdown(f"""
-                    <div class="recommendation-box">
-                        <h4 style="color: #000000;">Overall Assessment</h4>
-                        <p><strong>Average Score:</strong> {avg_score:.1f}/5</p>
-                        <p><strong>Score Consistency:</strong> {
-                        'High' if variance < 0.5 else 'Moderate' if variance < 1 else 'Variable'
-                        } (variance: {variance:.1f} points)</p>
-                        <p><strong>Final Recommendation:</strong> {
-                        '✅ Strongly Recommended' if avg_score >= 4.5 else
-                        '✅ Recommended' if avg_score >= 4.0 else
-                        '⚠️ Consider with Reservations' if avg_score >= 3.0 else
-                        '❌ Not Recommended'
-                        }</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-        except Exception as e:
-            st.error(f"❌ Analysis failed: {str(e)}")
-            
-            # Provide troubleshooting tips
-            st.markdown("### 🔧 Troubleshooting Tips")
+    # Keep pending jobs and the last few finished ones
+    finished = [job.job_id for job in jobs if not job.pending]
+    keep = set(finished[-FINISHED_JOBS_SHOWN:]) | {job.job_id for job in jobs if job.pending}
+    st.session_state.job_ids = [job.job_id for job in jobs if job.job_id in keep]
+
+    if needs_rerun:
+        # Progress, sidebar, leaderboard and summary all change: refresh the whole page
+        st.rerun()
+
+    visible = [job for job in jobs if job.job_id in keep]
+    if not visible:
+        return
+
+    st.markdown("### ⏳ Background Evaluations")
+    for job in reversed(visible):
+        arms = ", ".join(ARM_LABELS[arm_name] for arm_name in job.arm_names)
+        if job.pending:
+            running = f" · running {ARM_LABELS[job.current_arm]}" if job.current_arm else " · queued"
+            st.markdown(f"⏳ **{job.label}**: {arms}{running} ({job.elapsed_s():.0f}s)")
+        elif job.error:
+            st.error(f"❌ {job.label}: {arms} failed after {len(job.outcomes)} ARM(s): {job.error}")
             st.markdown("""
             - Check your API key is correct and has sufficient quota
             - Ensure your resume and job description are substantial enough
             - Try reducing the text length if it's very long
             - Check your internet connection
             """)
-    
-    # Display summary if all ARMs are completed (outside the button handler)
-    if len(current_resume['completed_arms']) >= 4:
-        st.success("🎉 Congratulations! You've completed all evaluation ARMs.")
-        st.markdown("---")
-        
-        # Get the actual stored scores from each ARM for current resume
-        score_a = current_resume['arm_scores'].get('SYSTEM_1', 0)
-        score_b = current_resume['arm_scores'].get('SYSTEM_2', 0)
-        score_c = current_resume['arm_scores'].get('SYSTEM_2_PERSONA', 0)
-        score_d = current_resume['arm_scores'].get('SYSTEM_2_PERSONA_DEBIAS', 0)
-        
-        # Display current progress
-        st.markdown(f"### 🎯 Final Evaluation Summary for {current_resume['label']}")
-        
-        # Create score progression chart
-        st.markdown("### 📈 Score Progression Chart")
-        
-        # Prepare data for plotting
-        arm_labels = ['ARM A', 'ARM B', 'ARM C', 'ARM D']
-        scores = [score_a, score_b, score_c, score_d]
-        
-        # Validate scores
-        if all(isinstance(score, (int, float)) for score in scores):
-            # Create chart data with proper index
-            chart_data = pd.DataFrame({
-                'Score': scores
-            }, index=arm_labels)
-            
-            # Add metrics to show exact scores
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("ARM A", f"{score_a:.2f}/5")
-            with col2:
-                st.metric("ARM B", f"{score_b:.2f}/5")
-            with col3:
-                st.metric("ARM C", f"{score_c:.2f}/5")
-            with col4:
-                st.metric("ARM D", f"{score_d:.2f}/5")
-            
-            # Display the line chart
-            try:
-                st.line_chart(
-                    chart_data,
-                    width="stretch",
-                    height=400
-                )
-                
-                # Add reference line explanation
-                st.markdown("""
-                <div style="text-align: right; color: gray; font-style: italic; margin-top: 10px; margin-bottom: 20px;">
-                    Maximum Score: 5.0
-                </div>
-                """, unsafe_allow_html=True)
-            except Exception as chart_error:
-                st.error(f"Error displaying chart: {chart_error}")
-                st.write("Chart data:", chart_data)
         else:
-            st.error("Invalid score data detected. Chart cannot be displayed.")
-            st.write("Scores:", scores)
-        
-        # Overall assessment
-        avg_score = sum(scores) / len(scores) if scores else 0
-        variance = max(scores) - min(scores) if scores else 0
-        
-        st.markdown("### 📊 Overall Assessment")
-        
-        col1, col2, col3 = st.columns(3)
+            fallback_note = " (provisional scores)" if any(o.fallback for o in job.outcomes) else ""
+            st.markdown(f"✅ **{job.label}**: {arms} done in {job.elapsed_s():.1f}s{fallback_note}")
+
+@st.fragment
+@timed_section
+def evaluation_summary():
+    """Final summary with charts once all four ARMs are complete for the active resume"""
+    current_resume = st.session_state.resumes[st.session_state.active_resume]
+    if current_resume.completed_mask != ALL_ARMS_MASK:
+        return
+
+    st.success("🎉 Congratulations! You've completed all evaluation ARMs.")
+    st.markdown("---")
+
+    # Get the actual stored scores from each ARM for current resume
+    score_a = current_resume.fit_score('SYSTEM_1')
+    score_b = current_resume.fit_score('SYSTEM_2')
+    score_c = current_resume.fit_score('SYSTEM_2_PERSONA')
+    score_d = current_resume.fit_score('SYSTEM_2_PERSONA_DEBIAS')
+
+    # Display current progress
+    st.markdown(f"### 🎯 Final Evaluation Summary for {current_resume.label}")
+
+    # Create score progression chart
+    st.markdown("### 📈 Score Progression Chart")
+    import pandas as pd
+
+    # Prepare data for plotting
+    arm_labels = ['ARM A', 'ARM B', 'ARM C', 'ARM D']
+    scores = [score_a, score_b, score_c, score_d]
+
+    # Validate scores
+    if all(isinstance(score, (int, float)) for score in scores):
+        # Create chart data with proper index
+        chart_data = pd.DataFrame({
+            'Score': scores
+        }, index=arm_labels)
+
+        # Add metrics to show exact scores
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Average Score", f"{avg_score:.2f}/5")
+            st.metric("ARM A", f"{score_a:.2f}/5")
         with col2:
-            consistency = 'High' if variance < 0.5 else 'Moderate' if variance < 1 else 'Variable'
-            st.metric("Consistency", consistency)
+            st.metric("ARM B", f"{score_b:.2f}/5")
         with col3:
-            recommendation = ('✅ Strongly Recommended' if avg_score >= 4.5 else
-                            '✅ Recommended' if avg_score >= 4.0 else
-                            '⚠️ Consider with Reservations' if avg_score >= 3.0 else
-                            '❌ Not Recommended')
-            st.metric("Recommendation", recommendation.split(' ', 1)[1])
+            st.metric("ARM C", f"{score_c:.2f}/5")
+        with col4:
+            st.metric("ARM D", f"{score_d:.2f}/5")
+
+        # Display the line chart
+        try:
+            st.line_chart(
+                chart_data,
+                width="stretch",
+                height=400
+            )
+
+            # Add reference line explanation
+            st.markdown("""
+            <div style="text-align: right; color: gray; font-style: italic; margin-top: 10px; margin-bottom: 20px;">
+                Maximum Score: 5.0
+            </div>
+            """, unsafe_allow_html=True)
+        except Exception as chart_error:
+            st.error(f"Error displaying chart: {chart_error}")
+            st.write("Chart data:", chart_data)
+    else:
+        st.error("Invalid score data detected. Chart cannot be displayed.")
+        st.write("Scores:", scores)
+        return
+
+    # Overall assessment
+    avg_score = sum(scores) / len(scores) if scores else 0
+    variance = max(scores) - min(scores) if scores else 0
+
+    st.markdown("### 📊 Overall Assessment")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Average Score", f"{avg_score:.2f}/5")
+    with col2:
+        consistency = 'High' if variance < 0.5 else 'Moderate' if variance < 1 else 'Variable'
+        st.metric("Consistency", consistency)
+    with col3:
+        recommendation = ('✅ Strongly Recommended' if avg_score >= 4.5 else
+                        '✅ Recommended' if avg_score >= 4.0 else
+                        '⚠️ Consider with Reservations' if avg_score >= 3.0 else
+                        '❌ Not Recommended')
+        st.metric("Recommendation", recommendation.split(' ', 1)[1])
+
+    # Create downloadable summary
+    st.markdown("---")
+    st.markdown("### 📥 Download Evaluation Summary")
+    # Built only when the button is clicked, on a separate thread
+    candidate = export_candidate(st.session_state.active_resume, current_resume, st.session_state.get('job_description', ''))
+    st.download_button(
+        label="📄 Download Complete Evaluation Report",
+        data=lambda: build_candidate_report(candidate['label'], candidate['scores'],
+                                            {arm_name: candidate['load_result'](arm_name) for arm_name in candidate['scores']}),
+        file_name=f"resume_evaluation_{current_resume.label.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.html",
+        mime="text/html",
+    )
+
+def main():
+    """Main application function"""
+
+    # Header
+    st.markdown("""
+    <div class="main-header">
+        <h1>📄 Resume Scorer AI</h1>
+        <p>Analyze your resume against job descriptions using Google's Gemini AI</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Sidebar (fragments write to the sidebar by being called inside it)
+    with st.sidebar:
+        sidebar_manager()
+        if tracer.enabled:
+            trace_panel()
+        sidebar_help()
+
+    if len(st.session_state.resumes) > 1:
+        leaderboard_panel()
+        search_panel()
+        if 'analytics' in st.session_state and len(st.session_state.analytics) > 1:
+            analytics_panel()
+    export_panel()
+
+    input_panel()
+
+    # Poll only while this session has jobs running
+    polling = any(job.pending for job in session_jobs())
+    st.fragment(run_every=JOB_POLL_SECONDS if polling else None)(job_monitor)()
+
+    arm_runner()
+    evaluation_summary()
 
 if __name__ == "__main__":
-    main()
+    with tracer.trace('rerun', st.session_state.trace_owner):
+        main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Headless batch scoring: run the evaluation ARMs over a directory of resumes
+without Streamlit and stream one result row per resume to JSONL or Parquet.
+
+Usage:
+    python batch_score.py --jd job.txt --resumes ./pool --out results.jsonl --arms A,B,C,D
+    python batch_score.py --jd job.txt --resumes ./pool --out results.jsonl --cascade cascade.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from cascade import CascadePolicy
+from resume_analyzer import (
+    EvaluationArm,
+    GeminiAnalyzer,
+    ResumeProcessor,
+    get_fit_score,
+    get_shortlist_recommend,
+    job_description_hash,
+    resume_content_hash,
+    validate_inputs,
+)
+from result_store import ResultStore
+from telemetry import telemetry
+
+ARM_ALIASES = {
+    'A': EvaluationArm.SYSTEM_1,
+    'B': EvaluationArm.SYSTEM_2,
+    'C': EvaluationArm.SYSTEM_2_PERSONA,
+    'D': EvaluationArm.SYSTEM_2_PERSONA_DEBIAS,
+}
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+PARQUET_BATCH_SIZE = 256
+
+
+def parse_arms(value: str) -> List[EvaluationArm]:
+    """Parse 'A,B,D' or enum names into ARMs, kept in evaluation order"""
+    arms = set()
+    for token in value.split(','):
+        token = token.strip()
+        if not token:
+            continue
+        key = token.upper().replace('ARM', '').strip()
+        if key in ARM_ALIASES:
+            arms.add(ARM_ALIASES[key])
+        elif token.upper() in EvaluationArm.__members__:
+            arms.add(EvaluationArm[token.upper()])
+        else:
+            raise argparse.ArgumentTypeError(f"Unknown ARM: {token}")
+    if not arms:
+        raise argparse.ArgumentTypeError("At least one ARM is required")
+    return [arm for arm in EvaluationArm if arm in arms]
+
+
+def find_resumes(directory: str) -> List[str]:
+    """All PDF/DOCX files under a directory, in a stable order"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def extract_one(path: str) -> Tuple[str, str, str]:
+    """Extract one file; runs in a worker process so errors are returned, not raised"""
+    try:
+        return path, ResumeProcessor.extract_text_from_path(path), ''
+    except Exception as e:
+        return path, '', str(e)
+
+
+def score_one(analyzer: GeminiAnalyzer, path: str, resume_text: str, job_description: str,
+              arms: List[EvaluationArm], incremental: bool = True, cascade: Optional[CascadePolicy] = None) -> Dict:
+    """Run the selected ARMs on one resume and build its result row
+
+    With a cascade policy its stages are run instead of arms, stopping at the
+    first gate the resume does not pass (unless it is in the calibration sample).
+    """
+    start = time.perf_counter()
+    resume_hash = resume_content_hash(resume_text)
+    calibration = cascade is not None and cascade.in_calibration(resume_hash)
+    stages = cascade.stages if cascade is not None else []
+    if cascade is not None:
+        arms = cascade.arms
+    analysis_results = {}
+    errors = {}
+    exited_after = None
+    for index, arm in enumerate(arms):
+        base_result = None
+        if incremental and arm in [EvaluationArm.SYSTEM_2_PERSONA, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]:
+            base_result = analysis_results.get(EvaluationArm.SYSTEM_2.name)
+        try:
+            analysis_results[arm.name] = analyzer.analyze_resume(resume_text, job_description, arm, base_result=base_result)
+        except Exception as e:
+            errors[arm.name] = str(e)
+            continue
+        if stages and not calibration and index < len(stages) - 1:
+            result = analysis_results[arm.name]
+            if not stages[index].advances(get_fit_score(result, arm), get_shortlist_recommend(result, arm)):
+                exited_after = arm.name
+                break
+
+    row = {
+        'file': path,
+        'resume_hash': resume_hash,
+        'jd_hash': job_description_hash(job_description),
+        'arm_scores': {name: get_fit_score(result, EvaluationArm[name]) for name, result in analysis_results.items()},
+        'shortlist': {name: get_shortlist_recommend(result, EvaluationArm[name]) for name, result in analysis_results.items()},
+        'analysis_results': analysis_results,
+        'errors': errors,
+        'elapsed_s': round(time.perf_counter() - start, 3),
+    }
+    if cascade is not None:
+        row['cascade'] = {'exited_after': exited_after, 'calibration': calibration,
+                          'arms_run': len(analysis_results) + len(errors)}
+    return row
+
+
+class JsonlResultWriter:
+    """Appends one JSON object per resume, flushing as rows arrive"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row: Dict):
+        self.file.write(json.dumps(row) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetResultWriter:
+    """Writes flattened rows to Parquet in small row groups"""
+
+    def __init__(self, path: str, arms: List[EvaluationArm], cascade: bool = False):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow. Please install with: pip install pyarrow")
+        self.pa = pa
+        fields = [
+            pa.field('file', pa.string()),
+            pa.field('resume_hash', pa.string()),
+            pa.field('jd_hash', pa.string()),
+        ]
+        for arm in arms:
+            fields.append(pa.field(f'score_{arm.name}', pa.float64()))
+            fields.append(pa.field(f'shortlist_{arm.name}', pa.bool_()))
+        fields += [
+            pa.field('errors', pa.string()),
+            pa.field('analysis_results', pa.string()),
+            pa.field('elapsed_s', pa.float64()),
+        ]
+        if cascade:
+            fields.append(pa.field('cascade', pa.string()))
+        self.schema = pa.schema(fields)
+        self.arms = arms
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.buffer = []
+
+    def write(self, row: Dict):
+        flat = {
+            'file': row['file'],
+            'resume_hash': row['resume_hash'],
+            'jd_hash': row['jd_hash'],
+            'errors': json.dumps(row['errors']),
+            'analysis_results': json.dumps(row['analysis_results']),
+            'elapsed_s': row['elapsed_s'],
+        }
+        if 'cascade' in self.schema.names:
+            flat['cascade'] = json.dumps(row.get('cascade'))
+        for arm in self.arms:
+            score = row['arm_scores'].get(arm.name)
+            flat[f'score_{arm.name}'] = float(score) if score is not None else None
+            flat[f'shortlist_{arm.name}'] = row['shortlist'].get(arm.name)
+        self.buffer.append(flat)
+        if len(self.buffer) >= PARQUET_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.writer.write_table(self.pa.Table.from_pylist(self.buffer, schema=self.schema))
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class ProgressBar:
+    """Minimal single-line progress bar on stderr"""
+
+    def __init__(self, total: int, enabled: bool = True, width: int = 30):
+        self.total = max(total, 1)
+        self.enabled = enabled
+        self.width = width
+        self.done = 0
+        self.start = time.perf_counter()
+
+    def update(self, count: int = 1):
+        self.done += count
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        filled = int(self.width * self.done / self.total)
+        bar = '#' * filled + '-' * (self.width - filled)
+        sys.stderr.write(f"\r[{bar}] {self.done}/{self.total} {rate:.2f} resumes/s")
+        sys.stderr.flush()
+
+    def close(self):
+        if self.enabled:
+            sys.stderr.write('\n')
+
+
+def run_batch(job_description: str, paths: List[str], analyzer: GeminiAnalyzer, arms: List[EvaluationArm],
+              writer, workers: int = 4, concurrency: int = 8, incremental: bool = True,
+              progress: bool = True, store: Optional[ResultStore] = None,
+              cascade: Optional[CascadePolicy] = None) -> Dict:
+    """Extract in a process pool, score with bounded concurrency and stream rows to writer
+
+    When a store is given, each resume's ARM results are also saved to it in
+    one transaction so the Streamlit app can pick them up. With a cascade
+    policy the summary includes its report.
+    """
+    start = time.perf_counter()
+    bar = ProgressBar(len(paths), enabled=progress)
+    summary = {'resumes': len(paths), 'scored': 0, 'extraction_failures': 0, 'invalid': 0, 'arm_failures': 0}
+    # A slot is taken before a resume is submitted for extraction and freed once it is written, so
+    # extracted text never piles up ahead of the LLM pool: enough resumes are in flight to keep
+    # every LLM thread and extraction worker busy, with one more batch queued for the LLM
+    slots = threading.BoundedSemaphore(concurrency * 2 + workers)
+    write_lock = threading.Lock()
+    cascade_rows = []
+
+    def finish(row: Dict, outcome: Optional[str] = None):
+        if store is not None and row['analysis_results']:
+            store.save_evaluations([{
+                'resume_hash': row['resume_hash'], 'jd_hash': row['jd_hash'], 'arm': arm_name, 'result': result,
+                'score': row['arm_scores'].get(arm_name), 'shortlist': row['shortlist'].get(arm_name),
+                'label': os.path.basename(row['file']),
+            } for arm_name, result in row['analysis_results'].items()])
+        with write_lock:
+            writer.write(row)
+            if outcome is not None:
+                summary[outcome] += 1
+            if outcome == 'scored':
+                summary['arm_failures'] += len(row['errors'])
+                if 'cascade' in row:
+                    cascade_rows.append({k: row[k] for k in ('arm_scores', 'shortlist', 'cascade')})
+            bar.update()
+
+    def skipped_row(path: str, text: str, reason: str, error: str) -> Dict:
+        return {'file': path, 'resume_hash': resume_content_hash(text) if text else '',
+                'jd_hash': job_description_hash(job_description), 'arm_scores': {}, 'shortlist': {},
+                'analysis_results': {}, 'errors': {reason: error}, 'elapsed_s': 0.0}
+
+    def score_and_release(extraction: Future):
+        try:
+            path, text, error = extraction.result()
+            if error:
+                finish(skipped_row(path, text, 'extraction', error), 'extraction_failures')
+                return
+            is_valid, error_msg = validate_inputs(text, job_description)
+            if not is_valid:
+                finish(skipped_row(path, text, 'validation', error_msg), 'invalid')
+                return
+            finish(score_one(analyzer, path, text, job_description, arms, incremental, cascade), 'scored')
+        finally:
+            slots.release()
+
+    pending = []
+    with ThreadPoolExecutor(max_workers=concurrency) as llm_pool:
+        with ProcessPoolExecutor(max_workers=workers) as extract_pool:
+            for path in paths:
+                slots.acquire()
+                extraction = extract_pool.submit(extract_one, path)
+                # Hand the text to the LLM pool as soon as it is extracted, in completion order
+                extraction.add_done_callback(lambda f: pending.append(llm_pool.submit(score_and_release, f)))
+        # Leaving the extraction pool ran every done callback, so pending is complete
+        for future in pending:
+            future.result()
+
+    bar.close()
+    summary['wall_s'] = round(time.perf_counter() - start, 2)
+    summary['resumes_per_min'] = round(summary['resumes'] / summary['wall_s'] * 60, 1) if summary['wall_s'] else 0.0
+    if cascade is not None:
+        summary['cascade'] = cascade.report(cascade_rows)
+    return summary
+
+
+def print_summary(summary: Dict, out=sys.stderr):
+    """Human-readable throughput summary with per-ARM latency from telemetry"""
+    out.write(
+        f"Scored {summary['scored']}/{summary['resumes']} resumes in {summary['wall_s']}s "
+        f"({summary['resumes_per_min']} resumes/min); "
+        f"{summary['extraction_failures']} extraction failures, {summary['invalid']} too short, "
+        f"{summary['arm_failures']} failed ARM calls\n"
+    )
+    for row in telemetry.summary():
+        out.write(
+            f"  {row['arm']}: {row['calls']} calls, p50 {row['p50_s']}s, p95 {row['p95_s']}s, "
+            f"{row['input_tokens']} in / {row['output_tokens']} out tokens, ${row['cost_usd']:.4f}\n"
+        )
+    report = summary.get('cascade')
+    if report:
+        exits = ', '.join(f"{count} after {name}" for name, count in report['exits'].items())
+        out.write(
+            f"Cascade: {report['arm_runs']}/{report['arm_runs_without_cascade']} ARM runs "
+            f"({report['arm_runs_saved']} saved, {report['saved_pct']}%); exits: {exits}\n"
+            f"  Calibration: {report['calibration_sample']} resumes ran every ARM; "
+            f"{report['calibration_would_exit']} would have exited early, {report['calibration_flips']} of them "
+            f"with a different shortlist decision ({report['calibration_missed_shortlists']} missed shortlists, "
+            f"flip rate {report['flip_rate']:.1%}, ~{report['estimated_flips_among_exited']} among exited resumes)\n"
+        )
+
+
+def load_cascade(value: str) -> CascadePolicy:
+    try:
+        return CascadePolicy.load(value)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"Invalid cascade policy: {e}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Score a directory of PDF/DOCX resumes against one job description.")
+    parser.add_argument('--jd', required=True, help="Path to a text file with the job description")
+    parser.add_argument('--resumes', required=True, help="Directory of PDF/DOCX resumes (searched recursively)")
+    parser.add_argument('--out', required=True, help="Output file; .parquet writes Parquet, anything else JSONL")
+    parser.add_argument('--arms', type=parse_arms, default=parse_arms('A,B,C,D'),
+                        help="Comma-separated ARMs to run, e.g. A,B or SYSTEM_2 (default: A,B,C,D)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Extraction processes")
+    parser.add_argument('--concurrency', type=int, default=8, help="Maximum concurrent resumes being scored")
+    parser.add_argument('--cascade', type=load_cascade, default=None,
+                        help="Cascade early-exit policy: a JSON file, inline JSON or 'default' (overrides --arms)")
+    parser.add_argument('--full-rescore', action='store_true',
+                        help="Run ARM C/D from scratch instead of layering them on ARM B results")
+    parser.add_argument('--store', default=None, help="Also save results to this SQLite result store")
+    parser.add_argument('--api-key', default=None, help="Gemini API key (default: GEMINI_API_KEY)")
+    parser.add_argument('--no-progress', action='store_true', help="Disable the progress bar")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+
+    api_key = args.api_key or os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        sys.stderr.write("No API key: pass --api-key or set GEMINI_API_KEY\n")
+        return 2
+
+    with open(args.jd, encoding='utf-8') as f:
+        job_description = f.read()
+    paths = find_resumes(args.resumes)
+    if not paths:
+        sys.stderr.write(f"No PDF/DOCX resumes found in {args.resumes}\n")
+        return 1
+
+    arms = args.cascade.arms if args.cascade else args.arms
+    if args.out.lower().endswith('.parquet'):
+        writer = ParquetResultWriter(args.out, arms, cascade=args.cascade is not None)
+    else:
+        writer = JsonlResultWriter(args.out)
+
+    try:
+        summary = run_batch(
+            job_description, paths, GeminiAnalyzer(api_key), arms, writer,
+            workers=args.workers, concurrency=args.concurrency,
+            incremental=not args.full_rescore, progress=not args.no_progress,
+            store=ResultStore(args.store) if args.store else None, cascade=args.cascade
+        )
+    finally:
+        writer.close()
+
+    print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
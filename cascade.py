@@ -0,0 +1,174 @@
+"""Cascade early exit for batch screening: run later ARMs only on candidates that need them
+
+A cascade policy lists stages in evaluation order. Every candidate runs the
+first stage; after each stage a candidate advances only if the stage's gate
+lets it through, otherwise it exits with that stage's decision. A gate passes
+candidates the ARM shortlisted, candidates at or above min_score, and
+candidates inside the uncertain band; a stage without any of these passes
+everyone. The policy is plain JSON:
+
+    {"stages": [{"arm": "A", "min_score": 4, "uncertain_band": [2.5, 3.5]},
+                {"arm": "B", "min_score": 3.5, "uncertain_band": [2.75, 3.5]},
+                {"arm": "C", "shortlisted": true},
+                {"arm": "D"}],
+     "calibration_rate": 0.1}
+
+A calibration sample (calibration_rate of the candidates, picked by resume
+hash so reruns pick the same ones) runs every stage regardless of the gates.
+On it the report measures how often exiting early would have changed the
+shortlist decision of the final stage.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from resume_analyzer import EvaluationArm
+
+DEFAULT_CASCADE = {
+    'stages': [
+        {'arm': 'A', 'min_score': 4, 'uncertain_band': [2.5, 3.5]},
+        {'arm': 'B', 'min_score': 3.5, 'uncertain_band': [2.75, 3.5]},
+        {'arm': 'C', 'min_score': 3.5, 'uncertain_band': [3.0, 3.5]},
+        {'arm': 'D'},
+    ],
+    'calibration_rate': 0.1,
+}
+
+
+def resolve_arm(name: str) -> EvaluationArm:
+    """'A'-'D', 'ARM B' or an enum name such as SYSTEM_2"""
+    key = str(name).strip().upper()
+    if key in EvaluationArm.__members__:
+        return EvaluationArm[key]
+    letter = key.replace('ARM', '').strip()
+    for arm in EvaluationArm:
+        if arm.value.startswith(f"ARM {letter}:"):
+            return arm
+    raise ValueError(f"Unknown ARM in cascade policy: {name}")
+
+
+class Stage:
+    """One ARM of the cascade and the gate a candidate must pass to go on to the next"""
+
+    __slots__ = ('arm', 'min_score', 'uncertain_band', 'shortlisted')
+
+    def __init__(self, arm: EvaluationArm, min_score: Optional[float] = None,
+                 uncertain_band: Optional[Tuple[float, float]] = None, shortlisted: bool = False):
+        if uncertain_band is not None:
+            low, high = uncertain_band
+            if not low <= high:
+                raise ValueError(f"Invalid uncertain band for {arm.name}: {uncertain_band}")
+            uncertain_band = (float(low), float(high))
+        self.arm = arm
+        self.min_score = min_score
+        self.uncertain_band = uncertain_band
+        self.shortlisted = shortlisted
+
+    @property
+    def gated(self) -> bool:
+        return self.min_score is not None or self.uncertain_band is not None or self.shortlisted
+
+    def advances(self, score: Optional[float], shortlist: Optional[bool]) -> bool:
+        """Whether a candidate with this stage's score and shortlist decision goes on to the next stage"""
+        if not self.gated or score is None:
+            return True  # ungated stages, and stages that failed to produce a result, exit no one
+        if self.shortlisted and shortlist:
+            return True
+        if self.min_score is not None and score >= self.min_score:
+            return True
+        return self.uncertain_band is not None and self.uncertain_band[0] <= score <= self.uncertain_band[1]
+
+
+class CascadePolicy:
+    """Stages in evaluation order, with the share of candidates held out for calibration"""
+
+    def __init__(self, stages: List[Stage], calibration_rate: float = 0.0):
+        if not stages:
+            raise ValueError("A cascade policy needs at least one stage")
+        order = [list(EvaluationArm).index(stage.arm) for stage in stages]
+        if order != sorted(set(order)):
+            raise ValueError("Cascade stages must be distinct ARMs in evaluation order (A, B, C, D)")
+        if not 0 <= calibration_rate <= 1:
+            raise ValueError(f"Calibration rate must be between 0 and 1: {calibration_rate}")
+        self.stages = stages
+        self.calibration_rate = calibration_rate
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> "CascadePolicy":
+        stages = []
+        for entry in spec.get('stages') or []:
+            fields = dict(entry)
+            try:
+                stages.append(Stage(resolve_arm(fields.pop('arm', '')), **fields))
+            except TypeError as e:
+                raise ValueError(f"Invalid cascade stage {entry}: {e}")
+        return cls(stages, float(spec.get('calibration_rate', 0.0)))
+
+    @classmethod
+    def load(cls, source: str) -> "CascadePolicy":
+        """Policy from 'default', inline JSON or a path to a JSON file"""
+        if source == 'default':
+            return cls.from_dict(DEFAULT_CASCADE)
+        if source.lstrip().startswith('{'):
+            return cls.from_dict(json.loads(source))
+        with open(os.path.expanduser(source), encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    @property
+    def arms(self) -> List[EvaluationArm]:
+        return [stage.arm for stage in self.stages]
+
+    def in_calibration(self, resume_hash: str) -> bool:
+        """Whether a resume is in the calibration sample; stable across runs for the same content"""
+        return bool(resume_hash) and int(resume_hash[:8], 16) < self.calibration_rate * 0x100000000
+
+    def exit_stage(self, arm_scores: Dict[str, float], shortlist: Dict[str, bool]) -> Optional[int]:
+        """Index of the stage a candidate exits after, or None if it reaches the last stage"""
+        for index, stage in enumerate(self.stages[:-1]):
+            name = stage.arm.name
+            if not stage.advances(arm_scores.get(name), shortlist.get(name)):
+                return index
+        return None
+
+    def report(self, rows: List[Dict]) -> Dict:
+        """Calls saved by the cascade and, on the calibration sample, how often exiting early flips the shortlist
+
+        rows are batch result rows with 'arm_scores', 'shortlist' and 'cascade'.
+        """
+        rows = [row for row in rows if 'cascade' in row]
+        final = self.stages[-1].arm.name
+        arm_runs = sum(row['cascade']['arms_run'] for row in rows)
+        full_runs = len(rows) * len(self.stages)
+        exits = {stage.arm.name: 0 for stage in self.stages[:-1]}
+        for row in rows:
+            if row['cascade']['exited_after']:
+                exits[row['cascade']['exited_after']] += 1
+
+        sample = [row for row in rows if row['cascade']['calibration']]
+        would_exit = flips = missed = 0
+        for row in sample:
+            index = self.exit_stage(row['arm_scores'], row['shortlist'])
+            if index is None or final not in row['shortlist']:
+                continue
+            would_exit += 1
+            early = bool(row['shortlist'].get(self.stages[index].arm.name))
+            if early != row['shortlist'][final]:
+                flips += 1
+                missed += not early
+        flip_rate = flips / would_exit if would_exit else 0.0
+        exited = sum(exits.values())
+        return {
+            'candidates': len(rows),
+            'arm_runs': arm_runs,
+            'arm_runs_without_cascade': full_runs,
+            'arm_runs_saved': full_runs - arm_runs,
+            'saved_pct': round((full_runs - arm_runs) / full_runs * 100, 1) if full_runs else 0.0,
+            'exits': exits,
+            'calibration_sample': len(sample),
+            'calibration_would_exit': would_exit,
+            'calibration_flips': flips,
+            'calibration_missed_shortlists': missed,
+            'flip_rate': round(flip_rate, 3),
+            'estimated_flips_among_exited': round(flip_rate * exited, 1),
+        }
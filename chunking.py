@@ -0,0 +1,94 @@
+"""Section-aligned chunking of long resumes for map-reduce evaluation
+
+A resume is split at its section headings (EXPERIENCE, Publications:, ...),
+and whole sections are packed into chunks of at most CHUNK_CHARS characters.
+A section too long for one chunk is split between paragraphs, and each chunk
+it continues into starts by repeating the heading, so every chunk says which
+section its lines belong to.
+"""
+
+import os
+import re
+from typing import List, Optional, Tuple
+
+LONG_RESUME_CHARS = int(os.getenv('LONG_RESUME_CHARS', '16000'))  # longer resumes are scored in chunks
+CHUNK_CHARS = int(os.getenv('RESUME_CHUNK_CHARS', '8000'))
+
+SECTION_TITLES = {
+    'summary', 'professional summary', 'profile', 'objective', 'experience', 'work experience',
+    'professional experience', 'employment', 'employment history', 'career history', 'education',
+    'skills', 'technical skills', 'core competencies', 'projects', 'selected projects', 'publications',
+    'selected publications', 'patents', 'certifications', 'licenses', 'awards', 'honors', 'grants',
+    'languages', 'volunteer', 'volunteering', 'research', 'research experience', 'teaching',
+    'presentations', 'talks', 'conferences', 'training', 'leadership', 'activities', 'references',
+}
+
+_ALPHA = re.compile(r'[A-Za-z]')
+
+
+def is_heading(line: str) -> bool:
+    """Whether a line looks like a section heading: a known title or a short all-caps line"""
+    title = line.strip().rstrip(':').strip()
+    if not title or len(title) > 40:
+        return False
+    return title.lower() in SECTION_TITLES or (title.isupper() and len(title.split()) <= 4 and bool(_ALPHA.search(title)))
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """(heading, lines) per section, in order; text before the first heading has an empty heading"""
+    sections: List[Tuple[str, List[str]]] = [('', [])]
+    for line in text.splitlines():
+        if is_heading(line):
+            sections.append((line.strip().rstrip(':').strip(), [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, lines) for heading, lines in sections if any(line.strip() for line in lines)]
+
+
+def _units(lines: List[str], room: int) -> List[str]:
+    """A section's paragraphs, falling back to lines (and slices of lines) for paragraphs longer than room"""
+    units, paragraph = [], []
+    for line in lines + ['']:
+        paragraph.append(line)
+        if line.strip():
+            continue
+        text = '\n'.join(paragraph)
+        paragraph = []
+        if not text.strip():
+            continue
+        if len(text) <= room:
+            units.append(text)
+        else:
+            for line in text.splitlines():
+                units.extend(line[i:i + room] for i in range(0, len(line), room))
+    return units
+
+
+def chunk_resume(text: str, max_chars: Optional[int] = None) -> List[str]:
+    """Section-aligned chunks of a resume, each at most max_chars (default CHUNK_CHARS) characters
+
+    A section that fits in one chunk is never split; a longer one fills the
+    current chunk and continues in the next, split between paragraphs.
+    """
+    max_chars = max_chars or CHUNK_CHARS
+    chunks, current, size = [], [], 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            chunks.append('\n'.join(current).strip())
+        current, size = [], 0
+
+    for heading, lines in split_sections(text):
+        if size + len('\n'.join(lines)) > max_chars >= len('\n'.join(lines)):
+            flush()
+        prefix = f"{heading} (continued)" if heading else ''
+        for i, unit in enumerate(_units(lines, max_chars - len(prefix) - 1)):
+            if current and size + len(unit) > max_chars:
+                flush()
+                if i and prefix:
+                    current, size = [prefix], len(prefix) + 1
+            current.append(unit)
+            size += len(unit) + 1
+    flush()
+    return chunks
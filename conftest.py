@@ -0,0 +1,56 @@
+"""
+Shared test doubles: fake Gemini models and analyzers built on them
+"""
+
+import json
+
+import pytest
+
+from model_routing import DEFAULT_TIER, RoutingPolicy
+from resume_analyzer import GeminiAnalyzer
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class FakeModel:
+    """Replies in order (the last one repeats), or with answer(prompt) when given
+
+    Replies that are not strings are sent as JSON. Every prompt and generation
+    config the model is called with is recorded.
+    """
+
+    def __init__(self, *replies, answer=None):
+        self.replies = list(replies)
+        self.answer = answer
+        self.prompts = []
+        self.configs = []
+
+    def generate_content(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        self.configs.append(generation_config)
+        if self.answer is not None:
+            reply = self.answer(prompt)
+        else:
+            reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        return FakeResponse(reply if isinstance(reply, str) else json.dumps(reply))
+
+
+@pytest.fixture
+def make_analyzer():
+    """Factory for GeminiAnalyzers on fake models, built through the real constructor
+
+    make_analyzer(model) runs every ARM on that one model; make_analyzer(routing, lite=..., flash=...)
+    routes ARMs to per-tier models. A rubric replaces rubric generation.
+    """
+    def make(model=None, routing=None, rubric=None, model_name='fake-gemini', **models):
+        if model is not None:
+            routing, models = RoutingPolicy.single_model(model_name), {DEFAULT_TIER: model}
+        analyzer = GeminiAnalyzer(routing=routing or RoutingPolicy(), models=models)
+        if rubric is not None:
+            analyzer.get_rubric = lambda job_description, arm=None: rubric
+        return analyzer
+    return make
@@ -0,0 +1,199 @@
+"""Near-duplicate resume detection with MinHash signatures and an LSH index
+
+Each resume is reduced to a fixed-size MinHash signature over its word
+shingles when its text is extracted. Signatures are split into bands and
+bucketed, so adding or querying a resume touches LSH_BANDS buckets no matter
+how many resumes are indexed; only resumes sharing a bucket are compared.
+"""
+
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from result_store import get_default_store
+
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands of 4 rows: pairs above ~0.5 Jaccard almost always share a bucket
+SHINGLE_WORDS = 3
+DUPLICATE_THRESHOLD = 0.7  # estimated Jaccard similarity of word shingles
+MAX_INDEXED_RESUMES = int(os.getenv('DEDUP_MAX_RESUMES', '50000'))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r'\w+')
+_permutations = None
+
+
+def shingle_hashes(text: str) -> List[int]:
+    """Stable 32-bit hashes of the overlapping word shingles of normalized text"""
+    words = _WORD.findall(text.casefold())
+    if len(words) < SHINGLE_WORDS:
+        return [zlib.crc32(' '.join(words).encode('utf-8'))] if words else []
+    return list({zlib.crc32(' '.join(words[i:i + SHINGLE_WORDS]).encode('utf-8'))
+                 for i in range(len(words) - SHINGLE_WORDS + 1)})
+
+
+def _get_permutations():
+    global _permutations
+    if _permutations is None:
+        import numpy as np
+
+        # Fixed seed: signatures are persisted and must stay comparable across processes
+        rng = np.random.RandomState(1)
+        _permutations = (rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64),
+                         rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64))
+    return _permutations
+
+
+def minhash_signature(text: str) -> Optional[bytes]:
+    """MinHash signature of a resume's shingles (NUM_PERM uint32 values), or None for empty text"""
+    hashes = shingle_hashes(text)
+    if not hashes:
+        return None
+    import numpy as np
+
+    a, b = _get_permutations()
+    values = np.asarray(hashes, dtype=np.uint64)[:, None]
+    # a and the hashes are below 2**32, so a * h + b cannot overflow uint64
+    signature = ((values * a + b) % _MERSENNE_PRIME).min(axis=0)
+    return (signature & 0xFFFFFFFF).astype('<u4').tobytes()
+
+
+def estimate_similarity(signature: bytes, other: bytes) -> float:
+    """Estimated Jaccard similarity: the share of MinHash values two signatures have in common"""
+    import numpy as np
+
+    return float((np.frombuffer(signature, dtype='<u4') == np.frombuffer(other, dtype='<u4')).mean())
+
+
+def _bands(signature: bytes) -> List[bytes]:
+    width = len(signature) // LSH_BANDS
+    return [signature[i * width:(i + 1) * width] for i in range(LSH_BANDS)]
+
+
+class DuplicateIndex:
+    """Process-wide LSH index of resume signatures, keyed by resume content hash
+
+    Unless store_factory is None, signatures are also saved to the result store and the
+    most recent ones are loaded on first use, so resumes screened by earlier
+    sessions or processes are matched too.
+    """
+
+    def __init__(self, max_resumes: int = MAX_INDEXED_RESUMES,
+                 store_factory: Optional[Callable] = get_default_store):
+        self.max_resumes = max_resumes
+        self.store_factory = store_factory
+        self._lock = threading.Lock()
+        self._loaded = store_factory is None
+        # resume hash -> (signature, label); oldest first, evicted beyond max_resumes
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self):
+        return self.store_factory() if self.store_factory is not None else None
+
+    def _load_stored(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        store = self._store()
+        if store is None:
+            return
+        for resume_hash, signature, label in store.iter_fingerprints(self.max_resumes):
+            self._add(resume_hash, signature, label)
+
+    def _add(self, resume_hash: str, signature: bytes, label: str):
+        if resume_hash in self._entries:
+            self._entries[resume_hash] = (signature, label)
+            self._entries.move_to_end(resume_hash)
+            return
+        self._entries[resume_hash] = (signature, label)
+        for buckets, band in zip(self._buckets, _bands(signature)):
+            buckets.setdefault(band, set()).add(resume_hash)
+        while len(self._entries) > self.max_resumes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, resume_hash: str):
+        entry = self._entries.pop(resume_hash, None)
+        if entry is None:
+            return
+        for buckets, band in zip(self._buckets, _bands(entry[0])):
+            bucket = buckets.get(band)
+            if bucket is not None:
+                bucket.discard(resume_hash)
+                if not bucket:
+                    del buckets[band]
+
+    def add(self, resume_hash: str, signature: bytes, label: str = ''):
+        with self._lock:
+            self._load_stored()
+            self._add(resume_hash, signature, label)
+
+    def remove(self, resume_hash: str):
+        with self._lock:
+            self._remove(resume_hash)
+
+    def signature(self, resume_hash: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(resume_hash)
+        return entry[0] if entry is not None else None
+
+    def query(self, signature: bytes, exclude: Iterable[str] = (),
+              threshold: float = DUPLICATE_THRESHOLD) -> List[Tuple[str, str, float]]:
+        """(resume hash, label, similarity) of indexed resumes at or above threshold, most similar first
+
+        exclude lists hashes never to report, e.g. earlier versions of the same resume.
+        """
+        with self._lock:
+            self._load_stored()
+            candidates = set()
+            for buckets, band in zip(self._buckets, _bands(signature)):
+                candidates.update(buckets.get(band, ()))
+            candidates.difference_update(exclude)
+            entries = [(h, self._entries[h]) for h in candidates]
+        matches = []
+        for resume_hash, (other, label) in entries:
+            similarity = estimate_similarity(signature, other)
+            if similarity >= threshold:
+                matches.append((resume_hash, label, similarity))
+        return sorted(matches, key=lambda m: m[2], reverse=True)
+
+    def index_resume(self, resume_hash: str, text: str, label: str = '',
+                     replaces: Optional[str] = None) -> Optional[bytes]:
+        """Fingerprint a resume once per distinct text and add it to the index (and the store)
+
+        replaces is the hash the same resume was indexed under before it was edited. That
+        version's fingerprint is dropped unless evaluations of it are stored, so the index
+        keeps one entry per resume rather than one per edit.
+        """
+        if replaces is not None and replaces != resume_hash:
+            store = self._store()
+            if store is None or store.delete_fingerprint(replaces):
+                self.remove(replaces)
+        signature = self.signature(resume_hash)
+        if signature is not None:
+            return signature
+        signature = minhash_signature(text)
+        if signature is None:
+            return None
+        self.add(resume_hash, signature, label)
+        store = self._store()
+        if store is not None:
+            store.save_fingerprint(resume_hash, signature, label)
+        return signature
+
+    def find_duplicates(self, resume_hash: str, text: str, label: str = '',
+                        threshold: float = DUPLICATE_THRESHOLD) -> List[Tuple[str, str, float]]:
+        """Index a resume and return the other indexed resumes that are near-duplicates of it"""
+        signature = self.index_resume(resume_hash, text, label)
+        if signature is None:
+            return []
+        return self.query(signature, exclude=(resume_hash,), threshold=threshold)
+
+
+duplicate_index = DuplicateIndex()
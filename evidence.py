@@ -0,0 +1,120 @@
+"""Verification of ARM B/C/D evidence quotes against the source resume
+
+Each resume gets a word and word-trigram position index, built once per text.
+An evidence snippet is aligned by letting its trigrams (or, for paraphrases,
+its words) vote for where in the resume it starts; the best window is then
+compared token by token, and the share of snippet words found there in order
+is the confidence.
+"""
+
+import functools
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+VERIFIED_CONFIDENCE = 0.8
+PARTIAL_CONFIDENCE = 0.5
+MAX_WORD_POSITIONS = 32  # words this frequent ("and", "the") don't vote in the fuzzy fallback
+
+_WORD = re.compile(r'\w+')
+# Models often join several quotes with ellipses or semicolons; each part is located separately
+_SEGMENT_BREAK = re.compile(r'\.\.\.|…|;|\n|"|“|”')
+
+
+class EvidenceIndex:
+    """Word and word-trigram positions of one resume"""
+
+    def __init__(self, text: str):
+        matches = list(_WORD.finditer(text))
+        self.tokens = [m.group().casefold() for m in matches]
+        self.offsets = [m.start() for m in matches]
+        self.words: Dict[str, List[int]] = {}
+        self.trigrams: Dict[Tuple[str, str, str], List[int]] = {}
+        for position, token in enumerate(self.tokens):
+            self.words.setdefault(token, []).append(position)
+        for position in range(len(self.tokens) - 2):
+            self.trigrams.setdefault(tuple(self.tokens[position:position + 3]), []).append(position)
+
+    def _best_start(self, words: List[str]) -> Tuple[Optional[int], bool]:
+        """Resume position where the snippet most plausibly starts, by diagonal voting, and whether
+        every trigram of the snippet was found there (a verbatim quote)"""
+        votes: Dict[int, int] = {}
+        for i in range(len(words) - 2):
+            for position in self.trigrams.get(tuple(words[i:i + 3]), ()):
+                votes[position - i] = votes.get(position - i, 0) + 1
+        if votes:
+            start, count = max(votes.items(), key=lambda item: (item[1], -item[0]))
+            return start, count == len(words) - 2
+
+        # Fuzzy fallback: rare words vote for nearby starts, bucketed to allow reordering
+        bucket = max(4, len(words) // 2)
+        for i, word in enumerate(words):
+            positions = self.words.get(word, ())
+            if len(positions) > MAX_WORD_POSITIONS:
+                continue
+            for position in positions:
+                start = (position - i) // bucket * bucket
+                votes[start] = votes.get(start, 0) + 1
+        if not votes:
+            return None, False
+        return max(votes.items(), key=lambda item: (item[1], -item[0]))[0], False
+
+    def locate_segment(self, words: List[str]) -> Tuple[Optional[int], float, int]:
+        """(character offset, confidence, word count) for one evidence segment"""
+        start, verbatim = self._best_start(words)
+        if start is None:
+            return None, 0.0, len(words)
+        if verbatim:
+            return self.offsets[start], 1.0, len(words)
+        slack = max(2, len(words) // 2)
+        low = max(0, start - slack)
+        window = self.tokens[low:start + len(words) + slack]
+        blocks = [b for b in SequenceMatcher(None, words, window, autojunk=False).get_matching_blocks() if b.size]
+        if not blocks:
+            return None, 0.0, len(words)
+        matched = sum(b.size for b in blocks)
+        return self.offsets[low + blocks[0].b], matched / len(words), len(words)
+
+    def locate(self, snippet: str) -> Tuple[Optional[int], float]:
+        """(character offset of the first matched word or None, confidence 0-1) for one evidence string"""
+        segments = [_WORD.findall(part.casefold()) for part in _SEGMENT_BREAK.split(snippet)]
+        segments = [words for words in segments if words]
+        if not segments:
+            return None, 0.0
+        located = [self.locate_segment(words) for words in segments]
+        total = sum(count for _, _, count in located)
+        confidence = sum(score * count for _, score, count in located) / total
+        offsets = [offset for offset, score, _ in located if offset is not None and score >= PARTIAL_CONFIDENCE]
+        return (min(offsets) if offsets else None), round(confidence, 3)
+
+
+@functools.lru_cache(maxsize=64)
+def evidence_index(resume_text: str) -> EvidenceIndex:
+    """The index for a resume text; ARMs evaluating the same resume share it"""
+    return EvidenceIndex(resume_text)
+
+
+def verify_snippets(resume_text: str, snippets: Iterable[str]) -> List[Tuple[Optional[int], float]]:
+    """Locate a batch of evidence strings in one resume"""
+    index = evidence_index(resume_text)
+    return [index.locate(snippet or '') for snippet in snippets]
+
+
+def annotate_evidence(result: Dict, resume_text: str) -> Dict:
+    """Add evidence_offset and evidence_confidence to each criterion score of an ARM B/C/D result"""
+    scores = result.get('evaluation', {}).get('scores') or []
+    for score, (offset, confidence) in zip(scores, verify_snippets(resume_text, (s.get('evidence') for s in scores))):
+        score['evidence_offset'] = offset
+        score['evidence_confidence'] = confidence
+    return result
+
+
+def evidence_status(confidence: Optional[float]) -> Optional[str]:
+    """Short label for an evidence confidence, or None for results that were never verified"""
+    if confidence is None:
+        return None
+    if confidence >= VERIFIED_CONFIDENCE:
+        return "✅ Found in resume"
+    if confidence >= PARTIAL_CONFIDENCE:
+        return f"🟡 Partly found in resume ({confidence:.0%})"
+    return "⚠️ Not found in resume"
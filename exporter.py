@@ -0,0 +1,232 @@
+"""Bulk export of evaluations, generated only when a download is requested
+
+Candidates are dicts with 'resume_id', 'label', 'scores' ({arm name: fit
+score}) and 'load_result' (arm name -> full result or None). Full results are
+loaded one at a time while writing, so exports never hold every result at once.
+"""
+
+import csv
+import html
+import io
+import json
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional
+
+from rendering import build_result_html
+from session_records import ARM_LABELS, ARM_NAMES
+
+ROW_FIELDS = ['resume_id', 'label', 'arm', 'arm_label', 'fit_score', 'shortlist',
+              'criterion', 'weight', 'criterion_score', 'evidence', 'evidence_confidence']
+CSV_FLUSH_ROWS = 512
+PARQUET_BATCH_SIZE = 1024
+HTML_EXPORT_WORKERS = 4
+
+# Report blurbs per ARM, as in the original single-candidate summary
+ARM_REPORT_TITLES = {
+    'SYSTEM_1': ('ARM A: Quick Insights Evaluation', 'Initial assessment based on key resume elements'),
+    'SYSTEM_2': ('ARM B: Detailed Rubric-Based Evaluation', 'Systematic evaluation using weighted criteria and evidence'),
+    'SYSTEM_2_PERSONA': ('ARM C: Compliance-Focused Evaluation', 'HR compliance assessment ensuring fair evaluation'),
+    'SYSTEM_2_PERSONA_DEBIAS': ('ARM D: Compliance + Debias Evaluation', 'Compliance review with bias mitigation'),
+}
+
+
+def iter_rows(candidates: Iterable[Dict]) -> Iterator[Dict]:
+    """One flat row per criterion score (one per ARM for ARM A or results that can't be loaded)"""
+    for candidate in candidates:
+        for arm_name in ARM_NAMES:
+            if arm_name not in candidate['scores']:
+                continue
+            base = {
+                'resume_id': candidate['resume_id'], 'label': candidate['label'],
+                'arm': arm_name, 'arm_label': ARM_LABELS[arm_name],
+                'fit_score': candidate['scores'][arm_name], 'shortlist': None,
+                'criterion': None, 'weight': None, 'criterion_score': None, 'evidence': None,
+                'evidence_confidence': None,
+            }
+            result = candidate['load_result'](arm_name)
+            if result is None:
+                yield base
+                continue
+
+            evaluation = result if arm_name == 'SYSTEM_1' else result.get('evaluation', {})
+            base['shortlist'] = bool(evaluation.get('shortlist_recommend', False))
+            scores = evaluation.get('scores') or []
+            if not scores:
+                yield base
+                continue
+            weights = {r.get('criterion'): r.get('weight') for r in result.get('rubric', [])}
+            for score in scores:
+                yield dict(
+                    base, criterion=score.get('criterion'), weight=weights.get(score.get('criterion')),
+                    criterion_score=score.get('score'), evidence=score.get('evidence'),
+                    evidence_confidence=score.get('evidence_confidence'),
+                )
+
+
+def export_csv(rows: Iterable[Dict], out: BinaryIO):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=ROW_FIELDS)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % CSV_FLUSH_ROWS == 0:
+            out.write(buffer.getvalue().encode('utf-8'))
+            buffer.seek(0)
+            buffer.truncate()
+    out.write(buffer.getvalue().encode('utf-8'))
+
+
+def export_jsonl(rows: Iterable[Dict], out: BinaryIO):
+    for row in rows:
+        out.write((json.dumps(row) + '\n').encode('utf-8'))
+
+
+def export_parquet(rows: Iterable[Dict], out: BinaryIO):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow. Please install with: pip install pyarrow")
+
+    schema = pa.schema([
+        pa.field('resume_id', pa.string()), pa.field('label', pa.string()),
+        pa.field('arm', pa.string()), pa.field('arm_label', pa.string()),
+        pa.field('fit_score', pa.float64()), pa.field('shortlist', pa.bool_()),
+        pa.field('criterion', pa.string()), pa.field('weight', pa.float64()),
+        pa.field('criterion_score', pa.float64()), pa.field('evidence', pa.string()),
+        pa.field('evidence_confidence', pa.float64()),
+    ])
+    with pq.ParquetWriter(out, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+
+def build_candidate_report(label: str, scores: Dict[str, float], results: Optional[Dict[str, Dict]] = None) -> str:
+    """Standalone HTML report for one candidate: ARM scores, overall assessment and full ARM results"""
+    results = results or {}
+    completed = [arm_name for arm_name in ARM_NAMES if arm_name in scores]
+    values = [scores[arm_name] for arm_name in completed]
+    score_boxes = "".join(
+        f"""
+        <div class="score-box">
+            <h3>{ARM_REPORT_TITLES[arm_name][0]}</h3>
+            <p><strong>Score:</strong> {scores[arm_name]:.2f}/5</p>
+            <p>{ARM_REPORT_TITLES[arm_name][1]}</p>
+        </div>
+        """
+        for arm_name in completed
+    )
+
+    overall = ""
+    if values:
+        avg_score = sum(values) / len(values)
+        variance = max(values) - min(values)
+        consistency = 'High' if variance < 0.5 else 'Moderate' if variance < 1 else 'Variable'
+        recommendation = ('✅ Strongly Recommended' if avg_score >= 4.5
+                          else '✅ Recommended' if avg_score >= 4.0
+                          else '⚠️ Consider with Reservations' if avg_score >= 3.0
+                          else '❌ Not Recommended')
+        overall = f"""
+        <div class="final-summary">
+            <h2>Overall Assessment</h2>
+            <p><strong>ARMs Completed:</strong> {len(values)}/{len(ARM_NAMES)}</p>
+            <p><strong>Average Score:</strong> {avg_score:.2f}/5</p>
+            <p><strong>Score Consistency:</strong> {consistency}</p>
+            <p><strong>Final Recommendation:</strong> {recommendation}</p>
+        </div>
+        """
+
+    details = "".join(
+        f'<div class="arm-details">{build_result_html(results[arm_name], arm_name)}</div>'
+        for arm_name in completed if results.get(arm_name) is not None
+    )
+
+    return f"""
+    <html>
+    <head>
+    <meta charset="utf-8">
+    <style>
+        body {{ font-family: Arial, sans-serif; padding: 20px; }}
+        .header {{ text-align: center; color: #1f77b4; margin-bottom: 30px; }}
+        .score-box, .recommendation-box {{
+            background-color: #f8f9fa;
+            border-left: 4px solid #007bff;
+            padding: 15px;
+            margin: 10px 0;
+            border-radius: 5px;
+        }}
+        .final-summary {{
+            background-color: #e9ecef;
+            padding: 20px;
+            border-radius: 5px;
+            margin-top: 20px;
+        }}
+        .arm-details {{ margin-top: 30px; }}
+    </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Resume Evaluation Summary</h1>
+            <h2>{html.escape(label)}</h2>
+            <p>Generated on {datetime.now().strftime("%Y-%m-%d %H:%M")}</p>
+        </div>
+
+        <h2>Evaluation Results</h2>
+        {score_boxes}
+        {overall}
+        {details}
+    </body>
+    </html>
+    """
+
+
+def report_file_name(label: str, resume_id: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in label.strip()) or resume_id
+    return f"{safe}_{resume_id}.html"
+
+
+def _render_candidate(candidate: Dict) -> str:
+    results = {arm_name: candidate['load_result'](arm_name) for arm_name in candidate['scores']}
+    return build_candidate_report(candidate['label'], candidate['scores'], results)
+
+
+def export_html_bundle(candidates: Iterable[Dict], out: BinaryIO, workers: int = HTML_EXPORT_WORKERS):
+    """Zip of per-candidate HTML reports rendered in parallel, with a bounded number in flight"""
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as bundle, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+
+        def write_oldest():
+            candidate, future = in_flight.popleft()
+            bundle.writestr(report_file_name(candidate['label'], candidate['resume_id']), future.result())
+
+        for candidate in candidates:
+            in_flight.append((candidate, executor.submit(_render_candidate, candidate)))
+            if len(in_flight) >= workers * 2:
+                write_oldest()
+        while in_flight:
+            write_oldest()
+
+
+# Format -> (writer taking rows or candidates, file extension, MIME type, takes rows)
+EXPORT_FORMATS = {
+    'CSV': (export_csv, 'csv', 'text/csv', True),
+    'JSONL': (export_jsonl, 'jsonl', 'application/x-ndjson', True),
+    'Parquet': (export_parquet, 'parquet', 'application/vnd.apache.parquet', True),
+    'HTML bundle (zip)': (export_html_bundle, 'zip', 'application/zip', False),
+}
+
+
+def export(candidates: Iterable[Dict], export_format: str, out: BinaryIO):
+    """Write candidates to out in one of EXPORT_FORMATS"""
+    writer, _, _, takes_rows = EXPORT_FORMATS[export_format]
+    writer(iter_rows(candidates) if takes_rows else candidates, out)
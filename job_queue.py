@@ -0,0 +1,184 @@
+"""Background worker pool for ARM evaluations, shared by every session in the process"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from resume_analyzer import (
+    EvaluationArm,
+    GeminiAnalyzer,
+    get_fit_score,
+    get_shortlist_recommend,
+    job_description_hash,
+    resume_content_hash,
+)
+from result_store import get_default_store
+from session_records import ARM_LABELS
+from telemetry import telemetry
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+MAX_JOBS_KEPT = 1000
+REVIEW_ARMS = (EvaluationArm.SYSTEM_2_PERSONA, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS)
+
+
+class ArmOutcome:
+    """One finished ARM of a job"""
+
+    __slots__ = ('arm_name', 'result', 'fit_score', 'shortlist', 'fallback')
+
+    def __init__(self, arm_name: str, result: Dict, fallback: bool = False):
+        arm = EvaluationArm[arm_name]
+        self.arm_name = arm_name
+        self.result = result
+        self.fit_score = get_fit_score(result, arm)
+        self.shortlist = get_shortlist_recommend(result, arm)
+        self.fallback = fallback
+
+
+class EvaluationJob:
+    """A resume's ARMs to run in order; outcomes are appended as each ARM finishes"""
+
+    __slots__ = ('job_id', 'resume_id', 'label', 'arm_names', 'resume_text', 'job_description', 'base_result',
+                 'incremental', 'status', 'current_arm', 'outcomes', 'collected', 'error',
+                 'submitted_at', 'started_at', 'finished_at', 'trace_owner')
+
+    def __init__(self, resume_id: str, label: str, arm_names: List[str], resume_text: str,
+                 job_description: str, base_result: Optional[Dict] = None, incremental: bool = True):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.resume_id = resume_id
+        self.label = label
+        self.arm_names = tuple(arm_names)
+        self.resume_text = resume_text
+        self.job_description = job_description
+        self.base_result = base_result  # ARM B's result, when it finished before this job
+        self.incremental = incremental
+        self.status = QUEUED
+        self.current_arm = None
+        self.outcomes: List[ArmOutcome] = []
+        self.collected = 0  # outcomes already applied to the submitting session
+        self.error = ''
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.trace_owner = tracer.current_owner()  # the submitting session, for its trace panel
+
+    @property
+    def pending(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def uncollected(self) -> List[ArmOutcome]:
+        """Outcomes the session has not applied yet (marks them collected)"""
+        outcomes = self.outcomes[self.collected:]
+        self.collected += len(outcomes)
+        return outcomes
+
+    def elapsed_s(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+def default_analyzer():
+    return GeminiAnalyzer(os.getenv('GEMINI_API_KEY'))
+
+
+class JobQueue:
+    """Runs evaluation jobs on a thread pool that outlives the submitting session
+
+    Results are saved to the result store by the worker, so a closed tab does
+    not lose finished ARMs: they are restored when the resume and JD are
+    entered again.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, analyzer_factory: Callable = default_analyzer,
+                 store_factory: Callable = get_default_store, max_jobs: int = MAX_JOBS_KEPT):
+        self.analyzer_factory = analyzer_factory
+        self.store_factory = store_factory
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, EvaluationJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='arm-job')
+
+    def submit(self, resume_id: str, label: str, arm_names: List[str], resume_text: str, job_description: str,
+               base_result: Optional[Dict] = None, incremental: bool = True) -> EvaluationJob:
+        job = EvaluationJob(resume_id, label, arm_names, resume_text, job_description, base_result, incremental)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[EvaluationJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        # Drop the oldest finished jobs once the history is full
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [jid for jid, job in self._jobs.items() if not job.pending][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: EvaluationJob):
+        with tracer.trace(f"job {job.label}", job.trace_owner):
+            self._run_traced(job)
+
+    def _run_traced(self, job: EvaluationJob):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            analyzer = self.analyzer_factory()
+            store = self.store_factory()
+            base_result = job.base_result
+            for arm_name in job.arm_names:
+                job.current_arm = arm_name
+                arm = EvaluationArm[arm_name]
+                with tracer.span(ARM_LABELS[arm_name]):
+                    outcome = self._evaluate(analyzer, job, arm, base_result if job.incremental and arm in REVIEW_ARMS else None)
+                # Provisional fallback scores are shown in the session only: they are never
+                # stored, restored elsewhere or reviewed by ARM C/D as if the model had produced them
+                if arm == EvaluationArm.SYSTEM_2 and not outcome.fallback:
+                    base_result = outcome.result
+                if store is not None and not outcome.fallback:
+                    with tracer.span('store'):
+                        store.save_evaluation(
+                            resume_content_hash(job.resume_text), job_description_hash(job.job_description), arm_name,
+                            outcome.result, score=outcome.fit_score, shortlist=outcome.shortlist, label=job.label
+                        )
+                job.outcomes.append(outcome)
+            job.status = DONE
+        except Exception as e:
+            logger.exception("Evaluation job %s failed", job.job_id)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.current_arm = None
+            job.finished_at = time.time()
+
+    @staticmethod
+    def _evaluate(analyzer, job: EvaluationJob, arm: EvaluationArm, base_result: Optional[Dict]) -> ArmOutcome:
+        try:
+            result = analyzer.analyze_resume(job.resume_text, job.job_description, arm, base_result=base_result)
+            return ArmOutcome(arm.name, result)
+        except Exception as e:
+            # Same provisional fallback the UI has always shown when the API fails
+            from dummy_data import get_dummy_data_by_arm
+
+            telemetry.record(arm.name, 'fallback', getattr(analyzer, 'model_name', ''), fallback=True, error=str(e))
+            logger.warning("ARM %s fell back to provisional data: %s", arm.name, e)
+            return ArmOutcome(arm.name, get_dummy_data_by_arm(arm.name), fallback=True)
+
+
+job_queue = JobQueue()
@@ -0,0 +1,83 @@
+"""Columnar candidate leaderboard with top-k ranking, filtering and pagination"""
+
+import heapq
+import warnings
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from session_records import ARM_LABELS, ARM_NAMES, ResumeRecord
+
+ARM_COLUMNS = list(ARM_NAMES)
+
+# Sort keys offered in the UI, mapped to frame columns
+SORT_COLUMNS = {
+    'Average score': 'average',
+    'ARM D score': 'SYSTEM_2_PERSONA_DEBIAS',
+    'ARM disagreement': 'disagreement',
+}
+
+
+def build_score_frame(resumes: Dict[str, ResumeRecord]) -> pd.DataFrame:
+    """One row per resume with ARM scores as float columns (NaN where not run yet)"""
+    ids = list(resumes.keys())
+    scores = np.array([resumes[resume_id].score_row() for resume_id in ids], dtype=float).reshape(len(ids), len(ARM_COLUMNS))
+    labels = [resumes[resume_id].label for resume_id in ids]
+
+    frame = pd.DataFrame(scores, index=pd.Index(ids, name='resume_id'), columns=ARM_COLUMNS)
+    frame.insert(0, 'label', labels)
+    completed = np.count_nonzero(~np.isnan(scores), axis=1)
+    frame['completed'] = completed
+    with warnings.catch_warnings():
+        # All-NaN rows (no ARM run yet) warn and yield NaN, which is what we want
+        warnings.simplefilter('ignore', RuntimeWarning)
+        frame['average'] = np.nanmean(scores, axis=1)
+        spread = np.nanmax(scores, axis=1) - np.nanmin(scores, axis=1)
+    frame['disagreement'] = np.where(completed > 1, spread, np.nan)
+    return frame
+
+
+def filter_frame(frame: pd.DataFrame, label_query: str = '', min_average: Optional[float] = None,
+                 completed_only: bool = False) -> pd.DataFrame:
+    """Vectorized filters over the score frame"""
+    mask = np.ones(len(frame), dtype=bool)
+    if label_query:
+        mask &= frame['label'].str.contains(label_query, case=False, regex=False).to_numpy()
+    if min_average is not None:
+        mask &= (frame['average'] >= min_average).to_numpy()
+    if completed_only:
+        mask &= (frame['completed'] == len(ARM_COLUMNS)).to_numpy()
+    return frame[mask]
+
+
+def top_k(frame: pd.DataFrame, column: str, k: int, descending: bool = True) -> pd.DataFrame:
+    """The k best rows by one column using a heap (O(n log k)); rows without a value are skipped"""
+    values = frame[column].to_numpy(dtype=float)
+    candidates = np.flatnonzero(~np.isnan(values))
+    if k <= 0 or len(candidates) == 0:
+        return frame.iloc[0:0]
+    select = heapq.nlargest if descending else heapq.nsmallest
+    positions = select(k, candidates, key=values.__getitem__)
+    return frame.iloc[positions]
+
+
+def paginate(frame: pd.DataFrame, column: str, page: int, page_size: int, descending: bool = True) -> pd.DataFrame:
+    """Rows for one page of the ranking, selecting only as many rows as the page needs"""
+    page = max(page, 1)
+    ranked = top_k(frame, column, page * page_size, descending)
+    return ranked.iloc[(page - 1) * page_size:page * page_size]
+
+
+def page_count(frame: pd.DataFrame, column: str, page_size: int) -> int:
+    """Number of pages for rows that have a value in the sort column"""
+    ranked_rows = int(frame[column].notna().sum())
+    return max(1, -(-ranked_rows // page_size))
+
+
+def format_page(page: pd.DataFrame) -> pd.DataFrame:
+    """Presentation copy of a page with friendly column names"""
+    display = page.rename(columns=ARM_LABELS).rename(columns={
+        'label': 'Candidate', 'completed': 'ARMs', 'average': 'Average', 'disagreement': 'Disagreement',
+    })
+    return display.round(2)
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Multi-session load test for the Streamlit app against a mock Gemini backend.
+
+Each simulated session drives app.py through Streamlit's app-testing API like
+a recruiter would: it enters the job description, uploads synthetic DOCX
+resumes and clicks through ARMs A-D, refreshing the page while each ARM runs.
+Gemini is replaced by a local fake model whose latency is drawn from a
+configurable distribution, so the run measures the app, the job queue and the
+caches rather than the network.
+
+Usage:
+    python load_test.py --sessions 8
+    python load_test.py --sessions 20 --resumes 2 --latency lognormal:1.5,0.4 --latency rubric=fixed:0.8
+    python load_test.py --sessions 4 --latency uniform:0.2,0.6 --json load_report.json
+
+Latency specs are fixed:SECONDS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA,
+optionally prefixed with the call kind they apply to (rubric=, score=,
+review=, chunk= or reduce=); an unprefixed spec applies to every kind without
+its own.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from model_routing import DEFAULT_TIER, RoutingPolicy
+from resume_analyzer import DEFAULT_RUBRIC, GeminiAnalyzer
+from telemetry import percentile, telemetry
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+LATENCY_KINDS = ('rubric', 'score', 'review', 'chunk', 'reduce')
+CHARS_PER_TOKEN = 4
+
+JOB_DESCRIPTION = (
+    "Senior backend engineer to design, build and operate Python services on Kubernetes. "
+    "Requires five or more years of production experience with Python, PostgreSQL and cloud "
+    "infrastructure, a track record of leading projects end to end, and clear written communication."
+)
+
+_SKILLS = ['Python', 'Go', 'Java', 'Kubernetes', 'Docker', 'PostgreSQL', 'Redis', 'Kafka', 'AWS', 'GCP',
+           'Terraform', 'React', 'TypeScript', 'Spark', 'Airflow', 'gRPC', 'GraphQL', 'Django', 'FastAPI', 'Rust']
+_ROLES = ['Backend Engineer', 'Software Engineer', 'Platform Engineer', 'Data Engineer', 'Site Reliability Engineer']
+_VERBS = ['Built', 'Designed', 'Led', 'Migrated', 'Automated', 'Scaled', 'Rewrote', 'Launched', 'Maintained']
+_OBJECTS = ['a billing service', 'the event pipeline', 'an internal search API', 'the deployment tooling',
+            'a fraud detection job', 'the customer data platform', 'a metrics ingestion tier', 'the mobile backend']
+_OUTCOMES = ['cutting p99 latency by {n}%', 'serving {n}k requests per second', 'reducing cloud spend by {n}%',
+             'for a team of {n} engineers', 'with {n}% fewer incidents', 'processing {n}M events a day']
+_RESUME_SECTION = re.compile(r'(?:RESUME TO EVALUATE|RESUME PART \d+ OF \d+):\s*(.*?)\n\s*TASK:', re.S)
+_DIGEST_QUOTE = re.compile(r'^- part \d+ scored [\d.]+: "(.*)"$')
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler for one latency spec: fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA (seconds)"""
+    name, _, params = spec.partition(':')
+    try:
+        values = [float(v) for v in params.split(',')] if params else []
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid latency parameters: {spec}")
+    if name == 'fixed' and len(values) == 1 and values[0] >= 0:
+        return lambda rng: values[0]
+    if name == 'uniform' and len(values) == 2 and 0 <= values[0] <= values[1]:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == 'lognormal' and len(values) == 2 and values[0] > 0 and values[1] >= 0:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise argparse.ArgumentTypeError(
+        f"Invalid latency spec: {spec} (use fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA)")
+
+
+class LatencyProfile:
+    """Latency samplers per call kind, with a default for kinds that have none"""
+
+    def __init__(self, specs: Optional[List[str]] = None, default: str = 'fixed:0'):
+        self.samplers = {'*': parse_latency(default)}
+        for spec in specs or []:
+            kind, separator, rest = spec.partition('=')
+            if separator and kind not in LATENCY_KINDS:
+                raise argparse.ArgumentTypeError(f"Unknown call kind: {kind} (use {', '.join(LATENCY_KINDS)})")
+            self.samplers[kind if separator else '*'] = parse_latency(rest if separator else spec)
+
+    def sample(self, kind: str, rng: random.Random) -> float:
+        return self.samplers.get(kind, self.samplers['*'])(rng)
+
+
+def prompt_kind(prompt: str) -> str:
+    """The telemetry kind (rubric, score, review, chunk or reduce) of an analyzer prompt"""
+    if 'preparing a hiring rubric' in prompt:
+        return 'rubric'
+    if 'EXISTING EVALUATION (ARM B)' in prompt:
+        return 'review'
+    if 'RESUME PART ' in prompt:
+        return 'chunk'
+    if 'parts of a long resume, by criterion)' in prompt:
+        return 'reduce'
+    return 'score'
+
+
+class MockGenerativeModel:
+    """Stands in for genai.GenerativeModel: sleeps a sampled latency, then answers in the expected JSON shape"""
+
+    def __init__(self, latency: LatencyProfile, seed: Optional[int] = None):
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        kind = prompt_kind(prompt)
+        with self._lock:
+            delay = self.latency.sample(kind, self._rng)
+            seed = self._rng.getrandbits(32)
+        time.sleep(delay)
+        text = json.dumps(self.respond(kind, prompt, random.Random(seed)))
+        usage = SimpleNamespace(prompt_token_count=len(prompt) // CHARS_PER_TOKEN,
+                                candidates_token_count=len(text) // CHARS_PER_TOKEN)
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+    @staticmethod
+    def respond(kind: str, prompt: str, rng: random.Random) -> Dict:
+        if kind == 'rubric':
+            return {'rubric': [dict(r, description=f"Evidence of {r['criterion'].lower()} for this role")
+                               for r in DEFAULT_RUBRIC]}
+        if kind == 'review':
+            review = {
+                'score_adjustments': [{'criterion': rng.choice(DEFAULT_RUBRIC)['criterion'],
+                                       'delta': rng.choice([-1, 1]), 'reason': "Evidence is only partly job-related"}],
+                'shortlist_recommend': rng.random() < 0.5,
+                'compliance_review': {'is_compliant': True, 'compliance_notes': "Job-related criteria only.",
+                                      'risk_factors': []},
+            }
+            if '"debias_review"' in prompt:
+                review['debias_review'] = {'mitigations_applied': ["Ignored institution names"], 'residual_risks': []}
+            return review
+        if '"fit_score_1_to_5"' in prompt:
+            return {'fit_score_1_to_5': rng.randint(1, 5), 'shortlist_recommend': rng.random() < 0.5,
+                    'justification': "Quick read of relevant experience."}
+
+        section = _RESUME_SECTION.search(prompt)
+        lines = [line.strip() for line in (section.group(1) if section else '').splitlines() if line.strip()]
+        if kind == 'reduce':
+            # Quote the evidence the map step found, as the real model would
+            lines = [m.group(1) for m in map(_DIGEST_QUOTE.match, lines) if m]
+        compact = {
+            's': [{'c': number, 'v': rng.randint(1, 5), 'e': rng.choice(lines) if lines else ''}
+                  for number in range(1, len(DEFAULT_RUBRIC) + 1)],
+            'sl': rng.random() < 0.5,
+            'j': "Scores follow the rubric evidence above.",
+        }
+        if '"cr"' in prompt:
+            compact['cr'] = {'ok': True, 'n': "Job-related criteria only.", 'r': []}
+        if '"db"' in prompt:
+            compact['db'] = {'m': ["Ignored institution names"], 'r': []}
+        return compact
+
+
+class MockGeminiAnalyzer(GeminiAnalyzer):
+    """GeminiAnalyzer backed by MockGenerativeModel; prompts, parsing, caching and telemetry are unchanged"""
+
+    def __init__(self, latency: LatencyProfile, seed: Optional[int] = None):
+        super().__init__(routing=RoutingPolicy.single_model('mock-gemini'),
+                         models={DEFAULT_TIER: MockGenerativeModel(latency, seed)})
+
+
+def synthetic_resume(rng: random.Random, index: int) -> str:
+    """Plain-text resume with enough random detail that no two are near-duplicates"""
+    skills = rng.sample(_SKILLS, 6)
+    lines = [f"Candidate {index}", f"{rng.choice(_ROLES)} with {rng.randint(2, 15)} years of experience",
+             "Skills: " + ', '.join(skills), "Experience"]
+    for _ in range(rng.randint(5, 8)):
+        outcome = rng.choice(_OUTCOMES).format(n=rng.randint(2, 90))
+        lines.append(f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)} in {rng.choice(skills)}, {outcome} "
+                     f"(project {rng.getrandbits(24):06x})")
+    lines.append(f"Education: B.Sc. Computer Science, class of {rng.randint(1995, 2022)}")
+    return '\n'.join(lines)
+
+
+def resume_docx(text: str) -> bytes:
+    """A DOCX file with one paragraph per line of text"""
+    from docx import Document
+
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class SimulatedSession:
+    """One browser session clicking through every ARM for a few resumes
+
+    AppTest swaps process globals (the Streamlit runtime, secrets) on every run,
+    so script runs are serialized; under the GIL they would mostly be anyway,
+    and the mock model calls and job queue workers still overlap.
+    """
+
+    _run_lock = threading.Lock()
+
+    def __init__(self, index: int, resumes: List[Tuple[str, bytes]], job_description: str,
+                 poll_s: float, arm_timeout_s: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.resumes = resumes
+        self.job_description = job_description
+        self.poll_s = poll_s
+        self.arm_timeout_s = arm_timeout_s
+        self.app = AppTest.from_file(APP_PATH, default_timeout=max(60.0, arm_timeout_s))
+        self.interactions: List[float] = []  # seconds per user action (script run)
+        self.refreshes: List[float] = []  # seconds per refresh while waiting for an ARM
+        self.turnarounds: List[float] = []  # seconds from clicking Analyze to the ARM's result
+        self.arms_completed = 0
+        self.errors: List[str] = []
+
+    def _run(self, element=None, timings: Optional[List[float]] = None):
+        start = time.perf_counter()
+        with self._run_lock:
+            (element or self.app).run()
+        (self.interactions if timings is None else timings).append(time.perf_counter() - start)
+        for exception in self.app.exception:
+            message = f"session {self.index}: {exception.value}"
+            if message not in self.errors:
+                self.errors.append(message)
+
+    def _progress(self) -> Optional[str]:
+        return next((m.value for m in self.app.metric if m.label == "ARM Progress"), None)
+
+    def _button(self, text: str):
+        return next((b for b in self.app.button if text in b.label), None)
+
+    def run(self):
+        try:
+            self._run()
+            self._run(next(t for t in self.app.text_area if t.label == "Job Description").set_value(self.job_description))
+            for number, (name, content) in enumerate(self.resumes):
+                if number:
+                    self._run(self._button("Add Resume").click())
+                self._run(self.app.file_uploader[0].set_value((name, content, DOCX_MIME)))
+                self._run_arms()
+        except Exception as e:
+            self.errors.append(f"session {self.index}: {type(e).__name__}: {e}")
+
+    def _run_arms(self):
+        total = int((self._progress() or '0/4').split('/')[1])
+        for done in range(int((self._progress() or '0/4').split('/')[0]), total):
+            button = self._button("Analyze Resume")
+            if button is None or button.disabled:
+                self.errors.append(f"session {self.index}: Analyze Resume unavailable at {done}/{total}")
+                return
+            start = time.perf_counter()
+            self._run(button.click())
+            target = f"{done + 1}/{total}"
+            while self._progress() != target:
+                if time.perf_counter() - start > self.arm_timeout_s:
+                    self.errors.append(f"session {self.index}: timed out waiting for ARM {done + 1}")
+                    return
+                time.sleep(self.poll_s)
+                self._run(timings=self.refreshes)
+            self.turnarounds.append(time.perf_counter() - start)
+            self.arms_completed += 1
+
+
+def run_load_test(sessions: int = 4, resumes_per_session: int = 1, latency: Optional[LatencyProfile] = None,
+                  poll_s: float = 0.25, arm_timeout_s: float = 120.0, ramp_s: float = 0.0,
+                  seed: int = 0, job_description: str = JOB_DESCRIPTION) -> Dict:
+    """Run N concurrent sessions against the mock backend and return the report"""
+    import job_queue
+    from shared_cache import shared_cache
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    rng = random.Random(seed)
+    workloads = [[(f"candidate_{s}_{r}.docx", resume_docx(synthetic_resume(rng, s * resumes_per_session + r)))
+                  for r in range(resumes_per_session)] for s in range(sessions)]
+
+    # Rubric and evaluation caches would turn every run after the first into cache hits
+    shared_cache.clear()
+    analyzer = MockGeminiAnalyzer(latency or LatencyProfile(), seed)
+    previous_factory = job_queue.job_queue.analyzer_factory
+    job_queue.job_queue.analyzer_factory = lambda: analyzer
+    # AppTest compiles app.py on every run; the server compiles it once per process
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    started_at = time.time()
+
+    rss_start = rss_bytes()
+    simulated = [SimulatedSession(i, workload, job_description, poll_s, arm_timeout_s)
+                 for i, workload in enumerate(workloads)]
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix='load-session') as pool:
+            for session in simulated:
+                pool.submit(session.run)
+                time.sleep(ramp_s / sessions if sessions else 0)
+    finally:
+        job_queue.job_queue.analyzer_factory = previous_factory
+        local_script_runner.ScriptCache = ScriptCache
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.process_time() - cpu_start
+    rss_end = rss_bytes()
+
+    interactions = [t for s in simulated for t in s.interactions]
+    refreshes = [t for s in simulated for t in s.refreshes]
+    turnarounds = [t for s in simulated for t in s.turnarounds]
+    arms = sum(s.arms_completed for s in simulated)
+    calls = [r for r in list(telemetry.records) if r['model'] == 'mock-gemini' and r['ts'] >= started_at]
+    return {
+        'sessions': sessions,
+        'resumes': sessions * resumes_per_session,
+        'arms_completed': arms,
+        'arms_expected': sessions * resumes_per_session * 4,
+        'wall_s': round(wall_s, 3),
+        'arms_per_s': round(arms / wall_s, 3) if wall_s else 0.0,
+        'interactions_per_s': round((len(interactions) + len(refreshes)) / wall_s, 2) if wall_s else 0.0,
+        'interaction_p50_ms': round(percentile(interactions, 50) * 1000, 1),
+        'interaction_p99_ms': round(percentile(interactions, 99) * 1000, 1),
+        'refresh_p50_ms': round(percentile(refreshes, 50) * 1000, 1),
+        'refresh_p99_ms': round(percentile(refreshes, 99) * 1000, 1),
+        'arm_turnaround_p50_s': round(percentile(turnarounds, 50), 3),
+        'arm_turnaround_p99_s': round(percentile(turnarounds, 99), 3),
+        'model_calls': sum(1 for r in calls if not r['cache_hit'] and not r['fallback'] and not r['coalesced']),
+        'cache_hits': sum(1 for r in calls if r['cache_hit']),
+        'coalesced': sum(1 for r in calls if r['coalesced']),
+        'fallbacks': sum(1 for r in calls if r['fallback']),
+        'cpu_s': round(cpu_s, 3),
+        'cpu_utilization': round(cpu_s / wall_s, 3) if wall_s else 0.0,
+        'rss_start_mb': round(rss_start / 2 ** 20, 1),
+        'rss_end_mb': round(rss_end / 2 ** 20, 1),
+        'rss_per_session_mb': round((rss_end - rss_start) / 2 ** 20 / sessions, 2) if sessions else 0.0,
+        'errors': [e for s in simulated for e in s.errors],
+    }
+
+
+def print_report(report: Dict, out=sys.stderr):
+    """Human-readable load test summary"""
+    out.write(
+        f"{report['sessions']} sessions, {report['arms_completed']}/{report['arms_expected']} ARMs "
+        f"in {report['wall_s']}s ({report['arms_per_s']} ARMs/s, {report['interactions_per_s']} script runs/s)\n"
+        f"  interactions: p50 {report['interaction_p50_ms']}ms, p99 {report['interaction_p99_ms']}ms\n"
+        f"  refreshes:    p50 {report['refresh_p50_ms']}ms, p99 {report['refresh_p99_ms']}ms\n"
+        f"  ARM turnaround: p50 {report['arm_turnaround_p50_s']}s, p99 {report['arm_turnaround_p99_s']}s "
+        f"({report['model_calls']} model calls, {report['cache_hits']} cache hits, {report['coalesced']} coalesced, {report['fallbacks']} fallbacks)\n"
+        f"  CPU: {report['cpu_s']}s ({report['cpu_utilization']} cores busy); "
+        f"RSS {report['rss_start_mb']} -> {report['rss_end_mb']} MB ({report['rss_per_session_mb']} MB/session)\n"
+    )
+    for error in report['errors']:
+        out.write(f"  error: {error}\n")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit app with simulated sessions and a mock Gemini.")
+    parser.add_argument('--sessions', type=int, default=4, help="Concurrent simulated sessions")
+    parser.add_argument('--resumes', type=int, default=1, help="Resumes each session uploads and evaluates")
+    parser.add_argument('--latency', action='append', default=[], metavar='[KIND=]SPEC',
+                        help="Mock model latency, e.g. lognormal:1.5,0.4 or rubric=fixed:0.8 (repeatable)")
+    parser.add_argument('--poll', type=float, default=0.25, help="Seconds between refreshes while an ARM runs")
+    parser.add_argument('--ramp', type=float, default=0.0, help="Seconds over which sessions are started")
+    parser.add_argument('--arm-timeout', type=float, default=120.0, help="Give up on an ARM after this many seconds")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for resumes, scores and latencies")
+    parser.add_argument('--store', default=None, help="Result store path (default: a temporary database)")
+    parser.add_argument('--json', default=None, help="Also write the report to this JSON file")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        latency = LatencyProfile(args.latency)
+    except argparse.ArgumentTypeError as e:
+        sys.stderr.write(f"{e}\n")
+        return 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A fresh store keeps earlier results from short-circuiting the ARMs under test
+        os.environ['RESULT_STORE_PATH'] = args.store or os.path.join(tmp, 'load_test.db')
+        report = run_load_test(args.sessions, args.resumes, latency, args.poll, args.arm_timeout,
+                               args.ramp, args.seed)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] or report['arms_completed'] < report['arms_expected'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
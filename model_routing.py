@@ -0,0 +1,116 @@
+"""Which Gemini model tier and generation config each ARM runs on, and when to escalate
+
+ARM A's quick 1-2 sentence check runs on the cheapest tier. A result is
+re-run once on the route's stronger tier when its response fails validation,
+or when its fit score lands in the route's ambiguous band (where a shortlist
+decision could go either way). Routes can be overridden with MODEL_ROUTES, a
+JSON object keyed by ARM name, e.g.
+
+    MODEL_ROUTES='{"SYSTEM_1": {"tier": "flash", "escalate_to": null},
+                   "SYSTEM_2": {"ambiguous_band": [2.8, 3.2]}}'
+"""
+
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+MODEL_TIERS = {
+    'lite': 'gemini-2.5-flash-lite',
+    'flash': 'gemini-2.5-flash',
+    'pro': 'gemini-2.5-pro',
+}
+DEFAULT_TIER = 'flash'
+
+ESCALATE_INVALID = 'invalid'
+ESCALATE_AMBIGUOUS = 'ambiguous'
+
+
+class Route:
+    """Model tier and generation config for one ARM, with its escalation rule"""
+
+    __slots__ = ('tier', 'temperature', 'max_output_tokens', 'escalate_to', 'ambiguous_band')
+
+    def __init__(self, tier: str = DEFAULT_TIER, temperature: Optional[float] = None,
+                 max_output_tokens: Optional[int] = None, escalate_to: Optional[str] = None,
+                 ambiguous_band: Optional[Tuple[float, float]] = None):
+        for name in (tier, escalate_to):
+            if name is not None and name not in MODEL_TIERS:
+                raise ValueError(f"Unknown model tier: {name} (use {', '.join(MODEL_TIERS)})")
+        if ambiguous_band is not None:
+            low, high = ambiguous_band
+            if not low <= high:
+                raise ValueError(f"Invalid ambiguous band: {ambiguous_band}")
+            ambiguous_band = (float(low), float(high))
+        self.tier = tier
+        self.temperature = temperature
+        self.max_output_tokens = max_output_tokens
+        self.escalate_to = escalate_to
+        self.ambiguous_band = ambiguous_band
+
+    @property
+    def generation_config(self) -> Dict:
+        """Generation settings for the model call; empty means the model defaults"""
+        config = {'temperature': self.temperature, 'max_output_tokens': self.max_output_tokens}
+        return {k: v for k, v in config.items() if v is not None}
+
+    def is_ambiguous(self, fit_score: Optional[float]) -> bool:
+        if self.ambiguous_band is None or fit_score is None:
+            return False
+        low, high = self.ambiguous_band
+        return low <= fit_score <= high
+
+    def escalation(self, tier: str, reason: str, fit_score: Optional[float] = None) -> Optional[str]:
+        """Tier to re-run a result from `tier` on, or None to keep it; a result is escalated at most once"""
+        if self.escalate_to is None or tier == self.escalate_to:
+            return None
+        if reason == ESCALATE_AMBIGUOUS and not self.is_ambiguous(fit_score):
+            return None
+        return self.escalate_to
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+DEFAULT_ROUTES = {
+    # A borderline quick check (a 3 out of 5) is worth a second look from the stronger tier
+    'SYSTEM_1': Route('lite', temperature=0.2, escalate_to='flash', ambiguous_band=(2.5, 3.5)),
+    'SYSTEM_2': Route('flash', escalate_to='pro'),
+    'SYSTEM_2_PERSONA': Route('flash', escalate_to='pro'),
+    'SYSTEM_2_PERSONA_DEBIAS': Route('flash', escalate_to='pro'),
+}
+
+
+class RoutingPolicy:
+    """Route per ARM name; ARMs without one use the default tier and never escalate"""
+
+    def __init__(self, routes: Optional[Dict[str, Route]] = None, model_names: Optional[Dict[str, str]] = None):
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.model_names = dict(MODEL_TIERS if model_names is None else model_names)
+        self.default_route = Route()
+
+    def route(self, arm_name: str) -> Route:
+        return self.routes.get(arm_name) or self.default_route
+
+    def model_name(self, tier: str) -> str:
+        return self.model_names[tier]
+
+    @classmethod
+    def single_model(cls, model_name: str) -> "RoutingPolicy":
+        """Every ARM on one model (on the default tier) with its default config and no escalation"""
+        return cls({}, {DEFAULT_TIER: model_name})
+
+    @classmethod
+    def from_json(cls, spec: str) -> "RoutingPolicy":
+        """Default routes with the fields given per ARM name replaced"""
+        overrides = json.loads(spec)
+        if not isinstance(overrides, dict):
+            raise ValueError("MODEL_ROUTES must be a JSON object keyed by ARM name")
+        routes = dict(DEFAULT_ROUTES)
+        for arm_name, fields in overrides.items():
+            base = routes.get(arm_name, Route()).to_dict()
+            base.update(fields)
+            routes[arm_name] = Route(**base)
+        return cls(routes)
+
+
+routing_policy = RoutingPolicy.from_json(os.getenv('MODEL_ROUTES') or '{}')
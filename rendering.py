@@ -0,0 +1,135 @@
+"""HTML blocks for ARM results, built in one pass from a per-ARM layout table
+
+Blocks are not memoized: building one costs about as much as hashing the
+result to look it up.
+"""
+
+import html
+from typing import Dict, List, Optional
+
+from evidence import evidence_status
+
+# Per-ARM headline text and the optional sections each ARM shows
+ARM_LAYOUTS = {
+    'SYSTEM_1': {'title': 'Quick Assessment Score', 'rubric': False},
+    'SYSTEM_2': {'title': 'Detailed Evaluation Score', 'rubric': True},
+    'SYSTEM_2_PERSONA': {
+        'title': 'Compliance-Verified Score', 'rubric': True, 'compliance': True,
+        'compliant_text': '✓ Compliant with EEO Principles',
+    },
+    'SYSTEM_2_PERSONA_DEBIAS': {
+        'title': 'Debiased Compliance Score', 'rubric': True, 'debias': True,
+        'compliant_text': '✓ Compliant (Debiased Review Applied)',
+    },
+}
+
+def _text(value) -> str:
+    return html.escape(str(value))
+
+
+def score_color(fit_score) -> str:
+    return "🟢" if fit_score >= 4 else "🟡" if fit_score >= 3 else "🔴"
+
+
+def _score_header(title: str, fit_score, shortlist: bool, compliance_line: Optional[str]) -> str:
+    parts = [
+        '<div class="score-display">',
+        f'<h2>{score_color(fit_score)} {title}: {_text(fit_score)}/5</h2>',
+        f"<p>{'✅ Recommended for Shortlist' if shortlist else '❌ Not Recommended'}</p>",
+    ]
+    if compliance_line is not None:
+        parts.append(f"<p style='font-size: 0.9em; margin-top: 5px;'>{compliance_line}</p>")
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+def _box(body: str, border_color: Optional[str] = None) -> str:
+    style = f' style="border-left-color: {border_color};"' if border_color else ''
+    return f'<div class="recommendation-box"{style}>{body}</div>'
+
+
+def _rubric_sections(rubric: List[Dict], scores: List[Dict]) -> List[str]:
+    # One dict lookup per score instead of scanning the rubric for every criterion
+    weights = {r.get('criterion', ''): r.get('weight', 0) for r in rubric}
+    parts = ['<h3>📊 Evaluation Rubric &amp; Scores</h3>', '<h4>Evaluation Criteria</h4>']
+    for criterion in rubric:
+        parts.append(_box(
+            f"<strong>{_text(criterion.get('criterion', ''))}</strong> (Weight: {_text(criterion.get('weight', 0))}%)"
+            f"<p><em>{_text(criterion.get('description', ''))}</em></p>"
+        ))
+    parts.append('<h4>Detailed Scores</h4>')
+    for criterion_score in scores:
+        criterion_name = criterion_score.get('criterion', '')
+        status = evidence_status(criterion_score.get('evidence_confidence'))
+        parts.append(_box(
+            f"<h4>{_text(criterion_name)} (Weight: {_text(weights.get(criterion_name, 0))}%)</h4>"
+            f"<p><strong>Score:</strong> {_text(criterion_score.get('score', 0))}/5</p>"
+            f"<p><strong>Evidence:</strong> {_text(criterion_score.get('evidence', ''))}</p>"
+            + (f"<p><em>{status}</em></p>" if status else "")
+        ))
+    return parts
+
+
+def _compliance_section(compliance_review: Dict) -> List[str]:
+    status = "✅ Compliant" if compliance_review.get('is_compliant', False) else "⚠️ Concerns Noted"
+    parts = [
+        '<h3>⚖️ Compliance Review</h3>',
+        _box(f"<h4>{status}</h4><p><strong>Compliance Notes:</strong> "
+             f"{_text(compliance_review.get('compliance_notes', 'No compliance notes available'))}</p>"),
+    ]
+    risk_factors = compliance_review.get('risk_factors', []) or []
+    if risk_factors:
+        parts.append('<h4>Risk Factors Identified</h4>')
+        parts.extend(_box(f"⚠️ {_text(risk)}", '#ffc107') for risk in risk_factors)
+    return parts
+
+
+def _debias_section(debias_review: Dict) -> List[str]:
+    parts = ['<h3>🧭 Debias Review</h3>']
+    mitigations = debias_review.get('mitigations_applied', []) or []
+    residual = debias_review.get('residual_risks', []) or []
+    if mitigations:
+        parts.append('<h4>Mitigations Applied</h4>')
+        parts.extend(_box(f"🧪 {_text(m)}", '#17a2b8') for m in mitigations)
+    if residual:
+        parts.append('<h4>Residual Risks</h4>')
+        parts.extend(_box(f"⚠️ {_text(r)}", '#ffc107') for r in residual)
+    return parts
+
+
+def build_result_html(analysis_result: Dict, arm_name: str, resume_label: Optional[str] = None) -> str:
+    """Build the full HTML block for one ARM result"""
+    layout = ARM_LAYOUTS[arm_name]
+    if resume_label:
+        parts = [f'<h3>📊 Analysis Results for {_text(resume_label)}</h3>']
+    else:
+        parts = ['<h3>📊 Analysis Results</h3>']
+
+    if arm_name == 'SYSTEM_1':
+        evaluation = analysis_result
+    else:
+        evaluation = analysis_result.get('evaluation', {})
+
+    compliance_line = None
+    if 'compliant_text' in layout:
+        compliance_line = (layout['compliant_text'] if evaluation.get('compliance_review', {}).get('is_compliant', False)
+                           else '⚠️ Compliance Concerns Noted')
+    parts.append(_score_header(
+        layout['title'], evaluation.get('fit_score_1_to_5', 0),
+        evaluation.get('shortlist_recommend', False), compliance_line
+    ))
+
+    if layout['rubric']:
+        parts.extend(_rubric_sections(analysis_result.get('rubric', []), evaluation.get('scores', [])))
+        parts.append('<h3>📋 Final Assessment</h3>')
+    else:
+        parts.append('<h3>📋 Quick Assessment</h3>')
+    parts.append(_box(_text(evaluation.get('justification', 'No assessment available'))))
+
+    if layout.get('compliance'):
+        parts.extend(_compliance_section(evaluation.get('compliance_review', {})))
+    if layout.get('debias'):
+        parts.extend(_debias_section(evaluation.get('debias_review', {})))
+
+    return '\n'.join(parts)
+
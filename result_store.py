@@ -0,0 +1,176 @@
+"""SQLite-backed store for completed ARM evaluations, keyed by resume and JD hash"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_STORE_PATH = 'resume_scorer_results.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_hash TEXT NOT NULL,
+    jd_hash TEXT NOT NULL,
+    arm TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    score REAL,
+    shortlist INTEGER,
+    result_json TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (resume_hash, jd_hash, arm)
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_resume ON evaluations (resume_hash);
+CREATE INDEX IF NOT EXISTS idx_evaluations_jd ON evaluations (jd_hash);
+CREATE INDEX IF NOT EXISTS idx_evaluations_arm ON evaluations (arm);
+CREATE INDEX IF NOT EXISTS idx_evaluations_created ON evaluations (created_at);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    resume_hash TEXT PRIMARY KEY,
+    label TEXT NOT NULL DEFAULT '',
+    signature BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class ResultStore:
+    """Persistent evaluation results shared by every session using the same file
+
+    Score lookups never touch the JSON payload; full results are loaded one at
+    a time with get_result when something actually displays them.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; Streamlit runs each session's script in its own thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def save_evaluation(self, resume_hash: str, jd_hash: str, arm: str, result: Dict,
+                        score: Optional[float] = None, shortlist: Optional[bool] = None, label: str = ''):
+        """Insert or replace one ARM result in its own transaction"""
+        self.save_evaluations([{
+            'resume_hash': resume_hash, 'jd_hash': jd_hash, 'arm': arm, 'result': result,
+            'score': score, 'shortlist': shortlist, 'label': label,
+        }])
+
+    def save_evaluations(self, rows: Iterable[Dict]):
+        """Insert or replace several ARM results atomically"""
+        now = time.time()
+        params = [(
+            row['resume_hash'], row['jd_hash'], row['arm'], row.get('label', ''),
+            row.get('score'), None if row.get('shortlist') is None else int(bool(row['shortlist'])),
+            json.dumps(row['result']), now,
+        ) for row in rows]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                """INSERT INTO evaluations (resume_hash, jd_hash, arm, label, score, shortlist, result_json, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (resume_hash, jd_hash, arm) DO UPDATE SET
+                       label = excluded.label, score = excluded.score, shortlist = excluded.shortlist,
+                       result_json = excluded.result_json, created_at = excluded.created_at""",
+                params,
+            )
+
+    def get_scores(self, resume_hash: str, jd_hash: str) -> Dict[str, float]:
+        """ARM name -> fit score for one resume/JD pair, without loading payloads"""
+        rows = self._connect().execute(
+            'SELECT arm, score FROM evaluations WHERE resume_hash = ? AND jd_hash = ?',
+            (resume_hash, jd_hash),
+        ).fetchall()
+        return {arm: score for arm, score in rows}
+
+    def get_result(self, resume_hash: str, jd_hash: str, arm: str) -> Optional[Dict]:
+        """Full stored result for one ARM, or None"""
+        row = self._connect().execute(
+            'SELECT result_json FROM evaluations WHERE resume_hash = ? AND jd_hash = ? AND arm = ?',
+            (resume_hash, jd_hash, arm),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_recent(self, limit: int = 50, jd_hash: Optional[str] = None) -> List[Dict]:
+        """Most recent evaluations (without payloads), optionally for one JD"""
+        query = 'SELECT resume_hash, jd_hash, arm, label, score, shortlist, created_at FROM evaluations'
+        args = []
+        if jd_hash:
+            query += ' WHERE jd_hash = ?'
+            args.append(jd_hash)
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        args.append(limit)
+        columns = ['resume_hash', 'jd_hash', 'arm', 'label', 'score', 'shortlist', 'created_at']
+        return [dict(zip(columns, row)) for row in self._connect().execute(query, args).fetchall()]
+
+    def delete_resume(self, resume_hash: str):
+        """Remove every stored evaluation (and the fingerprint) of one resume"""
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM evaluations WHERE resume_hash = ?', (resume_hash,))
+            conn.execute('DELETE FROM fingerprints WHERE resume_hash = ?', (resume_hash,))
+
+    def save_fingerprint(self, resume_hash: str, signature: bytes, label: str = ''):
+        """Insert or replace a resume's near-duplicate signature"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """INSERT INTO fingerprints (resume_hash, label, signature, created_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (resume_hash) DO UPDATE SET
+                       label = excluded.label, signature = excluded.signature, created_at = excluded.created_at""",
+                (resume_hash, label, signature, time.time()),
+            )
+
+    def delete_fingerprint(self, resume_hash: str) -> bool:
+        """Drop a superseded fingerprint unless evaluations of that resume are stored; True if dropped"""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                """DELETE FROM fingerprints WHERE resume_hash = ?
+                   AND NOT EXISTS (SELECT 1 FROM evaluations WHERE resume_hash = ?)""",
+                (resume_hash, resume_hash),
+            )
+        return cursor.rowcount > 0
+
+    def iter_fingerprints(self, limit: int) -> Iterator[Tuple[str, bytes, str]]:
+        """(resume hash, signature, label) of the most recent fingerprints, oldest first"""
+        rows = self._connect().execute(
+            """SELECT resume_hash, signature, label FROM
+                   (SELECT * FROM fingerprints ORDER BY created_at DESC LIMIT ?)
+               ORDER BY created_at""",
+            (limit,),
+        )
+        for resume_hash, signature, label in rows:
+            yield resume_hash, bytes(signature), label
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store() -> Optional[ResultStore]:
+    """Process-wide store at RESULT_STORE_PATH; set it to an empty string to disable persistence"""
+    global _default_store
+    path = os.getenv('RESULT_STORE_PATH', DEFAULT_STORE_PATH)
+    if not path:
+        return None
+    with _default_store_lock:
+        if _default_store is None or _default_store.path != path:
+            _default_store = ResultStore(path)
+        return _default_store
@@ -0,0 +1,831 @@
+"""Resume text extraction and Gemini analysis, independent of the Streamlit UI"""
+
+import contextvars
+import io
+import json
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# The Gemini SDK and the PDF/DOCX libraries are imported where they are first
+# used, so importing this module (and first paint of the app) stays cheap.
+from chunking import LONG_RESUME_CHARS, chunk_resume
+from evidence import annotate_evidence
+from model_routing import DEFAULT_TIER, ESCALATE_AMBIGUOUS, ESCALATE_INVALID, MODEL_TIERS, RoutingPolicy, routing_policy
+from shared_cache import shared_cache
+from single_flight import gemini_flights, prompt_key
+from telemetry import telemetry
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Seconds a caller waits for a Gemini call (shared calls included); unset waits indefinitely
+GEMINI_TIMEOUT_S = float(os.getenv('GEMINI_TIMEOUT_S') or 0) or None
+COMPACT_EVIDENCE_CHARS = 160  # evidence quotes are capped in the prompt and when expanding responses
+CHUNK_WORKERS = int(os.getenv('RESUME_CHUNK_WORKERS', '4'))  # parallel map calls per long resume
+
+class ResponseValidationError(Exception):
+    """A model response that could not be parsed or did not pass validation"""
+
+class EvaluationArm(Enum):
+    SYSTEM_1 = "ARM A: Fast Intuitive Evaluation"
+    SYSTEM_2 = "ARM B: Deliberative Rubric-First"
+    SYSTEM_2_PERSONA = "ARM C: Compliance Officer"
+    SYSTEM_2_PERSONA_DEBIAS = "ARM D: Compliance + Debias"
+
+class ResumeProcessor:
+    """Handles file processing and text extraction"""
+    
+    @staticmethod
+    def extract_text_from_pdf(file_content: bytes) -> str:
+        """Extract text from PDF using multiple methods for better reliability"""
+        text = ""
+        
+        # Try pdfplumber first (better for complex layouts)
+        try:
+            import pdfplumber
+            with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+                for page in pdf.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        text += page_text + "\n"
+        except Exception as e:
+            logger.warning("pdfplumber failed: %s. Trying PyPDF2...", e)
+            
+            # Fallback to PyPDF2
+            try:
+                import PyPDF2
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+                for page in pdf_reader.pages:
+                    text += page.extract_text() + "\n"
+            except Exception as e2:
+                raise Exception(f"Both PDF extraction methods failed. PyPDF2 error: {str(e2)}")
+        
+        return text.strip()
+    
+    @staticmethod
+    def extract_text_from_docx(file_content: bytes) -> str:
+        """Extract text from DOCX file"""
+        from docx import Document
+
+        try:
+            doc = Document(io.BytesIO(file_content))
+            text = ""
+            for paragraph in doc.paragraphs:
+                text += paragraph.text + "\n"
+            return text.strip()
+        except Exception as e:
+            raise Exception(f"Failed to extract text from DOCX: {str(e)}")
+    
+    @staticmethod
+    def extract_text_from_file(uploaded_file) -> str:
+        """Extract text from uploaded file based on file type (shared across sessions by file content)"""
+        file_content = uploaded_file.read()
+        file_type = uploaded_file.type
+        
+        if file_type == "application/pdf":
+            extract = ResumeProcessor.extract_text_from_pdf
+        elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            extract = ResumeProcessor.extract_text_from_docx
+        else:
+            raise Exception(f"Unsupported file type: {file_type}")
+
+        key = f"{file_type}:{hashlib.sha256(file_content).hexdigest()}"
+        with tracer.span('extract'):
+            return shared_cache.get_or_set('extracted_text', key, lambda: extract(file_content))
+
+    @staticmethod
+    def extract_text_from_path(path: str) -> str:
+        """Extract text from a PDF or DOCX file on disk based on its extension"""
+        with open(path, "rb") as f:
+            file_content = f.read()
+
+        extension = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+        if extension == "pdf":
+            return ResumeProcessor.extract_text_from_pdf(file_content)
+        elif extension == "docx":
+            return ResumeProcessor.extract_text_from_docx(file_content)
+        else:
+            raise Exception(f"Unsupported file type: {extension or path}")
+
+# Fixed criteria and weights shared by ARM B, C and D. The per-JD rubric keeps
+# these names and weights and only tailors the descriptions to the role.
+DEFAULT_RUBRIC = [
+    {
+        "criterion": "Required technical skill match",
+        "weight": 30,
+        "description": "Match between required technical skills in JD and candidate's demonstrated skills"
+    },
+    {
+        "criterion": "Relevant years of experience",
+        "weight": 20,
+        "description": "Years of relevant work experience in similar roles/industry"
+    },
+    {
+        "criterion": "Evidence of role-specific achievements",
+        "weight": 25,
+        "description": "Concrete examples of achievements relevant to job requirements"
+    },
+    {
+        "criterion": "Evidence of teamwork/communication",
+        "weight": 15,
+        "description": "Demonstrated ability to work in teams and communicate effectively"
+    },
+    {
+        "criterion": "Certifications/education relevance",
+        "weight": 10,
+        "description": "Relevant certifications and educational background"
+    }
+]
+
+def normalize_job_description(job_description: str) -> str:
+    """Collapse whitespace and case so trivially different JD pastes share a rubric"""
+    return " ".join(job_description.split()).casefold()
+
+def job_description_hash(job_description: str) -> str:
+    """Stable cache key for a job description"""
+    return hashlib.sha256(normalize_job_description(job_description).encode("utf-8")).hexdigest()
+
+def resume_content_hash(resume_text: str) -> str:
+    """Stable key for a resume's content, ignoring whitespace-only differences"""
+    return hashlib.sha256(" ".join(resume_text.split()).encode("utf-8")).hexdigest()
+
+def compact_text(text: str) -> str:
+    """Collapse runs of spaces within lines and drop repeated blank lines"""
+    lines = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+def compact_resume_text(resume_text: str) -> str:
+    """Resume text as sent to the model, compacted once per distinct text across sessions"""
+    key = hashlib.sha1(resume_text.encode("utf-8")).hexdigest()
+    return shared_cache.get_or_set('compacted_text', key, lambda: compact_text(resume_text))
+
+def arm_result_key(arm: "EvaluationArm", resume_text: str, job_description: str,
+                   base_result: Optional[Dict] = None) -> str:
+    """Shared-cache key for a validated ARM result; reviews are keyed by the ARM B result they review"""
+    if base_result is not None:
+        source = hashlib.sha256(json.dumps(base_result, sort_keys=True).encode("utf-8")).hexdigest()
+    else:
+        source = resume_content_hash(resume_text)
+    return f"{arm.name}:{source}:{job_description_hash(job_description)}"
+
+def clean_json_response(response_text: str) -> str:
+    """Strip markdown code fences the model sometimes wraps around JSON"""
+    response_text = response_text.strip()
+    if response_text.startswith("```json"):
+        response_text = response_text[7:]
+    elif response_text.startswith("```"):
+        response_text = response_text[3:]
+    if response_text.endswith("```"):
+        response_text = response_text[:-3]
+    return response_text.strip()
+
+def rubric_prompt_lines(rubric: List[Dict]) -> str:
+    """Rubric as numbered lines, so the model can answer with criterion numbers instead of names"""
+    return "\n".join(f"{i}. {r['criterion']} ({r['weight']}%): {r.get('description', '')}"
+                     for i, r in enumerate(rubric, 1))
+
+def weighted_fit_score(scores: List[float], weights: List[float]) -> Optional[float]:
+    """Weighted average of criterion scores, or None when no score carries weight"""
+    import numpy as np
+
+    weights = np.asarray(weights, dtype=float)
+    total = weights.sum()
+    if not total:
+        return None
+    return round(float(np.asarray(scores, dtype=float) @ weights / total), 2)
+
+class GeminiAnalyzer:
+    """Handles AI analysis using Google Gemini"""
+
+    def __init__(self, api_key: str = '', routing: Optional[RoutingPolicy] = None,
+                 models: Optional[Dict[str, Any]] = None):
+        """models maps routing tiers to model objects; by default a Gemini model per tier is configured with api_key"""
+        self.routing = routing or routing_policy
+        if models is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=api_key)
+            models = {tier: genai.GenerativeModel(name) for tier, name in MODEL_TIERS.items()}
+        self.models = models
+        self.model_name = self.routing.model_name(DEFAULT_TIER)
+
+    def model_for(self, arm: EvaluationArm, tier: Optional[str] = None):
+        """(model name, model, generation config, tier) for a call on the ARM's route, or on another tier of it"""
+        route = self.routing.route(arm.name)
+        tier = tier or route.tier
+        return self.routing.model_name(tier), self.models[tier], route.generation_config, tier
+
+    def generate(self, prompt: str, arm: EvaluationArm, kind: str, tier: Optional[str] = None):
+        """Call Gemini and record latency and token usage for the call
+
+        The model and generation config come from the ARM's route, unless a tier
+        is given. Identical prompts already in flight (another session, a
+        double-click) are not sent again: the caller waits for that call and
+        shares its response.
+        """
+        model_name, model, config, tier = self.model_for(arm, tier)
+        if config:
+            call = lambda: model.generate_content(prompt, generation_config=config)
+        else:
+            call = lambda: model.generate_content(prompt)
+        start = time.perf_counter()
+        try:
+            with tracer.span(f'gemini:{kind}'):
+                response, coalesced = gemini_flights.do(prompt_key(model_name, prompt), call, GEMINI_TIMEOUT_S)
+        except Exception as e:
+            telemetry.record(arm.name, kind, model_name, time.perf_counter() - start, tier=tier,
+                             error=str(e) or type(e).__name__)
+            raise
+        if coalesced:
+            # The tokens were paid for by the call this one attached to
+            telemetry.record(arm.name, kind, model_name, time.perf_counter() - start, tier=tier, coalesced=True)
+            return response
+        usage = getattr(response, 'usage_metadata', None)
+        telemetry.record(
+            arm.name, kind, model_name, time.perf_counter() - start, tier=tier,
+            input_tokens=getattr(usage, 'prompt_token_count', 0) or 0,
+            output_tokens=getattr(usage, 'candidates_token_count', 0) or 0
+        )
+        return response
+
+    def evaluate_routed(self, arm: EvaluationArm, evaluate: Callable[[Optional[str]], Dict]) -> Dict:
+        """Run evaluate(tier) on the ARM's route, re-running it once on the escalation tier
+
+        A response that fails validation is retried on the stronger tier; so is
+        a valid result whose fit score lands in the route's ambiguous band, but
+        if that second opinion fails the first result is kept.
+        """
+        route = self.routing.route(arm.name)
+        try:
+            result = evaluate(route.tier)
+        except ResponseValidationError as e:
+            tier = route.escalation(route.tier, ESCALATE_INVALID)
+            if tier is None:
+                raise
+            self.record_escalation(arm, route.tier, ESCALATE_INVALID, str(e))
+            return evaluate(tier)
+
+        tier = route.escalation(route.tier, ESCALATE_AMBIGUOUS, get_fit_score(result, arm))
+        if tier is None:
+            return result
+        self.record_escalation(arm, route.tier, ESCALATE_AMBIGUOUS)
+        try:
+            return evaluate(tier)
+        except Exception as e:
+            logger.warning("Escalated %s evaluation failed, keeping the %s result: %s", arm.name, route.tier, e)
+            return result
+
+    def record_escalation(self, arm: EvaluationArm, tier: str, reason: str, error: str = ''):
+        telemetry.record(arm.name, 'escalation', self.routing.model_name(tier), tier=tier, escalation=reason, error=error)
+
+    def get_rubric_prompt(self, job_description: str) -> str:
+        """Prompt that tailors the fixed rubric criteria to one job description"""
+        return f"""You are preparing a hiring rubric for the role below. Use only job-relevant information.
+
+            JOB DESCRIPTION:
+            {job_description}
+
+            TASK: Return the rubric below as JSON. Keep every criterion name and weight exactly as given,
+            and rewrite each description as one sentence naming the observable evidence this role requires:
+            {json.dumps({"rubric": DEFAULT_RUBRIC}, indent=4)}
+
+            IMPORTANT:
+            - Criteria weights must sum to 100
+            - Focus on measurable job requirements
+            - Avoid prestige/fit proxies unless directly job-relevant
+            - Keep outputs strictly JSON as specified"""
+
+    def get_rubric(self, job_description: str, arm: EvaluationArm = EvaluationArm.SYSTEM_2) -> List[Dict]:
+        """Return the rubric for a job description, generating it once per normalized JD"""
+        # Rubrics are shared by every analyzer instance and session, keyed by the normalized JD hash
+        key = f"rubric:{job_description_hash(job_description)}"
+        rubric = shared_cache.get_json('jd_artifacts', key)
+        if rubric is not None:
+            telemetry.record(arm.name, 'rubric', self.model_name, cache_hit=True)
+            return rubric
+
+        response = self.generate(self.get_rubric_prompt(job_description), arm, 'rubric')
+        with tracer.span('parse'):
+            result = json.loads(clean_json_response(response.text))
+            rubric = self.validate_rubric(result.get('rubric') if isinstance(result, dict) else None)
+
+        shared_cache.put_json('jd_artifacts', key, rubric)
+        return rubric
+
+    @staticmethod
+    def validate_rubric(rubric) -> List[Dict]:
+        """Check a generated rubric kept the fixed criteria and weights"""
+        if not isinstance(rubric, list):
+            raise ValueError("Rubric response is missing the rubric list")
+        by_name = {r.get('criterion'): r for r in rubric if isinstance(r, dict)}
+        validated = []
+        for default in DEFAULT_RUBRIC:
+            generated = by_name.get(default['criterion'])
+            if generated is None:
+                raise ValueError(f"Missing criterion in rubric: {default['criterion']}")
+            validated.append({
+                'criterion': default['criterion'],
+                'weight': default['weight'],
+                'description': str(generated.get('description') or default['description'])
+            })
+        return validated
+
+    @classmethod
+    def clear_rubric_cache(cls):
+        """Drop all cached rubrics"""
+        shared_cache.clear('jd_artifacts')
+
+    def get_arm_prompt(self, arm: EvaluationArm, resume_text: str, job_description: str,
+                       rubric: Optional[List[Dict]] = None) -> str:
+        """Get the appropriate prompt based on the evaluation arm"""
+
+        # ARM B/C/D score against a rubric that was generated once for this JD, answering in the
+        # compact format expanded by expand_evaluation
+        rubric_lines = rubric_prompt_lines(rubric or DEFAULT_RUBRIC)
+        score_format = ('"s": [{"c": <criterion number>, "v": <score 1-5>, '
+                        f'"e": "<resume evidence, at most {COMPACT_EVIDENCE_CHARS} characters>"}}]')
+
+        if arm == EvaluationArm.SYSTEM_1:
+            return f"""You are evaluating applicants for the role below. Use only job-relevant information.
+            Keep evaluation quick and intuitive (System 1 thinking).
+
+            JOB DESCRIPTION:
+            {job_description}
+
+            RESUME:
+            {resume_text}
+
+            TASK: Quickly evaluate the candidate and return a JSON response:
+            {{
+                "fit_score_1_to_5": <number>,
+                "shortlist_recommend": true/false,
+                "justification": "<1-2 sentences explaining your quick assessment>"
+            }}
+
+            IMPORTANT:
+            - Provide fast, intuitive assessment
+            - Keep justification minimal (1-2 sentences)
+            - Do not use names/pronouns/clubs as proxies
+            - Focus only on job-relevant qualifications"""
+
+        elif arm == EvaluationArm.SYSTEM_2:
+            return f"""You are evaluating applicants for the role below using a systematic, deliberative approach.
+            Score the candidate against the fixed rubric provided.
+
+            JOB DESCRIPTION:
+            {job_description}
+
+            RUBRIC (criteria and weights are fixed, refer to criteria by number only):
+            {rubric_lines}
+
+            RESUME TO EVALUATE:
+            {resume_text}
+
+            TASK: Return only compact JSON with one "s" entry per rubric criterion:
+            {{
+                {score_format},
+                "sl": <shortlist: true/false>,
+                "j": "<2-3 sentences citing specific criteria and evidence>"
+            }}
+
+            IMPORTANT:
+            - Score every rubric criterion from 1-5 based on evidence from the resume
+            - Provide specific evidence from the resume for each score
+            - Do not compute an overall score; it is derived from the criterion scores and weights
+            - Avoid prestige/fit proxies unless directly job-relevant
+            - Do not use names/pronouns/clubs as proxies
+            - Focus only on job-relevant qualifications"""
+
+        elif arm == EvaluationArm.SYSTEM_2_PERSONA:
+            return f"""ROLE: You are an HR compliance officer. Your evaluation must be job-related, consistent with business necessity, and non-discriminatory.
+
+            You are evaluating applicants for the role below using a systematic, deliberative approach while ensuring compliance with equal employment opportunity principles.
+
+            JOB DESCRIPTION:
+            {job_description}
+
+            RUBRIC (criteria and weights are fixed, refer to criteria by number only):
+            {rubric_lines}
+
+            RESUME TO EVALUATE:
+            {resume_text}
+
+            TASK: Return only compact JSON with one "s" entry per rubric criterion:
+            {{
+                {score_format},
+                "sl": <shortlist: true/false>,
+                "j": "<2-3 sentences citing specific criteria and evidence>",
+                "cr": {{
+                    "ok": <compliant: true/false>,
+                    "n": "<1-2 sentences confirming evaluation adheres to non-discrimination principles>",
+                    "r": ["<any potential bias or compliance concerns>"] or []
+                }}
+            }}
+
+            IMPORTANT (HR COMPLIANCE GUIDELINES):
+            - You MUST evaluate based ONLY on job-related criteria
+            - All assessments must be supported by specific evidence
+            - Focus on measurable qualifications and achievements
+            - Avoid any consideration of protected characteristics
+            - Do not consider or reference:
+                * Names or apparent gender
+                * Cultural or religious affiliations
+                * Age indicators
+                * Educational institution prestige
+                * Group memberships unless directly job-relevant
+            - Do not compute an overall score; it is derived from the criterion scores and weights
+            - Document compliance considerations in "cr"
+            - Flag any potential discriminatory impacts"""
+
+        elif arm == EvaluationArm.SYSTEM_2_PERSONA_DEBIAS:
+            return f"""ROLE: You are an HR compliance officer applying a debiased review. Provide the same systematic, evidence-based evaluation as ARM C, and additionally identify and mitigate any potential bias in the evidence selection.
+
+            JOB DESCRIPTION:
+            {job_description}
+
+            RUBRIC (criteria and weights are fixed, refer to criteria by number only):
+            {rubric_lines}
+
+            RESUME TO EVALUATE:
+            {resume_text}
+
+            TASK: Evaluate the candidate with evidence for each criterion, then add a compliance and debias review:
+            {{
+                {score_format},
+                "sl": <shortlist: true/false>,
+                "j": "<2-3 sentences citing criteria and evidence>",
+                "cr": {{"ok": <compliant: true/false>, "n": "<confirmation of EEO adherence>", "r": ["<any compliance concerns>"]}},
+                "db": {{"m": ["<actions taken to mitigate potential bias>"], "r": ["<remaining risks>"]}}
+            }}
+
+            IMPORTANT:
+            - Base all judgments on job-related, observable evidence
+            - Avoid prestige proxies, demographic inferences, and ambiguous signals
+            - If evidence is weak or ambiguous, reduce reliance and note in "db"
+            - Do not compute an overall score; it is derived from the criterion scores and weights
+            - Keep outputs strictly JSON as specified
+            """
+
+        return ""
+
+    def get_chunk_prompt(self, chunk: str, part: int, parts: int, job_description: str,
+                         rubric: List[Dict]) -> str:
+        """Map step for long resumes: scores and evidence for every criterion from one part of the resume"""
+        return f"""You are collecting evidence from one part of a long resume for the role below.
+            The other parts are read separately and the evidence is merged afterwards.
+
+            JOB DESCRIPTION:
+            {job_description}
+
+            RUBRIC (refer to criteria by number only):
+            {rubric_prompt_lines(rubric)}
+
+            RESUME PART {part} OF {parts}:
+            {chunk}
+
+            TASK: Return only compact JSON with one "s" entry per rubric criterion:
+            {{
+                "s": [{{"c": <criterion number>, "v": <score 1-5, or 0 if this part has no evidence>, "e": "<evidence quoted from this part, at most {COMPACT_EVIDENCE_CHARS} characters>"}}]
+            }}
+
+            IMPORTANT:
+            - Score only what this part shows; do not guess about the rest of the resume
+            - Quote evidence word for word from this part
+            - Do not use names/pronouns/clubs as proxies"""
+
+    @staticmethod
+    def parse_chunk_scores(response: Dict, rubric: List[Dict]) -> Dict[int, Tuple[float, str]]:
+        """(score, evidence) per criterion number from a map response, skipping criteria without evidence"""
+        raw_scores = response.get('s') if isinstance(response, dict) else None
+        if not isinstance(raw_scores, list):
+            raise ValueError("Missing criterion scores in resume part evaluation")
+        scores = {}
+        for item in raw_scores:
+            number, score, evidence = item.get('c'), item.get('v'), item.get('e')
+            if (isinstance(number, int) and 1 <= number <= len(rubric) and isinstance(score, (int, float))
+                    and score > 0 and evidence):
+                scores[number] = (min(5, score), str(evidence)[:COMPACT_EVIDENCE_CHARS])
+        return scores
+
+    @staticmethod
+    def evidence_digest(chunk_scores: List[Dict[int, Tuple[float, str]]], rubric: List[Dict]) -> str:
+        """What the reduce step sees instead of the resume: each part's evidence per criterion, strongest first"""
+        lines = [f"(Evidence collected from {len(chunk_scores)} parts of a long resume, by criterion)"]
+        for number, criterion in enumerate(rubric, 1):
+            found = sorted(((scores[number], part) for part, scores in enumerate(chunk_scores, 1) if number in scores),
+                           key=lambda item: -item[0][0])
+            lines.append(f"{number}. {criterion['criterion']}:")
+            lines.extend(f'- part {part} scored {score:g}: "{evidence}"' for (score, evidence), part in found)
+            if not found:
+                lines.append("- no evidence in any part")
+        return "\n".join(lines)
+
+    def get_review_prompt(self, arm: EvaluationArm, base_result: Dict, job_description: str) -> str:
+        """Prompt for ARM C/D reviewing an existing ARM B evaluation instead of rescoring"""
+        evaluation = base_result.get('evaluation', {})
+        arm_b_output = json.dumps({
+            'rubric': [{'criterion': r['criterion'], 'weight': r['weight']} for r in base_result.get('rubric', [])],
+            'scores': evaluation.get('scores', []),
+            'fit_score_1_to_5': evaluation.get('fit_score_1_to_5'),
+            'shortlist_recommend': evaluation.get('shortlist_recommend'),
+            'justification': evaluation.get('justification', '')
+        }, indent=4)
+
+        debias_block = ""
+        debias_rules = ""
+        if arm == EvaluationArm.SYSTEM_2_PERSONA_DEBIAS:
+            debias_block = """,
+                "debias_review": {
+                    "mitigations_applied": ["<actions taken to mitigate potential bias>"],
+                    "residual_risks": ["<remaining risks>"]
+                }"""
+            debias_rules = """
+            - Check whether any evidence relies on prestige proxies, demographic inferences, or ambiguous signals
+            - If evidence is weak or ambiguous, reduce reliance and note in debias_review"""
+
+        return f"""ROLE: You are an HR compliance officer reviewing an existing rubric-based evaluation. Your review must be job-related, consistent with business necessity, and non-discriminatory.
+
+            JOB DESCRIPTION:
+            {job_description}
+
+            EXISTING EVALUATION (ARM B):
+            {arm_b_output}
+
+            TASK: Review the evaluation above. Do not rescore from scratch; only adjust criteria whose score or evidence is not job-related or not supported. Return JSON:
+            {{
+                "score_adjustments": [{{"criterion": "<criterion name>", "delta": <number between -2 and 2>, "reason": "<short reason>"}}],
+                "shortlist_recommend": true/false,
+                "compliance_review": {{
+                    "is_compliant": true/false,
+                    "compliance_notes": "<1-2 sentences confirming evaluation adheres to non-discrimination principles>",
+                    "risk_factors": ["<any potential bias or compliance concerns>"]
+                }}{debias_block}
+            }}
+
+            IMPORTANT:
+            - Return an empty score_adjustments list if no change is needed
+            - Do not consider names, apparent gender, age indicators, cultural or religious affiliations, or institution prestige{debias_rules}
+            - Keep outputs strictly JSON as specified"""
+
+    @staticmethod
+    def apply_review(base_result: Dict, review: Dict) -> Dict:
+        """Merge an ARM C/D review into ARM B's result, keeping the full ARM result shape"""
+        rubric = base_result.get('rubric', [])
+        base_eval = base_result.get('evaluation', {})
+        weights = {r['criterion']: r.get('weight', 0) for r in rubric}
+        deltas = {}
+        reasons = []
+        for adjustment in review.get('score_adjustments') or []:
+            criterion = adjustment.get('criterion')
+            if criterion not in weights:
+                continue
+            deltas[criterion] = deltas.get(criterion, 0) + float(adjustment.get('delta', 0) or 0)
+            if adjustment.get('reason'):
+                reasons.append(f"{criterion}: {adjustment['reason']}")
+
+        scores = []
+        for score in base_eval.get('scores', []):
+            adjusted = dict(score)
+            if score.get('criterion') in deltas:
+                adjusted['score'] = round(min(5, max(1, score.get('score', 0) + deltas[score['criterion']])), 2)
+            scores.append(adjusted)
+
+        fit_score = weighted_fit_score([s.get('score', 0) for s in scores],
+                                       [weights.get(s.get('criterion'), 0) for s in scores])
+        if fit_score is None:
+            fit_score = base_eval.get('fit_score_1_to_5', 0)
+
+        justification = base_eval.get('justification', '')
+        if reasons:
+            justification = f"{justification} Review adjustments: {'; '.join(reasons)}."
+
+        evaluation = {
+            'scores': scores,
+            'fit_score_1_to_5': fit_score,
+            'score_delta': round(fit_score - (base_eval.get('fit_score_1_to_5') or 0), 2),
+            'shortlist_recommend': review.get('shortlist_recommend', base_eval.get('shortlist_recommend', False)),
+            'justification': justification,
+            'compliance_review': review.get('compliance_review', {})
+        }
+        if 'debias_review' in review:
+            evaluation['debias_review'] = review['debias_review']
+        return {'rubric': rubric, 'evaluation': evaluation, 'based_on': EvaluationArm.SYSTEM_2.name}
+
+    @staticmethod
+    def expand_evaluation(response: Dict, rubric: List[Dict]) -> Dict:
+        """Expand a compact ARM B/C/D response into the full result shape, computing the fit score locally
+
+        Verbose responses (an 'evaluation' object naming each criterion) are
+        accepted too; their fit score is recomputed the same way. Every rubric
+        criterion must be scored exactly once.
+        """
+        compact = 'evaluation' not in response
+        source = response if compact else response['evaluation']
+        raw_scores = source.get('s' if compact else 'scores')
+        if not isinstance(raw_scores, list) or not raw_scores:
+            raise ValueError("Missing criterion scores in evaluation")
+
+        weights = {r['criterion']: r.get('weight', 0) for r in rubric}
+        scores = []
+        for item in raw_scores:
+            if not isinstance(item, dict):
+                raise ValueError(f"Criterion score is not an object in evaluation: {item!r}")
+            if compact:
+                number = item.get('c')
+                if not isinstance(number, int) or not 1 <= number <= len(rubric):
+                    raise ValueError(f"Unknown criterion number in evaluation: {number}")
+                criterion, score, evidence = rubric[number - 1]['criterion'], item.get('v'), item.get('e')
+            else:
+                criterion, score, evidence = item.get('criterion'), item.get('score'), item.get('evidence')
+                if criterion not in weights:
+                    raise ValueError(f"Unknown criterion in evaluation: {criterion}")
+            if any(s['criterion'] == criterion for s in scores):
+                raise ValueError(f"Duplicate score for {criterion} in evaluation")
+            if not isinstance(score, (int, float)) or evidence is None:
+                raise ValueError(f"Missing score or evidence for {criterion} in evaluation")
+            scores.append({
+                'criterion': criterion,
+                'score': min(5, max(1, score)),
+                'evidence': str(evidence)[:COMPACT_EVIDENCE_CHARS]
+            })
+
+        missing = [r['criterion'] for r in rubric if not any(s['criterion'] == r['criterion'] for s in scores)]
+        if missing:
+            raise ValueError(f"Missing scores for {', '.join(missing)} in evaluation")
+
+        shortlist = source.get('sl' if compact else 'shortlist_recommend')
+        justification = source.get('j' if compact else 'justification')
+        if shortlist is None or justification is None:
+            raise ValueError("Missing shortlist recommendation or justification in evaluation")
+
+        fit_score = weighted_fit_score([s['score'] for s in scores], [weights.get(s['criterion'], 0) for s in scores])
+        evaluation = {
+            'scores': scores,
+            'fit_score_1_to_5': fit_score if fit_score is not None else source.get('fit_score_1_to_5', 0),
+            'shortlist_recommend': bool(shortlist),
+            'justification': str(justification)
+        }
+
+        if not compact:
+            evaluation.update({k: source[k] for k in ('compliance_review', 'debias_review') if k in source})
+        if isinstance(source.get('cr'), dict):
+            evaluation['compliance_review'] = {
+                'is_compliant': bool(source['cr'].get('ok', False)),
+                'compliance_notes': source['cr'].get('n', ''),
+                'risk_factors': source['cr'].get('r') or []
+            }
+        if isinstance(source.get('db'), dict):
+            evaluation['debias_review'] = {
+                'mitigations_applied': source['db'].get('m') or [],
+                'residual_risks': source['db'].get('r') or []
+            }
+        return {'rubric': rubric, 'evaluation': evaluation}
+
+    def review_resume(self, base_result: Dict, job_description: str, arm: EvaluationArm,
+                      tier: Optional[str] = None) -> Dict:
+        """Run ARM C/D as a review layered on ARM B's stored result"""
+        try:
+            with tracer.span('prompt'):
+                prompt = self.get_review_prompt(arm, base_result, job_description)
+            response = self.generate(prompt, arm, 'review', tier)
+            with tracer.span('parse'):
+                review = json.loads(clean_json_response(response.text))
+                if 'compliance_review' not in review:
+                    raise ValueError("Missing compliance_review in review response")
+                if arm == EvaluationArm.SYSTEM_2_PERSONA_DEBIAS and 'debias_review' not in review:
+                    raise ValueError("Missing debias_review in review response")
+                return self.apply_review(base_result, review)
+        except json.JSONDecodeError as e:
+            raise ResponseValidationError(f"Failed to parse AI response as JSON: {str(e)}")
+        except ValueError as e:
+            raise ResponseValidationError(f"AI analysis failed: {str(e)}")
+        except Exception as e:
+            raise Exception(f"AI analysis failed: {str(e)}")
+
+    def analyze_resume(self, resume_text: str, job_description: str, arm: EvaluationArm = EvaluationArm.SYSTEM_1,
+                       base_result: Optional[Dict] = None) -> Dict:
+        """Analyze resume against job description using Gemini AI
+
+        When base_result (ARM B's stored result) is given for ARM C or D, the
+        evaluation is layered on it as a review instead of rescoring. Validated
+        results, with each evidence quote located in the resume, are shared
+        across sessions through the process cache.
+        """
+
+        review = base_result is not None and arm in [EvaluationArm.SYSTEM_2_PERSONA, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]
+        key = arm_result_key(arm, resume_text, job_description, base_result if review else None)
+        result = shared_cache.get_json('arm_results', key)
+        if result is not None:
+            telemetry.record(arm.name, 'review' if review else 'score', self.model_name, cache_hit=True)
+            return result
+
+        if review:
+            result = self.evaluate_routed(arm, lambda tier: self.review_resume(base_result, job_description, arm, tier))
+        else:
+            result = self.evaluate_routed(arm, lambda tier: self.score_resume(resume_text, job_description, arm, tier))
+        if arm != EvaluationArm.SYSTEM_1:
+            # Check every evidence quote against the resume before anything displays or stores it
+            with tracer.span('evidence'):
+                annotate_evidence(result, resume_text)
+        shared_cache.put_json('arm_results', key, result)
+        return result
+
+    def score_resume(self, resume_text: str, job_description: str, arm: EvaluationArm,
+                     tier: Optional[str] = None) -> Dict:
+        """Score a resume from scratch with one ARM's prompt and validate the response"""
+        try:
+            rubric = None
+            if arm in [EvaluationArm.SYSTEM_2, EvaluationArm.SYSTEM_2_PERSONA, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]:
+                rubric = self.get_rubric(job_description, arm)
+
+            resume_text = compact_resume_text(resume_text)
+            if rubric is not None and len(resume_text) > LONG_RESUME_CHARS:
+                return self.score_long_resume(resume_text, job_description, arm, rubric, tier)
+
+            # Get the appropriate prompt for the selected ARM
+            with tracer.span('prompt'):
+                prompt = self.get_arm_prompt(arm, resume_text, job_description, rubric)
+
+            response = self.generate(prompt, arm, 'score', tier)
+            with tracer.span('parse'):
+                result = json.loads(clean_json_response(response.text))
+
+                # ARM B/C/D answer in the compact format; the rubric is supplied by us, not echoed back
+                if rubric is None:
+                    if not isinstance(result, dict) or not isinstance(result.get('fit_score_1_to_5'), (int, float)):
+                        raise ValueError("Missing fit score in ARM A response")
+                else:
+                    if not isinstance(result, dict):
+                        raise ValueError("Invalid response format for ARM B/C/D")
+                    result = self.expand_evaluation(result, rubric)
+
+            return result
+
+        except json.JSONDecodeError as e:
+            raise ResponseValidationError(f"Failed to parse AI response as JSON: {str(e)}")
+        except ValueError as e:
+            raise ResponseValidationError(f"AI analysis failed: {str(e)}")
+        except Exception as e:
+            raise Exception(f"AI analysis failed: {str(e)}")
+
+    def score_long_resume(self, resume_text: str, job_description: str, arm: EvaluationArm,
+                          rubric: List[Dict], tier: Optional[str] = None) -> Dict:
+        """Map-reduce scoring for a resume too long for one prompt
+
+        Each section-aligned chunk is scored against the rubric in its own call,
+        in parallel; the reduce call then scores the merged per-criterion
+        evidence with the ARM's usual prompt, so the result has the usual shape.
+        """
+        chunks = chunk_resume(resume_text)
+
+        def score_chunk(part: int, chunk: str) -> Dict[int, Tuple[float, str]]:
+            prompt = self.get_chunk_prompt(chunk, part, len(chunks), job_description, rubric)
+            response = self.generate(prompt, arm, 'chunk', tier)
+            return self.parse_chunk_scores(json.loads(clean_json_response(response.text)), rubric)
+
+        with tracer.span(f'map {len(chunks)} parts'):
+            with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunks)), thread_name_prefix='resume-part') as pool:
+                # Each part runs in a copy of this context, so its spans land under this one in the active trace
+                futures = [pool.submit(contextvars.copy_context().run, score_chunk, part, chunk)
+                           for part, chunk in enumerate(chunks, 1)]
+                chunk_scores = [future.result() for future in futures]
+
+        with tracer.span('prompt'):
+            prompt = self.get_arm_prompt(arm, self.evidence_digest(chunk_scores, rubric), job_description, rubric)
+        response = self.generate(prompt, arm, 'reduce', tier)
+        with tracer.span('parse'):
+            result = json.loads(clean_json_response(response.text))
+            if not isinstance(result, dict):
+                raise ValueError("Invalid response format for ARM B/C/D")
+            return self.expand_evaluation(result, rubric)
+
+def validate_inputs(resume_text: str, job_description: str) -> Tuple[bool, str]:
+    """Validate input texts for minimum requirements"""
+    if not resume_text or len(resume_text.strip()) < 50:
+        return False, "Resume text must be at least 50 characters long"
+    
+    if not job_description or len(job_description.strip()) < 50:
+        return False, "Job description must be at least 50 characters long"
+    
+    return True, ""
+
+def get_fit_score(analysis_result: Dict, arm: EvaluationArm) -> float:
+    """Read the fit score from an ARM result (root level for ARM A, evaluation for B/C/D)"""
+    if arm == EvaluationArm.SYSTEM_1:
+        return analysis_result.get('fit_score_1_to_5', 0)
+    return analysis_result.get('evaluation', {}).get('fit_score_1_to_5', 0)
+
+def get_shortlist_recommend(analysis_result: Dict, arm: EvaluationArm) -> bool:
+    """Read the shortlist recommendation from an ARM result"""
+    if arm == EvaluationArm.SYSTEM_1:
+        return bool(analysis_result.get('shortlist_recommend', False))
+    return bool(analysis_result.get('evaluation', {}).get('shortlist_recommend', False))
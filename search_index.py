@@ -0,0 +1,232 @@
+"""In-process inverted index over resume text with boolean/phrase queries and BM25 ranking
+
+Queries are terms combined with AND (the default between terms), OR, NOT (or
+a leading '-') and parentheses; double-quoted text is a phrase. Postings are
+kept as compact arrays of document numbers and term frequencies, and every
+document's terms are appended to one stream of term ids, so phrases are
+verified with a vectorized scan instead of positional postings.
+"""
+
+import re
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_RESULTS = 50
+
+# Words plus the symbols that matter in skills (C++, C#, .NET, Node.js)
+_TOKEN = re.compile(r'\.?\w[\w+#]*(?:\.\w+)*')
+_QUERY_TOKEN = re.compile(r'-?"[^"]*"|\(|\)|-?[^\s()"]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized search terms of a text, in order"""
+    return _TOKEN.findall(text.casefold())
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index keyed by resume id"""
+
+    def __init__(self):
+        self._doc_numbers: Dict[str, int] = {}
+        self._doc_keys: List[Optional[str]] = []
+        self._doc_starts = array('Q')  # offset of each document in the token stream
+        self._doc_lengths = array('I')
+        self._tokens = array('I')  # term ids of every document, in order
+        self._alive = bytearray()
+        self._term_ids: Dict[str, int] = {}
+        self._postings: Dict[int, Tuple[array, array]] = {}  # term id -> (doc numbers, term frequencies)
+        self._total_length = 0
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_numbers)
+
+    @property
+    def average_length(self) -> float:
+        return self._total_length / len(self._doc_numbers) if self._doc_numbers else 0.0
+
+    def update(self, key: str, text: str):
+        """Index (or re-index) one resume's text"""
+        self.remove(key)
+        terms = tokenize(text)
+        if terms:
+            self._add(key, array('I', (self._term_ids.setdefault(term, len(self._term_ids)) for term in terms)))
+
+    def _add(self, key: str, term_ids: array):
+        doc = len(self._doc_keys)
+        self._doc_numbers[key] = doc
+        self._doc_keys.append(key)
+        self._doc_starts.append(len(self._tokens))
+        self._doc_lengths.append(len(term_ids))
+        self._tokens.extend(term_ids)
+        self._alive.append(1)
+        self._total_length += len(term_ids)
+
+        frequencies: Dict[int, int] = {}
+        for term_id in term_ids:
+            frequencies[term_id] = frequencies.get(term_id, 0) + 1
+        for term_id, frequency in frequencies.items():
+            docs, tfs = self._postings.setdefault(term_id, (array('I'), array('I')))
+            docs.append(doc)
+            tfs.append(frequency)
+
+    def remove(self, key: str):
+        """Drop a resume; its postings are skipped until enough deletions trigger a compaction"""
+        doc = self._doc_numbers.pop(key, None)
+        if doc is None:
+            return
+        self._alive[doc] = 0
+        self._doc_keys[doc] = None
+        self._total_length -= self._doc_lengths[doc]
+        self._deleted += 1
+        if self._deleted > max(64, len(self._doc_numbers)):
+            self._compact()
+
+    def _compact(self):
+        live = [(key, self._tokens[self._doc_starts[doc]:self._doc_starts[doc] + self._doc_lengths[doc]])
+                for key, doc in self._doc_numbers.items()]
+        term_ids = self._term_ids
+        self.__init__()
+        # Term ids are kept, so the stored token sequences stay valid
+        self._term_ids = term_ids
+        for key, terms in live:
+            self._add(key, terms)
+
+    def _term_docs(self, term: str) -> Set[int]:
+        term_id = self._term_ids.get(term)
+        if term_id is None or term_id not in self._postings:
+            return set()
+        alive = self._alive
+        return {doc for doc in self._postings[term_id][0] if alive[doc]}
+
+    def _phrase_docs(self, terms: List[str]) -> Set[int]:
+        if len(terms) == 1:
+            return self._term_docs(terms[0])
+        ids = [self._term_ids.get(term) for term in terms]
+        # Compaction keeps the ids of terms no live resume uses any more, without postings
+        if any(term_id is None or term_id not in self._postings for term_id in ids):
+            return set()
+        import numpy as np
+
+        # Phrase starts implied by the rarest term's positions, narrowed by the other terms
+        tokens = np.frombuffer(self._tokens, dtype=np.uint32)
+        width = len(ids)
+        anchor = min(range(width), key=lambda i: len(self._postings[ids[i]][0]))
+        positions = np.flatnonzero(tokens == ids[anchor]) - anchor
+        positions = positions[(positions >= 0) & (positions <= len(tokens) - width)]
+        for offset, term_id in enumerate(ids):
+            if offset != anchor:
+                positions = positions[tokens[positions + offset] == term_id]
+        starts = np.frombuffer(self._doc_starts, dtype=np.uint64).astype(np.int64)
+        docs = np.searchsorted(starts, positions, side='right') - 1
+        ends = starts[docs] + np.frombuffer(self._doc_lengths, dtype=np.uint32)[docs]
+        inside = (positions + width <= ends) & (np.frombuffer(self._alive, dtype=np.uint8)[docs] == 1)
+        return set(docs[inside].tolist())
+
+    def _parse(self, query: str) -> Tuple[Set[int], List[str]]:
+        """Matching document numbers and the non-negated terms used for ranking"""
+        tokens = _QUERY_TOKEN.findall(query)
+        position = 0
+        negations = 0
+        scoring_terms: List[str] = []
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def take():
+            nonlocal position
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            docs = parse_and()
+            while peek() == 'OR':
+                take()
+                docs = docs | parse_and()
+            return docs
+
+        def parse_and():
+            docs = None
+            while peek() not in (None, ')', 'OR'):
+                if peek() == 'AND':
+                    take()
+                    continue
+                clause = parse_unary()
+                if clause is not None:
+                    docs = clause if docs is None else docs & clause
+            if docs is None:
+                raise QuerySyntaxError("Expected a search term")
+            return docs
+
+        def parse_unary():
+            nonlocal negations
+            token = take()
+            if token == 'NOT' or (token.startswith('-') and len(token) > 1):
+                if token == 'NOT' and peek() in (None, ')', 'OR'):
+                    raise QuerySyntaxError("NOT must be followed by a term")
+                negations += 1
+                inner = parse_unary() if token == 'NOT' else match(token[1:])
+                negations -= 1
+                return set(self._doc_numbers.values()) - (inner or set())
+            if token == '(':
+                docs = parse_or()
+                if peek() != ')':
+                    raise QuerySyntaxError("Missing closing parenthesis")
+                take()
+                return docs
+            if token == ')':
+                raise QuerySyntaxError("Unexpected closing parenthesis")
+            return match(token)
+
+        def match(token):
+            terms = tokenize(token[1:-1] if token.startswith('"') else token)
+            if not terms:
+                return None  # punctuation only
+            if not negations:
+                scoring_terms.extend(terms)
+            return self._phrase_docs(terms)
+
+        docs = parse_or()
+        if position < len(tokens):
+            raise QuerySyntaxError(f"Unexpected '{tokens[position]}'")
+        return docs, scoring_terms
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Tuple[str, float]]:
+        """(resume id, BM25 score) of resumes matching a boolean/phrase query, best first"""
+        if not query.strip() or not self._doc_numbers:
+            return []
+        docs, scoring_terms = self._parse(query)
+        if not docs:
+            return []
+
+        import numpy as np
+
+        matched = np.fromiter(docs, dtype=np.int64, count=len(docs))
+        lookup = np.full(len(self._doc_keys), -1, dtype=np.int64)
+        lookup[matched] = np.arange(len(matched))
+        lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)[matched]
+        alive = np.frombuffer(self._alive, dtype=np.uint8)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / self.average_length)
+        scores = np.zeros(len(matched))
+        for term in set(scoring_terms):
+            postings = self._postings.get(self._term_ids.get(term))
+            if postings is None:
+                continue
+            term_docs = np.frombuffer(postings[0], dtype=np.uint32)
+            tfs = np.frombuffer(postings[1], dtype=np.uint32)
+            live = alive[term_docs] == 1
+            df = int(live.sum())
+            idf = np.log(1 + (len(self._doc_numbers) - df + 0.5) / (df + 0.5))
+            rows = lookup[term_docs]
+            hit = live & (rows >= 0)
+            rows, tf = rows[hit], tfs[hit].astype(float)
+            scores[rows] += idf * tf * (BM25_K1 + 1) / (tf + norm[rows])
+
+        order = np.lexsort((matched, -scores))[:limit]
+        return [(self._doc_keys[matched[i]], round(float(scores[i]), 4)) for i in order]
@@ -0,0 +1,117 @@
+"""Compact per-session records for resumes and their ARM results"""
+
+import json
+import math
+import zlib
+from typing import Dict, FrozenSet, List, Optional
+
+# Bit i of a resume's completed mask is set once ARM i (in EvaluationArm order) has a result
+ARM_NAMES = ('SYSTEM_1', 'SYSTEM_2', 'SYSTEM_2_PERSONA', 'SYSTEM_2_PERSONA_DEBIAS')
+ARM_BITS = {arm_name: 1 << i for i, arm_name in enumerate(ARM_NAMES)}
+ALL_ARMS_MASK = (1 << len(ARM_NAMES)) - 1
+ARM_LABELS = {
+    'SYSTEM_1': 'ARM A',
+    'SYSTEM_2': 'ARM B',
+    'SYSTEM_2_PERSONA': 'ARM C',
+    'SYSTEM_2_PERSONA_DEBIAS': 'ARM D',
+}
+
+_EMPTY_TEXT = zlib.compress(b'')
+
+
+def compress_json(payload: Dict) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+
+
+def decompress_json(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class ArmResult:
+    """Score and shortlist for one ARM; the full result tree is either held compressed
+    or offloaded to the result store (payload None) and rehydrated on demand. Provisional
+    fallback results (fallback True) never reach the store, so they always keep their payload"""
+
+    __slots__ = ('fit_score', 'shortlist', 'fallback', '_payload')
+
+    def __init__(self, fit_score: float, shortlist: Optional[bool] = None, payload: Optional[Dict] = None,
+                 fallback: bool = False):
+        self.fit_score = fit_score
+        self.shortlist = shortlist
+        self.fallback = fallback
+        self._payload = compress_json(payload) if payload is not None else None
+
+    @property
+    def offloaded(self) -> bool:
+        return self._payload is None
+
+    def payload(self) -> Optional[Dict]:
+        """The full result tree if it is held in the session"""
+        return decompress_json(self._payload) if self._payload is not None else None
+
+
+class ResumeRecord:
+    """One resume in the session: label, zlib-compressed text and per-ARM results"""
+
+    __slots__ = ('label', 'file_name', 'file_id', 'store_key', 'fingerprint', 'fingerprints', 'completed_mask',
+                 'results', '_text')
+
+    def __init__(self, label: str, text: str = '', file_name: str = ''):
+        self.label = label
+        self.file_name = file_name
+        self.file_id = None
+        self.store_key = None  # (resume hash, JD hash) last restored from the store
+        self.fingerprint = None  # hash the current text is in the near-duplicate index under
+        self.fingerprints: List[str] = []  # every hash this resume's texts were indexed under
+        self.completed_mask = 0
+        self.results: List[Optional[ArmResult]] = [None] * len(ARM_NAMES)
+        self._text = _EMPTY_TEXT
+        self.text = text
+
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self._text).decode('utf-8')
+
+    @text.setter
+    def text(self, value: str):
+        self._text = zlib.compress(value.encode('utf-8')) if value else _EMPTY_TEXT
+
+    @property
+    def completed_count(self) -> int:
+        return bin(self.completed_mask).count('1')
+
+    @property
+    def completed_arms(self) -> FrozenSet[str]:
+        return frozenset(arm_name for arm_name in ARM_NAMES if self.completed_mask & ARM_BITS[arm_name])
+
+    def is_completed(self, arm_name: str) -> bool:
+        return bool(self.completed_mask & ARM_BITS[arm_name])
+
+    def next_arm(self) -> Optional[str]:
+        """The first ARM without a result, or None once all are complete"""
+        for arm_name in ARM_NAMES:
+            if not self.completed_mask & ARM_BITS[arm_name]:
+                return arm_name
+        return None
+
+    def record_result(self, arm_name: str, fit_score: float, shortlist: Optional[bool] = None,
+                      payload: Optional[Dict] = None, fallback: bool = False):
+        """Mark an ARM complete; pass payload only when there is no store to offload it to"""
+        self.results[ARM_NAMES.index(arm_name)] = ArmResult(fit_score, shortlist, payload, fallback)
+        self.completed_mask |= ARM_BITS[arm_name]
+
+    def result(self, arm_name: str) -> Optional[ArmResult]:
+        return self.results[ARM_NAMES.index(arm_name)]
+
+    def fit_score(self, arm_name: str) -> Optional[float]:
+        arm_result = self.result(arm_name)
+        return arm_result.fit_score if arm_result is not None else None
+
+    def score_row(self) -> List[float]:
+        """Fit scores in ARM order, NaN where an ARM has not run"""
+        return [r.fit_score if r is not None and isinstance(r.fit_score, (int, float)) else math.nan
+                for r in self.results]
+
+    @property
+    def arm_scores(self) -> Dict[str, float]:
+        return {arm_name: r.fit_score for arm_name, r in zip(ARM_NAMES, self.results) if r is not None}
@@ -0,0 +1,158 @@
+"""Process-level cache shared by all Streamlit sessions, with per-namespace byte budgets"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+MB = 1024 * 1024
+
+# Namespace -> (byte budget, TTL in seconds or None)
+NAMESPACES = {
+    'extracted_text': (64 * MB, 3600),
+    'compacted_text': (32 * MB, 3600),
+    'jd_artifacts': (16 * MB, 24 * 3600),
+    'arm_results': (64 * MB, 24 * 3600),
+}
+
+DEFAULT_MAX_BYTES = 128 * MB
+
+
+class _Namespace:
+    __slots__ = ('max_bytes', 'ttl_s', 'entries', 'bytes', 'hits', 'misses', 'evictions', 'expirations', 'rejected')
+
+    def __init__(self, max_bytes: int, ttl_s: Optional[float]):
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        # key -> (value, size, expires_at, last_used); ordered least recently used first
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+
+class SharedCache:
+    """Thread-safe LRU/TTL cache; the total footprint never exceeds max_bytes
+
+    Values are strings or bytes and are sized with sys.getsizeof. Structured
+    values go through get_json/put_json so every reader gets its own copy.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, namespaces: Optional[Dict] = None):
+        self.max_bytes = max_bytes
+        self._namespaces = {
+            name: _Namespace(min(budget, max_bytes), ttl_s)
+            for name, (budget, ttl_s) in (namespaces or NAMESPACES).items()
+        }
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str):
+        """The cached value, or None on a miss or an expired entry"""
+        with self._lock:
+            ns = self._namespaces[namespace]
+            entry = ns.entries.get(key)
+            if entry is None:
+                ns.misses += 1
+                return None
+            value, size, expires_at, _ = entry
+            now = time.monotonic()
+            if expires_at is not None and now >= expires_at:
+                self._drop(ns, key)
+                ns.expirations += 1
+                ns.misses += 1
+                return None
+            ns.entries[key] = (value, size, expires_at, now)
+            ns.entries.move_to_end(key)
+            ns.hits += 1
+            return value
+
+    def put(self, namespace: str, key: str, value):
+        """Cache a str/bytes value, evicting least recently used entries to stay in budget"""
+        size = sys.getsizeof(value)
+        with self._lock:
+            ns = self._namespaces[namespace]
+            if key in ns.entries:
+                self._drop(ns, key)
+            if size > ns.max_bytes:
+                ns.rejected += 1
+                return
+            while ns.bytes + size > ns.max_bytes:
+                self._evict_oldest(ns)
+            while self._bytes + size > self.max_bytes:
+                self._evict_oldest(self._coldest_namespace())
+            now = time.monotonic()
+            expires_at = now + ns.ttl_s if ns.ttl_s is not None else None
+            ns.entries[key] = (value, size, expires_at, now)
+            ns.bytes += size
+            self._bytes += size
+
+    def get_or_set(self, namespace: str, key: str, factory: Callable[[], str]):
+        value = self.get(namespace, key)
+        if value is None:
+            value = factory()
+            self.put(namespace, key, value)
+        return value
+
+    def get_json(self, namespace: str, key: str):
+        cached = self.get(namespace, key)
+        return json.loads(cached) if cached is not None else None
+
+    def put_json(self, namespace: str, key: str, value):
+        self.put(namespace, key, json.dumps(value, separators=(',', ':')))
+
+    def clear(self, namespace: Optional[str] = None):
+        """Drop cached entries (counters are kept)"""
+        with self._lock:
+            for name, ns in self._namespaces.items():
+                if namespace is None or name == namespace:
+                    self._bytes -= ns.bytes
+                    ns.entries.clear()
+                    ns.bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> List[Dict]:
+        """One row per namespace with size and hit/miss/eviction counters"""
+        with self._lock:
+            return [
+                {
+                    'namespace': name,
+                    'entries': len(ns.entries),
+                    'bytes': ns.bytes,
+                    'max_bytes': ns.max_bytes,
+                    'hits': ns.hits,
+                    'misses': ns.misses,
+                    'hit_rate': round(ns.hits / (ns.hits + ns.misses), 3) if ns.hits + ns.misses else 0.0,
+                    'evictions': ns.evictions,
+                    'expirations': ns.expirations,
+                    'rejected': ns.rejected,
+                }
+                for name, ns in self._namespaces.items()
+            ]
+
+    def _drop(self, ns: _Namespace, key: str):
+        _, size, _, _ = ns.entries.pop(key)
+        ns.bytes -= size
+        self._bytes -= size
+
+    def _evict_oldest(self, ns: _Namespace):
+        key = next(iter(ns.entries))
+        self._drop(ns, key)
+        ns.evictions += 1
+
+    def _coldest_namespace(self) -> _Namespace:
+        """The namespace whose least recently used entry is the oldest overall"""
+        candidates = [ns for ns in self._namespaces.values() if ns.entries]
+        return min(candidates, key=lambda ns: ns.entries[next(iter(ns.entries))][3])
+
+
+shared_cache = SharedCache(max_bytes=int(float(os.getenv('SHARED_CACHE_MAX_MB', DEFAULT_MAX_BYTES // MB)) * MB))
@@ -0,0 +1,108 @@
+"""Single-flight coalescing of identical concurrent calls, shared by every session in the process
+
+Callers that arrive while an identical call is in flight attach to it instead
+of starting another; all of them get its result or its exception. A caller
+with a timeout starts its call on a small worker pool, so that it is just a
+waiter too: a waiter that times out leaves, and when the last one leaves the
+call is cancelled if it has not started yet. A call that is already running
+cannot be interrupted, so it is only forgotten: its result is discarded and
+later callers start a fresh one. Without a timeout the call runs inline,
+saving the thread hop.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+MAX_INFLIGHT_CALLS = int(os.getenv('GEMINI_MAX_INFLIGHT', '32'))
+
+
+def prompt_key(model_name: str, prompt: str) -> str:
+    """Coalescing key for a model call: the model and a hash of the prompt
+
+    Prompts are built from already compacted resume and JD text, so they are
+    hashed as is rather than normalized again on every call.
+    """
+    return f"{model_name}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}"
+
+
+class _Flight:
+    __slots__ = ('future', 'waiters')
+
+    def __init__(self, future: Optional[Future]):
+        self.future = future  # None for a call run inline until another caller joins it
+        self.waiters = 0
+
+
+class SingleFlight:
+    """At most one in-flight call per key; concurrent callers with the same key share it"""
+
+    def __init__(self, max_workers: int = MAX_INFLIGHT_CALLS, thread_name_prefix: str = 'single-flight'):
+        self._flights: Dict[str, _Flight] = {}
+        # Reentrant: a call that finishes before its done-callback is added runs the callback inline
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """fn()'s result, or the one already in flight for key, and whether it was shared
+
+        Raises fn's exception in every waiter, and TimeoutError in a waiter that gives up.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            shared = flight is not None
+            if flight is None:
+                flight = _Flight(None if timeout is None else self._executor.submit(fn))
+                self._flights[key] = flight
+                if timeout is not None:
+                    flight.future.add_done_callback(lambda _, key=key, flight=flight: self._forget(key, flight))
+            elif flight.future is None:
+                flight.future = Future()
+                flight.future.set_running_or_notify_cancel()
+            flight.waiters += 1
+        if not shared and timeout is None:
+            return self._run_inline(key, flight, fn), False
+        try:
+            return flight.future.result(timeout), shared
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                if flight.waiters == 0 and not flight.future.done():
+                    flight.future.cancel()
+                    self._forget(key, flight)
+
+    def _run_inline(self, key: str, flight: _Flight, fn: Callable[[], Any]) -> Any:
+        # The caller forgets the flight itself, then hands the outcome to any callers that joined
+        try:
+            result = fn()
+        except BaseException as e:
+            future = self._finish_inline(key, flight)
+            if future is not None:
+                future.set_exception(e)
+            raise
+        future = self._finish_inline(key, flight)
+        if future is not None:
+            future.set_result(result)
+        return result
+
+    def _finish_inline(self, key: str, flight: _Flight) -> Optional[Future]:
+        # Once forgotten no caller can join, so the future (if any) is final
+        with self._lock:
+            flight.waiters -= 1
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            return flight.future
+
+    def _forget(self, key: str, flight: _Flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+
+gemini_flights = SingleFlight(thread_name_prefix='gemini-call')
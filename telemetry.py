@@ -0,0 +1,285 @@
+"""Per-call latency, token and cost telemetry for analyzer calls"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# USD per 1M tokens (input, output). Unknown models are recorded at zero cost.
+MODEL_PRICES = {
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.5-pro': (1.25, 10.00),
+}
+
+MAX_RECORDS = 5000
+PROM_INTERVAL_S = float(os.getenv('TELEMETRY_PROM_INTERVAL', '5'))
+METRIC_PREFIX = 'resume_scorer'
+RESULT_KINDS = ('score', 'reduce', 'review')  # the call that produces an ARM result
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimate the USD cost of one call from its token counts"""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def is_model_call(entry: Dict) -> bool:
+    """Whether a record is a model request that was actually sent"""
+    return not (entry['cache_hit'] or entry['fallback'] or entry.get('coalesced') or entry.get('escalation'))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _add_totals(by_arm: Dict[str, Dict], by_route: Dict[tuple, float], entry: Dict):
+    totals = by_arm.get(entry['arm'])
+    if totals is None:
+        totals = by_arm[entry['arm']] = _new_totals()
+    totals['input_tokens'] += entry['input_tokens']
+    totals['output_tokens'] += entry['output_tokens']
+    totals['cost_usd'] += entry['cost_usd']
+    totals['cache_hits'] += entry['cache_hit']
+    totals['fallbacks'] += entry['fallback']
+    totals['coalesced'] += entry['coalesced']
+    totals['escalations'] += bool(entry['escalation'])
+    if is_model_call(entry):
+        totals['calls'] += 1
+        totals['latency_sum_s'] += entry['latency_s']
+        if entry['tier']:
+            route = (entry['arm'], entry['tier'])
+            by_route[route] = by_route.get(route, 0.0) + entry['cost_usd']
+
+
+def _new_totals() -> Dict:
+    return dict.fromkeys(('calls', 'latency_sum_s', 'input_tokens', 'output_tokens', 'cost_usd',
+                          'cache_hits', 'fallbacks', 'coalesced', 'escalations'), 0)
+
+
+class Telemetry:
+    """Process-wide recorder for analyzer calls with JSONL and Prometheus sinks
+
+    Sinks are enabled with the TELEMETRY_JSONL and TELEMETRY_PROM environment
+    variables, each pointing at a local file path. The Prometheus file is
+    rewritten at most every TELEMETRY_PROM_INTERVAL seconds.
+
+    Percentiles and summaries cover the last max_records calls; Prometheus
+    counters are running totals since the process (or the last clear) started.
+    """
+
+    def __init__(self, jsonl_path: Optional[str] = None, prom_path: Optional[str] = None,
+                 max_records: int = MAX_RECORDS, prom_interval_s: float = PROM_INTERVAL_S):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.prom_interval_s = prom_interval_s
+        self.records = deque(maxlen=max_records)
+        # Totals of records evicted from the window, so counters never go down
+        self._evicted: Dict[str, Dict] = {}
+        self._evicted_route_costs: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        # Serializes Prometheus rewrites, which render outside the record lock
+        self._prom_lock = threading.Lock()
+        self._prom_written = 0.0
+        self._prom_timer = None
+
+    def record(self, arm: str, kind: str, model: str = '', latency_s: float = 0.0,
+               input_tokens: int = 0, output_tokens: int = 0, cache_hit: bool = False, fallback: bool = False,
+               coalesced: bool = False, tier: str = '', escalation: str = '', error: str = '') -> Dict:
+        """Record one analyzer call (or cache hit / fallback / coalesced call / escalation) and flush the sinks
+
+        A call's tier is the model routing tier it ran on; an escalation record
+        names the tier a result was escalated away from and why.
+        """
+        entry = {
+            'ts': time.time(),
+            'arm': arm,
+            'kind': kind,
+            'model': model,
+            'tier': tier,
+            'latency_s': round(latency_s, 4),
+            'input_tokens': int(input_tokens or 0),
+            'output_tokens': int(output_tokens or 0),
+            'cost_usd': round(estimate_cost(model, input_tokens or 0, output_tokens or 0), 6),
+            'cache_hit': cache_hit,
+            'fallback': fallback,
+            'coalesced': coalesced,
+            'escalation': escalation,
+            'error': error,
+        }
+        with self._lock:
+            if len(self.records) == self.records.maxlen:
+                _add_totals(self._evicted, self._evicted_route_costs, self.records[0])
+            self.records.append(entry)
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+        if self.prom_path:
+            self._schedule_prometheus()
+        return entry
+
+    def summary(self) -> List[Dict]:
+        """Per-ARM latency percentiles, token totals, cost and event counts"""
+        with self._lock:
+            records = list(self.records)
+
+        by_arm: Dict[str, List[Dict]] = {}
+        for entry in records:
+            by_arm.setdefault(entry['arm'], []).append(entry)
+
+        rows = []
+        for arm, entries in sorted(by_arm.items()):
+            latencies = [e['latency_s'] for e in entries if is_model_call(e)]
+            rows.append({
+                'arm': arm,
+                'calls': len(latencies),
+                'p50_s': round(percentile(latencies, 50), 3),
+                'p95_s': round(percentile(latencies, 95), 3),
+                'latency_sum_s': round(sum(latencies), 4),
+                'input_tokens': sum(e['input_tokens'] for e in entries),
+                'output_tokens': sum(e['output_tokens'] for e in entries),
+                'cost_usd': round(sum(e['cost_usd'] for e in entries), 6),
+                'cache_hits': sum(1 for e in entries if e['cache_hit']),
+                'fallbacks': sum(1 for e in entries if e['fallback']),
+                'coalesced': sum(1 for e in entries if e.get('coalesced')),
+                'escalations': sum(1 for e in entries if e.get('escalation')),
+            })
+        return rows
+
+    def route_summary(self) -> List[Dict]:
+        """Latency, cost and escalation rate per model route (ARM and tier)
+
+        The escalation rate is escalations away from the route per result-producing
+        call (score, reduce or review) made on it.
+        """
+        with self._lock:
+            records = list(self.records)
+
+        by_route: Dict[tuple, List[Dict]] = {}
+        for entry in records:
+            if entry.get('tier') and (is_model_call(entry) or entry.get('escalation')):
+                by_route.setdefault((entry['arm'], entry['tier']), []).append(entry)
+
+        rows = []
+        for (arm, tier), entries in sorted(by_route.items()):
+            calls = [e for e in entries if is_model_call(e)]
+            latencies = [e['latency_s'] for e in calls]
+            results = sum(1 for e in calls if e['kind'] in RESULT_KINDS)
+            escalations = sum(1 for e in entries if e.get('escalation'))
+            rows.append({
+                'arm': arm,
+                'tier': tier,
+                'model': entries[0]['model'],
+                'calls': len(calls),
+                'p50_s': round(percentile(latencies, 50), 3),
+                'p95_s': round(percentile(latencies, 95), 3),
+                'cost_usd': round(sum(e['cost_usd'] for e in calls), 6),
+                'escalations': escalations,
+                'escalation_rate': round(escalations / results, 3) if results else 0.0,
+            })
+        return rows
+
+    def totals(self) -> Tuple[Dict[str, Dict], Dict[tuple, float]]:
+        """Running totals per ARM, and model call cost per (ARM, tier), since the process or the last clear"""
+        with self._lock:
+            records = list(self.records)
+            by_arm = {arm: dict(values) for arm, values in self._evicted.items()}
+            by_route = dict(self._evicted_route_costs)
+        for entry in records:
+            _add_totals(by_arm, by_route, entry)
+        return by_arm, by_route
+
+    def to_prometheus(self) -> str:
+        """Render latency quantiles of recent calls and running totals in Prometheus text exposition format"""
+        rows = self.summary()
+        by_arm, route_costs = self.totals()
+        totals = dict(sorted(by_arm.items()))
+        lines = [
+            f'# HELP {METRIC_PREFIX}_llm_latency_seconds Gemini call latency per ARM',
+            f'# TYPE {METRIC_PREFIX}_llm_latency_seconds summary',
+        ]
+        for row in rows:
+            arm = row['arm']
+            lines.append(f'{METRIC_PREFIX}_llm_latency_seconds{{arm="{arm}",quantile="0.5"}} {row["p50_s"]}')
+            lines.append(f'{METRIC_PREFIX}_llm_latency_seconds{{arm="{arm}",quantile="0.95"}} {row["p95_s"]}')
+        for arm, values in totals.items():
+            lines.append(f'{METRIC_PREFIX}_llm_latency_seconds_sum{{arm="{arm}"}} {round(values["latency_sum_s"], 4)}')
+            lines.append(f'{METRIC_PREFIX}_llm_latency_seconds_count{{arm="{arm}"}} {values["calls"]}')
+
+        counters = [
+            ('llm_input_tokens_total', 'input_tokens', 'Prompt tokens sent per ARM'),
+            ('llm_output_tokens_total', 'output_tokens', 'Output tokens received per ARM'),
+            ('llm_cost_usd_total', 'cost_usd', 'Estimated spend per ARM'),
+            ('cache_hits_total', 'cache_hits', 'Calls answered from cache per ARM'),
+            ('fallbacks_total', 'fallbacks', 'Fallbacks to provisional dummy data per ARM'),
+            ('coalesced_calls_total', 'coalesced', 'Calls that shared an identical in-flight call per ARM'),
+            ('escalations_total', 'escalations', 'Results re-run on a stronger model tier per ARM'),
+        ]
+        for name, field, help_text in counters:
+            lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name} counter')
+            for arm, values in totals.items():
+                lines.append(f'{METRIC_PREFIX}_{name}{{arm="{arm}"}} {round(values[field], 6)}')
+
+        name = 'llm_route_cost_usd_total'
+        lines.append(f'# HELP {METRIC_PREFIX}_{name} Estimated spend per model route')
+        lines.append(f'# TYPE {METRIC_PREFIX}_{name} counter')
+        for (arm, tier), cost in sorted(route_costs.items()):
+            lines.append(f'{METRIC_PREFIX}_{name}{{arm="{arm}",tier="{tier}"}} {round(cost, 6)}')
+        name = 'llm_route_escalation_ratio'
+        lines.append(f'# HELP {METRIC_PREFIX}_{name} Share of recent results escalated away from each model route')
+        lines.append(f'# TYPE {METRIC_PREFIX}_{name} gauge')
+        for row in self.route_summary():
+            lines.append(f'{METRIC_PREFIX}_{name}{{arm="{row["arm"]}",tier="{row["tier"]}"}} {row["escalation_rate"]}')
+        return '\n'.join(lines) + '\n'
+
+    def _schedule_prometheus(self):
+        # Rewrite now if the last write is old enough, otherwise once when the interval is up
+        with self._lock:
+            if self._prom_timer is not None:
+                return
+            delay = self._prom_written + self.prom_interval_s - time.time()
+            if delay > 0:
+                self._prom_timer = threading.Timer(delay, self.flush)
+                self._prom_timer.daemon = True
+                self._prom_timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """Rewrite the Prometheus file now"""
+        if not self.prom_path:
+            return
+        with self._prom_lock:
+            with self._lock:
+                timer, self._prom_timer = self._prom_timer, None
+                self._prom_written = time.time()
+            if timer is not None:
+                timer.cancel()
+            # Write-then-rename so scrapers never see a partial file
+            tmp_path = f'{self.prom_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, self.prom_path)
+
+    def clear(self):
+        """Forget all recorded calls and reset the running totals"""
+        with self._lock:
+            self.records.clear()
+            self._evicted.clear()
+            self._evicted_route_costs.clear()
+
+
+telemetry = Telemetry(
+    jsonl_path=os.getenv('TELEMETRY_JSONL') or None,
+    prom_path=os.getenv('TELEMETRY_PROM') or None,
+)
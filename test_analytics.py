@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-resume agreement analytics
+"""
+
+import math
+
+import numpy as np
+
+from analytics import CRITERIA, AgreementAnalytics, pairwise_kappa
+
+
+def test_correlation_and_drift_match_direct_computation():
+    rng = np.random.default_rng(7)
+    scores = rng.uniform(1, 5, size=(200, 4))
+    analytics = AgreementAnalytics(capacity=8)
+    for row, values in enumerate(scores):
+        for arm, arm_name in enumerate(['SYSTEM_1', 'SYSTEM_2', 'SYSTEM_2_PERSONA', 'SYSTEM_2_PERSONA_DEBIAS']):
+            analytics.update(f'resume_{row}', arm_name, float(values[arm]), values[arm] >= 3)
+
+    report = analytics.report()
+    assert report['resumes'] == 200
+    np.testing.assert_allclose(report['correlation'], np.corrcoef(scores.T), atol=1e-9)
+    assert math.isclose(report['drift'][0, 3], (scores[:, 3] - scores[:, 0]).mean())
+    assert report['pair_counts'][1, 2] == 200
+
+
+def test_kappa_on_shortlist_decisions():
+    # 10 decisions, 8 agreements; each rater says yes half the time -> po 0.8, pe 0.5
+    a = [1, 1, 1, 1, 1, 0, 0, 0, 0, 0]
+    b = [1, 1, 1, 1, 0, 1, 0, 0, 0, 0]
+    kappa = pairwise_kappa(np.array([a, b], dtype=np.int8).T)
+    assert math.isclose(kappa[0, 1], 0.6)
+    assert kappa[0, 0] == 1.0
+
+    unknown = pairwise_kappa(np.array([[1, -1], [0, -1]], dtype=np.int8))
+    assert math.isnan(unknown[0, 1])
+
+
+def test_report_is_cached_and_refreshed_incrementally():
+    analytics = AgreementAnalytics()
+    criterion_scores = {name: 4 for name in CRITERIA}
+    analytics.update('resume_1', 'SYSTEM_2', 4.0, True, criterion_scores)
+    analytics.update('resume_1', 'SYSTEM_2_PERSONA', 3.5, True, dict(criterion_scores, **{CRITERIA[0]: 3}))
+    first = analytics.report()
+    assert analytics.report() is first
+
+    stats = first['criterion_stats']
+    assert stats['mean'][1, 0] == 4 and stats['histogram'][1, 0, 3] == 1
+    assert first['criterion_drift'][2, 0] == -1 and first['criterion_drift'][2, 1] == 0
+
+    analytics.update('resume_2', 'SYSTEM_2', 2.0, False, criterion_scores)
+    assert analytics.report() is not first and analytics.report()['resumes'] == 2
+
+    analytics.remove('resume_2')
+    analytics.update('resume_3', 'SYSTEM_1', 5.0)
+    assert len(analytics) == 2 and analytics.report()['criterion_stats']['count'][1, 0] == 1
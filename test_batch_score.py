@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless batch scoring CLI
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from docx import Document
+
+import batch_score
+from resume_analyzer import EvaluationArm
+from dummy_data import get_dummy_data_by_arm
+
+
+class FakeAnalyzer:
+    """Returns the fallback results for every ARM, without network calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze_resume(self, resume_text, job_description, arm, base_result=None):
+        self.calls.append((arm, base_result is not None))
+        return get_dummy_data_by_arm(arm.name)
+
+
+def write_docx(path, text):
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(str(path))
+
+
+def test_parse_arms_accepts_letters_and_names():
+    assert batch_score.parse_arms("d,A") == [EvaluationArm.SYSTEM_1, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]
+    assert batch_score.parse_arms("SYSTEM_2") == [EvaluationArm.SYSTEM_2]
+    with pytest.raises(Exception):
+        batch_score.parse_arms("Z")
+
+
+def test_run_batch_streams_jsonl(tmp_path):
+    pool = tmp_path / "pool"
+    pool.mkdir()
+    write_docx(pool / "alice.docx", "Backend engineer with eight years of Python, Go and Kubernetes in production.")
+    write_docx(pool / "short.docx", "Too short")
+    (pool / "notes.txt").write_text("ignored")
+
+    out = tmp_path / "results.jsonl"
+    writer = batch_score.JsonlResultWriter(str(out))
+    analyzer = FakeAnalyzer()
+    summary = batch_score.run_batch(
+        "Looking for a backend engineer with Python and Kubernetes experience in production.",
+        batch_score.find_resumes(str(pool)), analyzer,
+        [EvaluationArm.SYSTEM_1, EvaluationArm.SYSTEM_2, EvaluationArm.SYSTEM_2_PERSONA],
+        writer, workers=2, concurrency=2, progress=False,
+    )
+    writer.close()
+
+    rows = {json.loads(line)["file"].rsplit("/", 1)[-1]: json.loads(line) for line in out.read_text().splitlines()}
+    assert set(rows) == {"alice.docx", "short.docx"}
+    assert rows["alice.docx"]["arm_scores"] == {"SYSTEM_1": 3, "SYSTEM_2": 3, "SYSTEM_2_PERSONA": 3}
+    assert "validation" in rows["short.docx"]["errors"]
+    assert summary["scored"] == 1 and summary["invalid"] == 1
+    # ARM C was layered on the ARM B result from the same run
+    assert (EvaluationArm.SYSTEM_2_PERSONA, True) in analyzer.calls
+
+
+def test_parquet_writer_flattens_rows(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "results.parquet"
+    writer = batch_score.ParquetResultWriter(str(out), [EvaluationArm.SYSTEM_1])
+    writer.write({"file": "a.pdf", "resume_hash": "h", "jd_hash": "j", "arm_scores": {"SYSTEM_1": 4},
+                  "shortlist": {"SYSTEM_1": True}, "analysis_results": {}, "errors": {}, "elapsed_s": 0.1})
+    writer.close()
+
+    table = pq.read_table(str(out))
+    assert table.column("score_SYSTEM_1").to_pylist() == [4.0]
+    assert table.column("shortlist_SYSTEM_1").to_pylist() == [True]
+
+
+def test_extraction_stays_a_bounded_window_ahead_of_scoring(monkeypatch):
+    started, written, peak = [], [], [0]
+    lock = threading.Lock()
+
+    def extract(path):
+        with lock:
+            started.append(path)
+            peak[0] = max(peak[0], len(started) - len(written))
+        return path, f"Backend engineer {path} with eight years of Python and Kubernetes in production.", ''
+
+    class SlowAnalyzer(FakeAnalyzer):
+        def analyze_resume(self, resume_text, job_description, arm, base_result=None):
+            time.sleep(0.005)
+            return super().analyze_resume(resume_text, job_description, arm, base_result)
+
+    class Writer:
+        def write(self, row):
+            written.append(row)
+
+    # Threads stand in for extraction processes so the fake extractor can count what is in flight
+    monkeypatch.setattr(batch_score, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(batch_score, 'extract_one', extract)
+    summary = batch_score.run_batch(
+        "Looking for a backend engineer with Python and Kubernetes experience in production.",
+        [f"resume_{i}.docx" for i in range(60)], SlowAnalyzer(), [EvaluationArm.SYSTEM_1],
+        Writer(), workers=2, concurrency=2, progress=False,
+    )
+
+    assert summary["scored"] == 60 and len(written) == 60
+    assert peak[0] <= 2 * 2 + 2
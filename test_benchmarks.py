@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the hot paths, checked against stored baselines
+
+Needs pytest-benchmark (skipped without it). A benchmark whose median is more
+than BENCHMARK_MAX_SLOWDOWN times its baseline in benchmark_baseline.json
+fails; run with BENCHMARK_SAVE_BASELINE=1 to record new baselines.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from conftest import FakeModel
+from load_test import synthetic_resume
+from resume_analyzer import DEFAULT_RUBRIC, EvaluationArm, compact_resume_text
+from session_records import ARM_NAMES, ResumeRecord
+from shared_cache import shared_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, 'benchmark_baseline.json')
+MAX_SLOWDOWN = float(os.getenv('BENCHMARK_MAX_SLOWDOWN', '2.0'))
+SAVE_BASELINE = os.getenv('BENCHMARK_SAVE_BASELINE') == '1'
+
+pytestmark = pytest.mark.benchmark(max_time=0.1, min_rounds=10, warmup=True)
+
+RESUME = synthetic_resume(random.Random(7), 0)
+JD = ("Senior backend engineer to build Python services on Kubernetes with PostgreSQL, "
+      "five or more years of production experience and clear written communication.")
+EVIDENCE = [line for line in RESUME.splitlines() if line.startswith(('Built', 'Designed', 'Led', 'Migrated'))] or [RESUME[:80]]
+
+# Responses as Gemini returns them, code fences included
+RECORDED_RESPONSES = {
+    'SYSTEM_1': '```json\n{"fit_score_1_to_5": 4, "shortlist_recommend": true, '
+                '"justification": "Solid backend experience with most of the required stack."}\n```',
+    'SYSTEM_2': '```json\n' + json.dumps({
+        's': [{'c': i, 'v': 3 + i % 3, 'e': EVIDENCE[i % len(EVIDENCE)]} for i in range(1, len(DEFAULT_RUBRIC) + 1)],
+        'sl': True,
+        'j': "Meets the core technical criteria with measurable impact; leadership evidence is thinner.",
+    }) + '\n```',
+    'SYSTEM_2_PERSONA_DEBIAS': '```json\n' + json.dumps({
+        'score_adjustments': [{'criterion': DEFAULT_RUBRIC[-1]['criterion'], 'delta': -1,
+                               'reason': "Evidence does not show this directly"}],
+        'shortlist_recommend': True,
+        'compliance_review': {'is_compliant': True, 'compliance_notes': "Job-related criteria only.", 'risk_factors': []},
+        'debias_review': {'mitigations_applied': ["Ignored institution names"], 'residual_risks': []},
+    }) + '\n```',
+}
+
+_baselines = json.load(open(BASELINE_PATH)) if os.path.exists(BASELINE_PATH) else {}
+_measured = {}
+
+
+@pytest.fixture
+def replay_analyzer(make_analyzer):
+    """Analyzers answering rubric prompts with the default rubric and everything else with a recorded response"""
+    def make(arm_name='SYSTEM_1'):
+        rubric = json.dumps({"rubric": DEFAULT_RUBRIC})
+        text = RECORDED_RESPONSES[arm_name]
+        return make_analyzer(FakeModel(answer=lambda prompt: rubric if "preparing a hiring rubric" in prompt else text))
+    return make
+
+
+@pytest.fixture(scope='module', autouse=True)
+def save_baselines():
+    yield
+    if SAVE_BASELINE and _measured:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted({**_baselines, **_measured}.items())), f, indent=2)
+            f.write('\n')
+
+
+def check_baseline(benchmark):
+    """Fail if this benchmark's median regressed past the allowed slowdown"""
+    if benchmark.stats is None:  # --benchmark-disable
+        return
+    median = benchmark.stats.stats.median
+    if SAVE_BASELINE:
+        _measured[benchmark.name] = round(median, 9)
+        return
+    baseline = _baselines.get(benchmark.name)
+    if baseline is not None:
+        assert median <= baseline * MAX_SLOWDOWN, (
+            f"{benchmark.name}: median {median * 1e6:.1f} µs is more than {MAX_SLOWDOWN}x "
+            f"the {baseline * 1e6:.1f} µs baseline")
+
+
+@pytest.mark.parametrize('arm', list(EvaluationArm), ids=lambda arm: arm.name)
+def test_arm_prompt(benchmark, arm, replay_analyzer):
+    analyzer = replay_analyzer()
+    rubric = None if arm == EvaluationArm.SYSTEM_1 else DEFAULT_RUBRIC
+    resume = compact_resume_text(RESUME)
+    prompt = benchmark(analyzer.get_arm_prompt, arm, resume, JD, rubric)
+    assert resume in prompt
+    check_baseline(benchmark)
+
+
+@pytest.mark.parametrize('arm_name', ['SYSTEM_1', 'SYSTEM_2'])
+def test_score_response(benchmark, arm_name, replay_analyzer):
+    shared_cache.clear()
+    analyzer = replay_analyzer(arm_name)
+    result = benchmark(analyzer.score_resume, RESUME, JD, EvaluationArm[arm_name])
+    assert 'fit_score_1_to_5' in result or result['evaluation']['fit_score_1_to_5'] > 0
+    check_baseline(benchmark)
+
+
+def test_review_response(benchmark, replay_analyzer):
+    shared_cache.clear()
+    base = replay_analyzer('SYSTEM_2').score_resume(RESUME, JD, EvaluationArm.SYSTEM_2)
+    analyzer = replay_analyzer('SYSTEM_2_PERSONA_DEBIAS')
+    result = benchmark(analyzer.review_resume, base, JD, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS)
+    assert 'debias_review' in result['evaluation']
+    check_baseline(benchmark)
+
+
+def test_evidence_annotation(benchmark, replay_analyzer):
+    from evidence import annotate_evidence
+
+    shared_cache.clear()
+    result = replay_analyzer('SYSTEM_2').score_resume(RESUME, JD, EvaluationArm.SYSTEM_2)
+    benchmark(annotate_evidence, result, RESUME)
+    assert all(score['evidence_confidence'] == 1.0 for score in result['evaluation']['scores'])
+    check_baseline(benchmark)
+
+
+@pytest.mark.parametrize('arm_name', ['SYSTEM_1', 'SYSTEM_2'])
+def test_display_results(benchmark, arm_name, replay_analyzer):
+    import app
+    from rendering import build_result_html
+
+    shared_cache.clear()
+    result = replay_analyzer(arm_name).score_resume(RESUME, JD, EvaluationArm[arm_name])
+    # The block display_results builds on every rerun
+    benchmark(build_result_html, result, arm_name, 'Candidate 0')
+    app.display_results(result, EvaluationArm[arm_name], 'Candidate 0')
+    check_baseline(benchmark)
+
+
+def test_display_results_rerun(benchmark, replay_analyzer):
+    import app
+
+    shared_cache.clear()
+    result = replay_analyzer('SYSTEM_2').score_resume(RESUME, JD, EvaluationArm.SYSTEM_2)
+    benchmark(app.display_results, result, EvaluationArm.SYSTEM_2, 'Candidate 0')
+    check_baseline(benchmark)
+
+
+def test_get_available_arms(benchmark):
+    import app
+    import streamlit as st
+
+    record = ResumeRecord('Candidate 0', RESUME)
+    record.record_result('SYSTEM_1', 4.0)
+    st.session_state.resumes['benchmark'] = record
+    try:
+        arms = benchmark(app.get_available_arms, 'benchmark')
+    finally:
+        del st.session_state.resumes['benchmark']
+    assert arms == [EvaluationArm.SYSTEM_2]
+    check_baseline(benchmark)
+
+
+def test_summary_frame(benchmark):
+    from leaderboard import build_score_frame, format_page, paginate
+
+    rng = random.Random(3)
+    resumes = {}
+    for i in range(1000):
+        record = ResumeRecord(f'Candidate {i}')
+        for arm_name in ARM_NAMES[:rng.randint(0, len(ARM_NAMES))]:
+            record.record_result(arm_name, round(rng.uniform(1, 5), 2))
+        resumes[f'resume_{i}'] = record
+
+    def build_summary():
+        return format_page(paginate(build_score_frame(resumes), 'average', 0, 25))
+
+    page = benchmark(build_summary)
+    assert len(page) == 25
+    check_baseline(benchmark)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the cascade early-exit policy in batch scoring
+"""
+
+import json
+
+import pytest
+
+import batch_score
+from cascade import CascadePolicy, Stage
+from resume_analyzer import EvaluationArm, resume_content_hash
+
+POLICY = {
+    'stages': [
+        {'arm': 'A', 'min_score': 4, 'uncertain_band': [2.5, 3.5]},
+        {'arm': 'B', 'shortlisted': True},
+        {'arm': 'D'},
+    ],
+}
+
+
+class ScriptedAnalyzer:
+    """Scores each resume from a script: {resume text: {ARM name: (score, shortlist)}}"""
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = []
+
+    def analyze_resume(self, resume_text, job_description, arm, base_result=None):
+        self.calls.append((resume_text, arm.name))
+        score, shortlist = self.script[resume_text][arm.name]
+        if arm == EvaluationArm.SYSTEM_1:
+            return {'fit_score_1_to_5': score, 'shortlist_recommend': shortlist, 'justification': ''}
+        return {'rubric': [], 'evaluation': {'scores': [], 'fit_score_1_to_5': score, 'shortlist_recommend': shortlist,
+                                             'justification': ''}}
+
+
+def test_stage_gates():
+    stage = Stage(EvaluationArm.SYSTEM_1, min_score=4, uncertain_band=(2.5, 3.5))
+    assert stage.advances(4.5, False) and stage.advances(3, False)
+    assert not stage.advances(2, False) and not stage.advances(3.8, True)
+    assert Stage(EvaluationArm.SYSTEM_2, shortlisted=True).advances(1, True)
+    assert Stage(EvaluationArm.SYSTEM_2).advances(1, False)
+    assert stage.advances(None, None)  # a failed ARM exits no one
+
+
+def test_policy_validation():
+    policy = CascadePolicy.load(json.dumps(POLICY))
+    assert policy.arms == [EvaluationArm.SYSTEM_1, EvaluationArm.SYSTEM_2, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]
+    assert CascadePolicy.load('default').arms == list(EvaluationArm)
+    with pytest.raises(ValueError, match="evaluation order"):
+        CascadePolicy.from_dict({'stages': [{'arm': 'B'}, {'arm': 'A'}]})
+    with pytest.raises(ValueError, match="Unknown ARM"):
+        CascadePolicy.from_dict({'stages': [{'arm': 'E'}]})
+    with pytest.raises(ValueError, match="Invalid cascade stage"):
+        CascadePolicy.from_dict({'stages': [{'arm': 'A', 'threshold': 3}]})
+
+
+def test_calibration_sample_is_stable():
+    policy = CascadePolicy.from_dict(dict(POLICY, calibration_rate=0.5))
+    hashes = [resume_content_hash(f"resume {i}") for i in range(400)]
+    sample = [h for h in hashes if policy.in_calibration(h)]
+    assert 150 < len(sample) < 250
+    assert sample == [h for h in hashes if policy.in_calibration(h)]
+    assert not CascadePolicy.from_dict(POLICY).in_calibration(hashes[0])
+
+
+def test_cascade_exits_early_and_reports_savings():
+    script = {
+        'strong': {'SYSTEM_1': (5, True), 'SYSTEM_2': (4.5, True), 'SYSTEM_2_PERSONA_DEBIAS': (4.4, True)},
+        'weak': {'SYSTEM_1': (1, False), 'SYSTEM_2': (1.5, False), 'SYSTEM_2_PERSONA_DEBIAS': (1.5, False)},
+        'borderline': {'SYSTEM_1': (3, False), 'SYSTEM_2': (2.9, False), 'SYSTEM_2_PERSONA_DEBIAS': (3.9, True)},
+    }
+    analyzer = ScriptedAnalyzer(script)
+    policy = CascadePolicy.from_dict(POLICY)
+    rows = {text: batch_score.score_one(analyzer, text, text, "job description", [], cascade=policy) for text in script}
+
+    assert rows['strong']['cascade'] == {'exited_after': None, 'calibration': False, 'arms_run': 3}
+    assert rows['weak']['cascade']['exited_after'] == 'SYSTEM_1' and list(rows['weak']['arm_scores']) == ['SYSTEM_1']
+    assert rows['borderline']['cascade']['exited_after'] == 'SYSTEM_2'
+    assert len(analyzer.calls) == 6
+
+    # The calibration sample runs every stage; there the borderline candidate's early exit flips the shortlist
+    calibration = CascadePolicy.from_dict(dict(POLICY, calibration_rate=1.0))
+    sample = [batch_score.score_one(analyzer, text, text, "job description", [], cascade=calibration) for text in script]
+    report = policy.report(list(rows.values()) + sample)
+    assert report['arm_runs'] == 6 + 9 and report['arm_runs_without_cascade'] == 18
+    assert report['arm_runs_saved'] == 3 and report['exits'] == {'SYSTEM_1': 1, 'SYSTEM_2': 1}
+    assert report['calibration_sample'] == 3 and report['calibration_would_exit'] == 2
+    assert report['calibration_flips'] == 1 and report['calibration_missed_shortlists'] == 1
+    assert report['flip_rate'] == 0.5 and report['estimated_flips_among_exited'] == 1.0
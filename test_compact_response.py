@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for expanding compact ARM B/C/D responses
+"""
+
+import pytest
+
+from conftest import FakeModel
+from resume_analyzer import (COMPACT_EVIDENCE_CHARS, DEFAULT_RUBRIC, EvaluationArm, GeminiAnalyzer,
+                             ResponseValidationError, weighted_fit_score)
+
+
+def test_compact_response_expands_with_local_fit_score():
+    response = {
+        "s": [{"c": 1, "v": 5, "e": "x" * 500}, {"c": 2, "v": 3, "e": "6 years"}, {"c": 3, "v": 4, "e": "Cut p99 by 40%"},
+              {"c": 4, "v": 2, "e": "Solo projects"}, {"c": 5, "v": 1, "e": "None listed"}],
+        "sl": True,
+        "j": "Strong skills match.",
+        "cr": {"ok": True, "n": "Job-related only.", "r": []},
+        "db": {"m": ["Ignored school names"], "r": []},
+        "fit_score_1_to_5": 5,  # model arithmetic is ignored
+    }
+    result = GeminiAnalyzer.expand_evaluation(response, DEFAULT_RUBRIC)
+    evaluation = result["evaluation"]
+
+    assert result["rubric"] is DEFAULT_RUBRIC
+    assert [s["criterion"] for s in evaluation["scores"]] == [r["criterion"] for r in DEFAULT_RUBRIC]
+    assert evaluation["fit_score_1_to_5"] == 3.5  # (150 + 60 + 100 + 30 + 10) / 100
+    assert len(evaluation["scores"][0]["evidence"]) == COMPACT_EVIDENCE_CHARS
+    assert evaluation["shortlist_recommend"] is True
+    assert evaluation["compliance_review"] == {"is_compliant": True, "compliance_notes": "Job-related only.", "risk_factors": []}
+    assert evaluation["debias_review"]["mitigations_applied"] == ["Ignored school names"]
+
+
+def test_verbose_response_is_still_accepted():
+    response = {"evaluation": {
+        "scores": [{"criterion": r["criterion"], "score": 4, "evidence": "Built APIs"} for r in DEFAULT_RUBRIC],
+        "fit_score_1_to_5": 2.1,
+        "shortlist_recommend": True,
+        "justification": "Strong match.",
+        "compliance_review": {"is_compliant": True},
+    }}
+    evaluation = GeminiAnalyzer.expand_evaluation(response, DEFAULT_RUBRIC)["evaluation"]
+    assert evaluation["fit_score_1_to_5"] == 4
+    assert evaluation["compliance_review"] == {"is_compliant": True}
+
+
+def test_invalid_compact_responses_are_rejected():
+    scores = [{"c": number, "v": 3, "e": "?"} for number in range(1, len(DEFAULT_RUBRIC) + 1)]
+    with pytest.raises(ValueError, match="criterion number"):
+        GeminiAnalyzer.expand_evaluation({"s": [{"c": 9, "v": 3, "e": "?"}], "sl": False, "j": ""}, DEFAULT_RUBRIC)
+    with pytest.raises(ValueError, match="shortlist"):
+        GeminiAnalyzer.expand_evaluation({"s": scores}, DEFAULT_RUBRIC)
+    assert weighted_fit_score([3, 4], [0, 0]) is None
+
+
+@pytest.mark.parametrize("scores, error", [
+    ([{"c": 1, "v": 5, "e": "?"}] + [{"c": n, "v": 3, "e": "?"} for n in range(1, len(DEFAULT_RUBRIC) + 1)], "Duplicate"),
+    ([{"c": n, "v": 3, "e": "?"} for n in range(2, len(DEFAULT_RUBRIC) + 1)], "Missing scores"),
+    (["skills"] + [{"c": n, "v": 3, "e": "?"} for n in range(1, len(DEFAULT_RUBRIC) + 1)], "not an object"),
+])
+def test_compact_scores_must_cover_each_criterion_once(scores, error):
+    with pytest.raises(ValueError, match=error):
+        GeminiAnalyzer.expand_evaluation({"s": scores, "sl": True, "j": "Strong match."}, DEFAULT_RUBRIC)
+
+
+def test_verbose_response_with_unknown_criteria_is_rejected():
+    response = {"evaluation": {
+        "scores": [{"criterion": f"Made up {i}", "score": 4, "evidence": "?"} for i in range(len(DEFAULT_RUBRIC))],
+        "shortlist_recommend": True,
+        "justification": "Strong match.",
+    }}
+    with pytest.raises(ValueError, match="Unknown criterion"):
+        GeminiAnalyzer.expand_evaluation(response, DEFAULT_RUBRIC)
+
+
+def test_invalid_criterion_scores_escalate_as_validation_errors(make_analyzer):
+    analyzer = make_analyzer(FakeModel({"s": [{"c": 1, "v": 4, "e": "Go"}, {"c": 1, "v": 4, "e": "Go"}], "sl": True, "j": "?"}),
+                             rubric=DEFAULT_RUBRIC)
+    with pytest.raises(ResponseValidationError, match="Duplicate"):
+        analyzer.analyze_resume("resume text", "job description", EvaluationArm.SYSTEM_2)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for near-duplicate resume detection
+"""
+
+import random
+
+from dedup import DuplicateIndex, estimate_similarity, minhash_signature
+from result_store import ResultStore
+
+RESUME = ("Backend engineer with eight years of Python, Go and Kubernetes in production systems. "
+          "Led a team of five building payment APIs, cut p99 latency by 40 percent, mentored juniors, "
+          "ran on-call for a high traffic platform and migrated services from VMs to Kubernetes.")
+EDITED = RESUME.replace("eight", "nine") + " AWS certified."
+OTHER = ("Marketing manager with six years in B2B campaigns, brand strategy and content. "
+         "Grew inbound leads threefold, managed a budget of two million and ran product launches.")
+
+
+def random_resume(rng):
+    words = ["python", "sql", "led", "built", "team", "data", "cloud", "design", "sales", "growth", "api", "ops"]
+    return " ".join(f"{rng.choice(words)}{rng.randint(0, 999)}" for _ in range(150))
+
+
+def test_signatures_estimate_similarity():
+    signature = minhash_signature(RESUME)
+    assert signature == minhash_signature(RESUME.upper())
+    assert estimate_similarity(signature, minhash_signature(EDITED)) > 0.7
+    assert estimate_similarity(signature, minhash_signature(OTHER)) < 0.2
+    assert minhash_signature("   ") is None
+
+
+def test_index_flags_near_duplicates_among_many_resumes():
+    rng = random.Random(3)
+    index = DuplicateIndex(store_factory=None)
+    for i in range(2000):
+        index.index_resume(f"resume_{i}", random_resume(rng))
+    index.index_resume("original", RESUME, "Alice")
+
+    matches = index.find_duplicates("edited", EDITED, "Alice (v2)")
+    assert [(h, label) for h, label, _ in matches] == [("original", "Alice")]
+    assert index.find_duplicates("other", OTHER) == []
+
+    index.remove("original")
+    assert index.find_duplicates("edited", EDITED) == []
+
+
+def test_index_is_bounded_and_persisted(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    index = DuplicateIndex(max_resumes=2, store_factory=lambda: store)
+    index.index_resume("original", RESUME, "Alice")
+    index.index_resume("other", OTHER, "Bob")
+    index.index_resume("third", random_resume(random.Random(1)))
+    assert len(index) == 2 and index.signature("original") is None
+
+    # A new process loads the most recent signatures from the store
+    reloaded = DuplicateIndex(max_resumes=10, store_factory=lambda: store)
+    assert [h for h, _, _ in reloaded.find_duplicates("edited", EDITED)] == ["original"]
+    store.delete_resume("original")
+    assert [h for h, _, _ in store.iter_fingerprints(10)] == ["other", "third", "edited"]
+
+
+def test_edited_resume_replaces_its_previous_fingerprint(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    index = DuplicateIndex(store_factory=lambda: store)
+    index.index_resume("original", RESUME, "Alice")
+    index.index_resume("edited", EDITED, "Alice", replaces="original")
+    assert index.signature("original") is None
+    assert [h for h, _, _ in store.iter_fingerprints(10)] == ["edited"]
+
+    # A version that has stored evaluations keeps its fingerprint; callers exclude it by hash
+    store.save_evaluation("edited", "jd", "SYSTEM_1", {"fit_score_1_to_5": 4})
+    index.index_resume("final", EDITED + " Speaks Spanish.", "Alice", replaces="edited")
+    assert index.signature("edited") is not None
+    signature = index.signature("final")
+    assert [h for h, _, _ in index.query(signature, exclude=("final",))] == ["edited"]
+    assert index.query(signature, exclude=("original", "edited", "final")) == []
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for verifying evidence quotes against the source resume
+"""
+
+from dummy_data import get_dummy_data_by_arm
+from evidence import EvidenceIndex, annotate_evidence, evidence_status
+from rendering import build_result_html
+
+RESUME = """Jane Doe - Senior Backend Engineer
+Acme Corp (2018-2024): Led a team of five engineers building payment APIs in Python and Go.
+Reduced p99 latency by 40% by introducing caching and async I/O.
+Migrated 30 services from VMs to Kubernetes; on-call lead for the platform.
+Education: B.Sc. Computer Science. AWS Certified Solutions Architect."""
+
+
+def test_verbatim_paraphrased_and_missing_evidence():
+    index = EvidenceIndex(RESUME)
+
+    offset, confidence = index.locate("led a team of five engineers building payment APIs")
+    assert confidence == 1.0 and RESUME[offset:].startswith("Led a team")
+
+    offset, confidence = index.locate('"Reduced latency by 40 percent using caching"')
+    assert 0.5 <= confidence < 1.0 and RESUME[offset:].startswith("Reduced p99")
+
+    assert index.locate("Published three papers on quantum chemistry")[1] < 0.5
+    assert index.locate("") == (None, 0.0)
+
+
+def test_joined_quotes_are_located_separately():
+    index = EvidenceIndex(RESUME)
+    offset, confidence = index.locate("Migrated 30 services from VMs to Kubernetes ... AWS Certified Solutions Architect")
+    assert confidence == 1.0 and RESUME[offset:].startswith("Migrated")
+
+    # Half the words come from a quote that isn't in the resume
+    assert index.locate("AWS Certified Solutions Architect; Google Cloud Professional Data Engineer")[1] < 0.8
+
+
+def test_results_are_annotated_and_rendered():
+    result = get_dummy_data_by_arm('SYSTEM_2')
+    result['evaluation']['scores'][0]['evidence'] = "Led a team of five engineers building payment APIs"
+    annotate_evidence(result, RESUME)
+    scores = result['evaluation']['scores']
+    assert scores[0]['evidence_confidence'] == 1.0 and scores[0]['evidence_offset'] == RESUME.index("Led")
+    assert all('evidence_confidence' in score for score in scores)
+
+    html = build_result_html(result, 'SYSTEM_2')
+    assert evidence_status(1.0) in html
+    assert evidence_status(None) is None
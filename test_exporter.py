@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming evaluation export
+"""
+
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+
+from dummy_data import get_dummy_data_by_arm
+from exporter import export, iter_rows
+
+
+def make_candidates(loaded):
+    def loader(arm_name):
+        loaded.append(arm_name)
+        return get_dummy_data_by_arm(arm_name)
+
+    return [
+        {'resume_id': 'resume_1', 'label': 'Alice', 'scores': {'SYSTEM_1': 3, 'SYSTEM_2': 3}, 'load_result': loader},
+        {'resume_id': 'resume_2', 'label': 'Bob/Smith', 'scores': {'SYSTEM_2': 4.5}, 'load_result': lambda arm_name: None},
+    ]
+
+
+def test_rows_are_generated_lazily_per_criterion():
+    loaded = []
+    rows = iter_rows(make_candidates(loaded))
+    first = next(rows)
+    assert first['arm'] == 'SYSTEM_1' and first['criterion'] is None
+    assert loaded == ['SYSTEM_1']
+
+    rest = list(rows)
+    arm_b = [r for r in rest if r['resume_id'] == 'resume_1']
+    assert len(arm_b) == len(get_dummy_data_by_arm('SYSTEM_2')['evaluation']['scores'])
+    assert arm_b[0]['weight'] == 30 and arm_b[0]['evidence']
+    assert rest[-1] == dict(rest[-1], resume_id='resume_2', fit_score=4.5, criterion=None)
+
+
+def test_csv_and_jsonl_exports():
+    out = io.BytesIO()
+    export(make_candidates([]), 'CSV', out)
+    csv_rows = list(csv.DictReader(io.StringIO(out.getvalue().decode('utf-8'))))
+
+    out = io.BytesIO()
+    export(make_candidates([]), 'JSONL', out)
+    jsonl_rows = [json.loads(line) for line in out.getvalue().decode('utf-8').splitlines()]
+
+    assert len(csv_rows) == len(jsonl_rows) == 7
+    assert csv_rows[1]['criterion'] == jsonl_rows[1]['criterion'] == 'Required technical skill match'
+
+
+def test_parquet_export():
+    pq = pytest.importorskip('pyarrow.parquet')
+    out = io.BytesIO()
+    export(make_candidates([]), 'Parquet', out)
+    table = pq.read_table(io.BytesIO(out.getvalue()))
+    assert table.num_rows == 7
+    assert table.column('fit_score').to_pylist()[-1] == 4.5
+
+
+def test_html_bundle_has_one_report_per_candidate():
+    out = io.BytesIO()
+    export(make_candidates([]), 'HTML bundle (zip)', out)
+    with zipfile.ZipFile(io.BytesIO(out.getvalue())) as bundle:
+        assert bundle.namelist() == ['Alice_resume_1.html', 'Bob_Smith_resume_2.html']
+        alice = bundle.read('Alice_resume_1.html').decode('utf-8')
+    assert 'ARM B: Detailed Rubric-Based Evaluation' in alice
+    assert 'Required technical skill match (Weight: 30%)' in alice
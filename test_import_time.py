@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Cold-start import budget, measured with `python -X importtime`
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded on first use (first upload, first analysis, first table/chart), never at startup
+LAZY_MODULES = ['google.generativeai', 'pdfplumber', 'PyPDF2', 'docx', 'pandas', 'numpy']
+
+# Cumulative import time budgets in milliseconds; eager imports cost ~800 ms for
+# resume_analyzer and ~2 s for app, lazy ones ~10 ms and ~500 ms
+APP_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_APP_MS', '1200'))
+ANALYZER_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_ANALYZER_MS', '150'))
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time in microseconds per module for a cold `import module`"""
+    env = dict(os.environ, RESULT_STORE_PATH='', TELEMETRY_JSONL='', TELEMETRY_PROM='')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=HERE, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize('module, budget_ms', [('resume_analyzer', ANALYZER_BUDGET_MS), ('app', APP_BUDGET_MS)])
+def test_cold_start_within_budget(module, budget_ms):
+    times = import_times(module)
+    assert not [name for name in LAZY_MODULES if name in times]
+    assert times[module] / 1000 <= budget_ms, f"{module} took {times[module] / 1000:.0f} ms to import"
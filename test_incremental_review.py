@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for ARM C/D reviews layered on ARM B results
+"""
+
+from conftest import FakeModel
+from resume_analyzer import EvaluationArm
+from dummy_data import get_dummy_data_by_arm
+
+
+def test_debias_review_adjusts_arm_b_scores(make_analyzer):
+    arm_b = get_dummy_data_by_arm("SYSTEM_2")
+    reply = {
+        "score_adjustments": [{"criterion": "Certifications/education relevance", "delta": -2, "reason": "prestige proxy"}],
+        "shortlist_recommend": False,
+        "compliance_review": {"is_compliant": True, "compliance_notes": "ok", "risk_factors": []},
+        "debias_review": {"mitigations_applied": ["Ignored school name"], "residual_risks": []},
+    }
+    model = FakeModel(reply)
+    analyzer = make_analyzer(model)
+
+    result = analyzer.analyze_resume("resume text", "job description", EvaluationArm.SYSTEM_2_PERSONA_DEBIAS, base_result=arm_b)
+
+    evaluation = result["evaluation"]
+    assert result["rubric"] == arm_b["rubric"]
+    education = next(s for s in evaluation["scores"] if s["criterion"] == "Certifications/education relevance")
+    assert education["score"] == 2
+    # 3*30 + 3*20 + 2*25 + 3*15 + 2*10 = 265 -> 2.65
+    assert evaluation["fit_score_1_to_5"] == 2.65
+    assert evaluation["score_delta"] == -0.35
+    assert evaluation["debias_review"]["mitigations_applied"] == ["Ignored school name"]
+    # The review prompt carries ARM B's output, not the resume
+    assert "resume text" not in model.prompts[0]
+
+
+def test_compliance_review_without_adjustments_keeps_scores(make_analyzer):
+    arm_b = get_dummy_data_by_arm("SYSTEM_2")
+    reply = {
+        "score_adjustments": [],
+        "shortlist_recommend": False,
+        "compliance_review": {"is_compliant": True, "compliance_notes": "ok", "risk_factors": []},
+    }
+    result = make_analyzer(FakeModel(reply)).analyze_resume("resume", "jd", EvaluationArm.SYSTEM_2_PERSONA, base_result=arm_b)
+
+    assert [s["score"] for s in result["evaluation"]["scores"]] == [s["score"] for s in arm_b["evaluation"]["scores"]]
+    assert result["evaluation"]["compliance_review"]["is_compliant"] is True
+    assert "debias_review" not in result["evaluation"]
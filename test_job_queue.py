@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the background ARM evaluation job queue
+"""
+
+import time
+
+from dummy_data import get_dummy_data_by_arm
+from job_queue import DONE, FAILED, JobQueue
+from resume_analyzer import EvaluationArm
+
+ALL_ARMS = [arm.name for arm in EvaluationArm]
+
+
+class FakeAnalyzer:
+    def __init__(self, fail_arms=()):
+        self.calls = []
+        self.fail_arms = fail_arms
+
+    def analyze_resume(self, resume_text, job_description, arm, base_result=None):
+        self.calls.append((arm.name, base_result is not None))
+        if arm.name in self.fail_arms:
+            raise RuntimeError("quota exceeded")
+        return get_dummy_data_by_arm(arm.name)
+
+
+class FakeStore:
+    def __init__(self):
+        self.saved = []
+
+    def save_evaluation(self, resume_hash, jd_hash, arm, result, score=None, shortlist=None, label=''):
+        self.saved.append((arm, score, label))
+
+
+def wait_for(job, timeout=5):
+    deadline = time.time() + timeout
+    while job.pending and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_runs_arms_in_order_and_saves_each():
+    analyzer, store = FakeAnalyzer(), FakeStore()
+    queue = JobQueue(workers=2, analyzer_factory=lambda: analyzer, store_factory=lambda: store)
+    job = wait_for(queue.submit('resume_1', 'Alice', ALL_ARMS, 'resume text', 'job description'))
+
+    assert job.status == DONE and queue.get(job.job_id) is job
+    # ARM C and D review the ARM B result produced earlier in the same job
+    assert analyzer.calls == [('SYSTEM_1', False), ('SYSTEM_2', False), ('SYSTEM_2_PERSONA', True), ('SYSTEM_2_PERSONA_DEBIAS', True)]
+    assert [arm for arm, _, _ in store.saved] == ALL_ARMS
+    assert [o.arm_name for o in job.uncollected()] == ALL_ARMS
+    assert job.uncollected() == []
+
+
+def test_api_errors_fall_back_and_job_errors_fail():
+    queue = JobQueue(workers=1, analyzer_factory=lambda: FakeAnalyzer(fail_arms=('SYSTEM_1',)), store_factory=lambda: None)
+    job = wait_for(queue.submit('resume_1', 'Bob', ['SYSTEM_1'], 'resume text', 'job description'))
+    assert job.status == DONE
+    assert job.outcomes[0].fallback and job.outcomes[0].fit_score == 3
+
+    def broken_store():
+        raise RuntimeError("database is locked")
+
+    queue = JobQueue(workers=1, analyzer_factory=FakeAnalyzer, store_factory=broken_store)
+    job = wait_for(queue.submit('resume_2', 'Carol', ['SYSTEM_1'], 'resume text', 'job description'))
+    assert job.status == FAILED and "locked" in job.error
+
+
+def test_fallbacks_are_never_stored_or_reviewed():
+    analyzer, store = FakeAnalyzer(fail_arms=('SYSTEM_1', 'SYSTEM_2')), FakeStore()
+    queue = JobQueue(workers=1, analyzer_factory=lambda: analyzer, store_factory=lambda: store)
+    job = wait_for(queue.submit('resume_1', 'Dana', ALL_ARMS, 'resume text', 'job description'))
+
+    assert job.status == DONE
+    assert [o.fallback for o in job.outcomes] == [True, True, False, False]
+    assert [arm for arm, _, _ in store.saved] == ['SYSTEM_2_PERSONA', 'SYSTEM_2_PERSONA_DEBIAS']
+    # ARM C/D score from scratch instead of reviewing ARM B's placeholder
+    assert analyzer.calls[2:] == [('SYSTEM_2_PERSONA', False), ('SYSTEM_2_PERSONA_DEBIAS', False)]
+
+
+def test_history_is_bounded():
+    queue = JobQueue(workers=1, analyzer_factory=FakeAnalyzer, store_factory=lambda: None, max_jobs=3)
+    jobs = [wait_for(queue.submit(f'resume_{i}', str(i), ['SYSTEM_1'], 'text', 'jd')) for i in range(5)]
+    assert queue.get(jobs[0].job_id) is None
+    assert queue.get(jobs[-1].job_id) is jobs[-1]
+
+
+def test_later_jobs_do_not_review_a_fallback_arm_b(monkeypatch):
+    import app
+    import streamlit as st
+    from session_records import ResumeRecord
+
+    monkeypatch.setenv('RESULT_STORE_PATH', '')
+    analyzer, store = FakeAnalyzer(fail_arms=('SYSTEM_2',)), FakeStore()
+    queue = JobQueue(workers=1, analyzer_factory=lambda: analyzer, store_factory=lambda: store)
+    monkeypatch.setattr(app, 'job_queue', queue)
+    st.session_state.resumes['fallback'] = ResumeRecord('Erin', 'resume text')
+    try:
+        job = wait_for(app.submit_evaluation('fallback', ['SYSTEM_2'], 'job description'))
+        assert job.outcomes[0].fallback
+        assert app.apply_job_outcome(job, job.outcomes[0])
+
+        job = wait_for(app.submit_evaluation('fallback', ['SYSTEM_2_PERSONA'], 'job description'))
+    finally:
+        del st.session_state.resumes['fallback']
+
+    assert job.status == DONE and job.base_result is None
+    # ARM C scores from scratch instead of reviewing ARM B's placeholder, so it is safe to store
+    assert analyzer.calls[-1] == ('SYSTEM_2_PERSONA', False)
+    assert [arm for arm, _, _ in store.saved] == ['SYSTEM_2_PERSONA']
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the candidate leaderboard ranking and pagination
+"""
+
+import math
+
+from leaderboard import build_score_frame, filter_frame, page_count, paginate, top_k
+from session_records import ResumeRecord
+
+
+def make_record(label, arm_scores):
+    record = ResumeRecord(label)
+    for arm_name, score in arm_scores.items():
+        record.record_result(arm_name, score)
+    return record
+
+
+def make_resumes():
+    return {
+        'resume_1': make_record('Alice', {'SYSTEM_1': 4.0, 'SYSTEM_2': 3.0, 'SYSTEM_2_PERSONA': 3.5, 'SYSTEM_2_PERSONA_DEBIAS': 3.5}),
+        'resume_2': make_record('Bob', {'SYSTEM_1': 5.0, 'SYSTEM_2': 4.8}),
+        'resume_3': make_record('Carol', {}),
+        'resume_4': make_record('Dan backend', {'SYSTEM_1': 2.0, 'SYSTEM_2': 4.5, 'SYSTEM_2_PERSONA': 4.0, 'SYSTEM_2_PERSONA_DEBIAS': 4.2}),
+    }
+
+
+def test_frame_aggregates():
+    frame = build_score_frame(make_resumes())
+    assert frame.loc['resume_1', 'average'] == 3.5
+    assert frame.loc['resume_2', 'completed'] == 2
+    assert math.isnan(frame.loc['resume_3', 'average'])
+    assert math.isnan(frame.loc['resume_2', 'SYSTEM_2_PERSONA_DEBIAS'])
+    assert frame.loc['resume_4', 'disagreement'] == 2.5
+
+
+def test_top_k_skips_missing_scores():
+    frame = build_score_frame(make_resumes())
+    assert list(top_k(frame, 'average', 10).index) == ['resume_2', 'resume_4', 'resume_1']
+    assert list(top_k(frame, 'SYSTEM_2_PERSONA_DEBIAS', 1).index) == ['resume_4']
+    assert list(top_k(frame, 'disagreement', 2, descending=False).index) == ['resume_2', 'resume_1']
+
+
+def test_pagination_and_filters():
+    frame = build_score_frame(make_resumes())
+    assert page_count(frame, 'average', 2) == 2
+    assert list(paginate(frame, 'average', 2, 2).index) == ['resume_1']
+    assert list(filter_frame(frame, label_query='BACKEND').index) == ['resume_4']
+    assert list(filter_frame(frame, completed_only=True).index) == ['resume_1', 'resume_4']
+    assert list(filter_frame(frame, min_average=3.6).index) == ['resume_2', 'resume_4']
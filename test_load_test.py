@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-session load test harness and its mock Gemini backend
+"""
+
+import argparse
+import random
+
+import pytest
+
+from load_test import LatencyProfile, MockGeminiAnalyzer, parse_latency, run_load_test
+from resume_analyzer import DEFAULT_RUBRIC, EvaluationArm
+
+
+def test_latency_specs():
+    rng = random.Random(1)
+    assert parse_latency('fixed:0.5')(rng) == 0.5
+    assert all(0.1 <= parse_latency('uniform:0.1,0.2')(rng) <= 0.2 for _ in range(50))
+    assert parse_latency('lognormal:1,0')(rng) == pytest.approx(1.0)
+
+    profile = LatencyProfile(['fixed:1', 'rubric=fixed:2'])
+    assert profile.sample('rubric', rng) == 2 and profile.sample('review', rng) == 1
+    for bad in ['fixed', 'uniform:2,1', 'gamma:1', 'lognormal:0,1']:
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_latency(bad)
+    with pytest.raises(argparse.ArgumentTypeError):
+        LatencyProfile(['parse=fixed:1'])
+
+
+def test_mock_analyzer_answers_every_arm(tmp_path, monkeypatch):
+    monkeypatch.setenv('RESULT_STORE_PATH', str(tmp_path / 'results.db'))
+    analyzer = MockGeminiAnalyzer(LatencyProfile(), seed=3)
+    resume = "Platform engineer\nBuilt the event pipeline in Go, serving 40k requests per second\nSkills: Go, Kafka"
+    jd = "Platform engineer with Go and Kafka experience running production services at scale."
+
+    assert 1 <= analyzer.analyze_resume(resume, jd, EvaluationArm.SYSTEM_1)['fit_score_1_to_5'] <= 5
+    base = analyzer.analyze_resume(resume, jd, EvaluationArm.SYSTEM_2)
+    scores = base['evaluation']['scores']
+    assert len(scores) == len(DEFAULT_RUBRIC)
+    assert all(s['evidence_confidence'] == 1.0 for s in scores)
+
+    debias = analyzer.analyze_resume(resume, jd, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS, base_result=base)
+    assert 'debias_review' in debias['evaluation']
+
+
+def test_sessions_complete_every_arm(tmp_path, monkeypatch):
+    monkeypatch.setenv('RESULT_STORE_PATH', str(tmp_path / 'results.db'))
+    report = run_load_test(sessions=2, latency=LatencyProfile(['fixed:0.01']), poll_s=0.05, arm_timeout_s=30)
+
+    assert report['errors'] == []
+    assert report['arms_completed'] == report['arms_expected'] == 8
+    assert report['fallbacks'] == 0 and report['model_calls'] >= 8
+    assert report['interaction_p99_ms'] >= report['interaction_p50_ms'] > 0
+    assert report['cpu_s'] > 0 and report['rss_end_mb'] > 0
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for section-aligned chunking and map-reduce scoring of long resumes
+"""
+
+import json
+import threading
+
+from chunking import chunk_resume, is_heading, split_sections
+from conftest import FakeResponse
+from resume_analyzer import DEFAULT_RUBRIC, EvaluationArm
+from shared_cache import shared_cache
+from tracing import tracer
+
+
+def long_resume(jobs=60):
+    lines = ["Jordan Lee", "jordan@example.com", "", "EXPERIENCE"]
+    for i in range(jobs):
+        lines += [f"Engineer {i}, Company {i}", f"Built service {i} in Python serving {i}k requests per second", ""]
+    lines += ["Education:", "BSc Computer Science", "", "PUBLICATIONS"]
+    lines += [f"Paper {i} on distributed systems" for i in range(40)]
+    return "\n".join(lines)
+
+
+def test_headings():
+    assert is_heading("EXPERIENCE") and is_heading("Publications:") and is_heading("  work experience ")
+    assert not is_heading("Built service 1 in Python") and not is_heading("") and not is_heading("2019 - 2021")
+
+
+def test_chunks_follow_sections():
+    text = long_resume()
+    assert [heading for heading, _ in split_sections(text)] == ['', 'EXPERIENCE', 'Education', 'PUBLICATIONS']
+
+    chunks = chunk_resume(text, max_chars=1500)
+    assert len(chunks) > 2 and all(len(chunk) <= 1500 for chunk in chunks)
+    # Nothing is lost or reordered, apart from the repeated headings
+    rejoined = [line for chunk in chunks for line in chunk.splitlines() if line and not line.endswith("(continued)")]
+    assert rejoined == [line for line in text.splitlines() if line]
+    # A section split across chunks keeps its heading
+    assert chunks[1].startswith("EXPERIENCE (continued)")
+    # Short sections are not split: Education starts and ends in one chunk
+    assert sum("BSc Computer Science" in chunk for chunk in chunks) == 1
+
+
+def test_overlong_line_is_sliced():
+    chunks = chunk_resume("SUMMARY\n" + "x" * 5000, max_chars=1000)
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert "".join(chunk.replace("SUMMARY (continued)\n", "") for chunk in chunks) == "SUMMARY\n" + "x" * 5000
+
+
+class MapReduceModel:
+    """Map calls find Python evidence in the parts that have it; the reduce call keeps the best quotes"""
+
+    def __init__(self):
+        self.prompts = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.threads.add(threading.get_ident())
+        if "RESUME PART" in prompt:
+            part = prompt.split("RESUME PART", 1)[1]
+            scores = [{"c": 1, "v": 5, "e": "Built service 59 in Python serving 59k requests per second"}
+                      if "service 59 " in part else {"c": 1, "v": 0, "e": ""}]
+            if "Paper 3 " in part:
+                scores.append({"c": 3, "v": 4, "e": "Paper 3 on distributed systems"})
+            return FakeResponse(json.dumps({"s": scores}))
+        return FakeResponse(json.dumps({
+            "s": [{"c": 1, "v": 5, "e": "Built service 59 in Python serving 59k requests per second"},
+                  {"c": 2, "v": 1, "e": "no evidence"}, {"c": 3, "v": 4, "e": "Paper 3 on distributed systems"},
+                  {"c": 4, "v": 1, "e": "no evidence"}, {"c": 5, "v": 1, "e": "no evidence"}],
+            "sl": True, "j": "Strong Python evidence.",
+            "cr": {"ok": True, "n": "Job-related only.", "r": []},
+        }))
+
+
+def test_long_resume_is_scored_map_reduce(monkeypatch, make_analyzer):
+    monkeypatch.setattr('resume_analyzer.LONG_RESUME_CHARS', 2000)
+    monkeypatch.setattr('chunking.CHUNK_CHARS', 1500)
+    shared_cache.clear('arm_results')
+    model = MapReduceModel()
+    analyzer = make_analyzer(model, rubric=DEFAULT_RUBRIC)
+    text = long_resume()
+
+    result = analyzer.analyze_resume(text, "Senior Python engineer", EvaluationArm.SYSTEM_2_PERSONA)
+
+    prompts = model.prompts
+    parts = len(chunk_resume(text))
+    assert len(prompts) == parts + 1 and sum("RESUME PART" in p for p in prompts) == parts
+    # The reduce prompt carries the merged evidence, not the resume
+    assert "Built service 59 in Python" in prompts[-1] and "no evidence in any part" in prompts[-1]
+    assert "Built service 12 in Python" not in prompts[-1]
+    evaluation = result["evaluation"]
+    assert [s["criterion"] for s in evaluation["scores"]] == [r["criterion"] for r in DEFAULT_RUBRIC]
+    assert evaluation["scores"][0]["score"] == 5 and evaluation["scores"][0]["evidence_confidence"] == 1.0
+    assert evaluation["compliance_review"]["is_compliant"] is True
+    shared_cache.clear('arm_results')
+
+
+def test_short_resume_uses_one_call(make_analyzer):
+    shared_cache.clear('arm_results')
+    model = MapReduceModel()
+    text = long_resume(jobs=60)
+    make_analyzer(model, rubric=DEFAULT_RUBRIC).analyze_resume(text, "Senior Python engineer", EvaluationArm.SYSTEM_2_PERSONA)
+    assert len(model.prompts) == 1 and "RESUME PART" not in model.prompts[0]
+    shared_cache.clear('arm_results')
+
+
+def test_part_spans_are_traced_under_the_map_span(monkeypatch, make_analyzer):
+    monkeypatch.setattr('resume_analyzer.LONG_RESUME_CHARS', 2000)
+    monkeypatch.setattr('chunking.CHUNK_CHARS', 1500)
+    monkeypatch.setattr(tracer, 'enabled', True)
+    shared_cache.clear('arm_results')
+    tracer.clear()
+    model = MapReduceModel()
+    text = long_resume()
+    with tracer.trace('job', owner='session-a'):
+        make_analyzer(model, rubric=DEFAULT_RUBRIC).analyze_resume(text, "Senior Python engineer", EvaluationArm.SYSTEM_2)
+
+    trace, = tracer.recent('session-a')
+    parts = len(chunk_resume(text))
+    map_span = next(s for s in trace.spans if s['name'] == f'map {parts} parts')
+    chunk_spans = [s for s in trace.spans if s['name'] == 'gemini:chunk']
+    assert len(chunk_spans) == parts and len(model.threads) > 1
+    assert all(s['depth'] == map_span['depth'] + 1 for s in chunk_spans)
+    assert all(map_span['start_ms'] <= s['start_ms'] <= map_span['start_ms'] + map_span['duration_ms'] for s in chunk_spans)
+    shared_cache.clear('arm_results')
+    tracer.clear()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for per-ARM model tier routing and escalation
+"""
+
+import pytest
+
+from conftest import FakeModel
+from model_routing import DEFAULT_ROUTES, Route, RoutingPolicy
+from resume_analyzer import DEFAULT_RUBRIC, EvaluationArm, ResponseValidationError
+from shared_cache import shared_cache
+from telemetry import Telemetry, telemetry
+
+
+def arm_a(score):
+    return {"fit_score_1_to_5": score, "shortlist_recommend": score >= 4, "justification": "Quick read."}
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    shared_cache.clear('arm_results')
+    telemetry.clear()
+    yield
+    shared_cache.clear('arm_results')
+    telemetry.clear()
+
+
+def test_arm_a_runs_on_the_lite_tier(make_analyzer):
+    analyzer = make_analyzer(rubric=DEFAULT_RUBRIC, lite=FakeModel(arm_a(5)), flash=FakeModel())
+    result = analyzer.analyze_resume("resume text " * 10, "job description", EvaluationArm.SYSTEM_1)
+
+    assert result["fit_score_1_to_5"] == 5
+    assert analyzer.models['lite'].configs == [{'temperature': 0.2}]
+    record, = telemetry.records
+    assert record['model'] == 'gemini-2.5-flash-lite' and record['tier'] == 'lite'
+
+
+def test_ambiguous_arm_a_score_is_escalated(make_analyzer):
+    analyzer = make_analyzer(rubric=DEFAULT_RUBRIC, lite=FakeModel(arm_a(3)), flash=FakeModel(arm_a(4)))
+    result = analyzer.analyze_resume("resume text " * 10, "job description", EvaluationArm.SYSTEM_1)
+
+    assert result["fit_score_1_to_5"] == 4
+    assert [(r['kind'], r['tier'], r['escalation']) for r in telemetry.records] == [
+        ('score', 'lite', ''), ('escalation', 'lite', 'ambiguous'), ('score', 'flash', '')]
+    flash, lite = telemetry.route_summary()
+    assert lite['escalations'] == 1 and lite['escalation_rate'] == 1.0
+    assert flash['escalations'] == 0 and flash['calls'] == 1
+
+
+def test_failed_escalation_keeps_the_first_result(make_analyzer):
+    analyzer = make_analyzer(rubric=DEFAULT_RUBRIC, lite=FakeModel(arm_a(3)), flash=FakeModel("not json"))
+    result = analyzer.analyze_resume("resume text " * 10, "job description", EvaluationArm.SYSTEM_1)
+    assert result["fit_score_1_to_5"] == 3
+
+
+def test_invalid_response_is_escalated_once(make_analyzer):
+    valid = {"s": [{"c": n, "v": 4, "e": "resume text"} for n in range(1, 6)], "sl": True, "j": "Good fit."}
+    analyzer = make_analyzer(rubric=DEFAULT_RUBRIC, flash=FakeModel({"s": []}), pro=FakeModel(valid))
+    result = analyzer.analyze_resume("resume text " * 10, "job description", EvaluationArm.SYSTEM_2)
+
+    assert result["evaluation"]["fit_score_1_to_5"] == 4.0
+    escalation = next(r for r in telemetry.records if r['kind'] == 'escalation')
+    assert escalation['tier'] == 'flash' and escalation['escalation'] == 'invalid'
+    assert "Missing criterion scores" in escalation['error']
+
+    # The stronger tier failing too is a validation error, not another escalation
+    analyzer = make_analyzer(rubric=DEFAULT_RUBRIC, flash=FakeModel("{}"), pro=FakeModel("{}"))
+    with pytest.raises(ResponseValidationError):
+        analyzer.analyze_resume("other resume " * 10, "job description", EvaluationArm.SYSTEM_2)
+
+
+def test_routes_from_json():
+    policy = RoutingPolicy.from_json('{"SYSTEM_1": {"tier": "flash", "escalate_to": null}, '
+                                     '"SYSTEM_2": {"ambiguous_band": [2.8, 3.2]}}')
+    assert policy.route('SYSTEM_1').tier == 'flash' and policy.route('SYSTEM_1').escalation('flash', 'invalid') is None
+    assert policy.route('SYSTEM_2').escalation('flash', 'ambiguous', 3.0) == 'pro'
+    assert policy.route('SYSTEM_2').escalation('flash', 'ambiguous', 3.5) is None
+    assert policy.route('SYSTEM_2_PERSONA').to_dict() == DEFAULT_ROUTES['SYSTEM_2_PERSONA'].to_dict()
+    with pytest.raises(ValueError, match="Unknown model tier"):
+        Route('ultra')
+
+
+def test_route_metrics_in_prometheus():
+    recorder = Telemetry()
+    recorder.record('SYSTEM_1', 'score', 'gemini-2.5-flash-lite', 0.2, input_tokens=1000, tier='lite')
+    recorder.record('SYSTEM_1', 'score', 'gemini-2.5-flash-lite', 0.3, input_tokens=1000, tier='lite')
+    recorder.record('SYSTEM_1', 'escalation', 'gemini-2.5-flash-lite', tier='lite', escalation='ambiguous')
+
+    (row,) = recorder.summary()
+    assert row['calls'] == 2 and row['escalations'] == 1
+    metrics = recorder.to_prometheus()
+    assert 'resume_scorer_llm_route_escalation_ratio{arm="SYSTEM_1",tier="lite"} 0.5' in metrics
+    assert 'resume_scorer_escalations_total{arm="SYSTEM_1"} 1' in metrics
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Tests for the ARM result renderer
+"""
+
+import rendering
+from dummy_data import get_dummy_data_by_arm
+
+
+def test_every_arm_renders_one_block():
+    for arm_name in rendering.ARM_LAYOUTS:
+        block = rendering.build_result_html(get_dummy_data_by_arm(arm_name), arm_name, "Alice")
+        assert block.startswith("<h3>📊 Analysis Results for Alice</h3>")
+        assert "\n\n" not in block  # a blank line would end the HTML block in markdown
+
+    debias = rendering.build_result_html(get_dummy_data_by_arm("SYSTEM_2_PERSONA_DEBIAS"), "SYSTEM_2_PERSONA_DEBIAS")
+    assert "Debiased Compliance Score: 3/5" in debias
+    assert "Mitigations Applied" in debias
+    assert "Compliance Review" not in debias
+
+
+def test_weights_come_from_rubric_and_text_is_escaped():
+    result = get_dummy_data_by_arm("SYSTEM_2")
+    result["evaluation"]["scores"][0]["evidence"] = "<script>alert(1)</script>"
+    block = rendering.build_result_html(result, "SYSTEM_2")
+    assert "Required technical skill match (Weight: 30%)</h4>" in block
+    assert "&lt;script&gt;" in block and "<script>" not in block
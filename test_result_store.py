@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite evaluation result store
+"""
+
+import threading
+
+from result_store import ResultStore
+from dummy_data import get_dummy_data_by_arm
+
+
+def test_scores_load_without_payloads_and_results_load_on_demand(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.save_evaluation("r1", "jd1", "SYSTEM_1", get_dummy_data_by_arm("SYSTEM_1"), score=3, shortlist=False, label="Alice")
+    store.save_evaluation("r1", "jd1", "SYSTEM_2", get_dummy_data_by_arm("SYSTEM_2"), score=3.2, shortlist=True)
+    store.save_evaluation("r1", "jd2", "SYSTEM_1", get_dummy_data_by_arm("SYSTEM_1"), score=1)
+
+    assert store.get_scores("r1", "jd1") == {"SYSTEM_1": 3, "SYSTEM_2": 3.2}
+    assert store.get_result("r1", "jd1", "SYSTEM_2")["evaluation"]["scores"][0]["score"] == 3
+    assert store.get_result("r1", "jd1", "SYSTEM_2_PERSONA") is None
+
+    # Re-running an ARM replaces the stored row instead of duplicating it
+    store.save_evaluation("r1", "jd1", "SYSTEM_1", get_dummy_data_by_arm("SYSTEM_1"), score=4)
+    assert store.get_scores("r1", "jd1")["SYSTEM_1"] == 4
+    assert len(store.list_recent(jd_hash="jd1")) == 2
+
+
+def test_batch_save_is_atomic(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    rows = [
+        {"resume_hash": "r1", "jd_hash": "jd", "arm": "SYSTEM_1", "result": {"fit_score_1_to_5": 3}, "score": 3},
+        {"resume_hash": "r1", "jd_hash": "jd", "arm": "SYSTEM_2", "result": object()},  # not JSON serializable
+    ]
+    try:
+        store.save_evaluations(rows)
+    except TypeError:
+        pass
+    assert store.get_scores("r1", "jd") == {}
+
+
+def test_store_is_shared_across_threads(tmp_path):
+    path = str(tmp_path / "results.db")
+    store = ResultStore(path)
+
+    def worker(i):
+        store.save_evaluation(f"r{i}", "jd", "SYSTEM_1", {"fit_score_1_to_5": i}, score=i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # A second store on the same file (another process or session) sees every row
+    assert len(ResultStore(path).list_recent(limit=100)) == 8
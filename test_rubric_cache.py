@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-JD rubric cache shared by ARM B, C and D
+"""
+
+import json
+
+import resume_analyzer
+from conftest import FakeModel
+from resume_analyzer import DEFAULT_RUBRIC, EvaluationArm, GeminiAnalyzer
+from shared_cache import shared_cache
+
+
+def rubric_or_evaluation(prompt):
+    """Canned JSON for rubric prompts and scoring prompts"""
+    if "preparing a hiring rubric" in prompt:
+        return {"rubric": [dict(r, description=f"Role-specific: {r['criterion']}") for r in DEFAULT_RUBRIC]}
+    evaluation = {
+        "s": [{"c": i, "v": 4, "e": "Built APIs"} for i in range(1, len(DEFAULT_RUBRIC) + 1)],
+        "sl": True,
+        "j": "Strong match.",
+    }
+    return "```json\n" + json.dumps(evaluation) + "\n```"
+
+
+def test_rubric_generated_once_per_normalized_jd(make_analyzer):
+    shared_cache.clear()
+    model = FakeModel(answer=rubric_or_evaluation)
+    analyzer = make_analyzer(model)
+    resume = "Senior engineer with ten years of Python and Kubernetes experience."
+    jd = "We need a backend engineer with Python and Kubernetes experience."
+
+    for arm in [EvaluationArm.SYSTEM_2, EvaluationArm.SYSTEM_2_PERSONA, EvaluationArm.SYSTEM_2_PERSONA_DEBIAS]:
+        result = analyzer.analyze_resume(resume, jd, arm)
+        assert [r["criterion"] for r in result["rubric"]] == [r["criterion"] for r in DEFAULT_RUBRIC]
+        assert result["rubric"][0]["description"].startswith("Role-specific")
+        assert result["evaluation"]["fit_score_1_to_5"] == 4
+        assert result["evaluation"]["scores"][0]["evidence_confidence"] < 0.5  # "Built APIs" is not in the resume
+
+    # Whitespace and case differences hit the same cache entry (a new resume, so it is still scored)
+    analyzer.analyze_resume(resume + " Led a team of five.", "  we need a BACKEND engineer with Python and\nKubernetes experience. ", EvaluationArm.SYSTEM_2)
+
+    rubric_calls = [p for p in model.prompts if "preparing a hiring rubric" in p]
+    assert len(rubric_calls) == 1
+    assert len(model.prompts) == 5
+
+
+def test_scoring_prompt_embeds_fixed_rubric(make_analyzer):
+    rubric = [dict(r, description="custom description") for r in DEFAULT_RUBRIC]
+    prompt = make_analyzer(FakeModel(answer=rubric_or_evaluation)).get_arm_prompt(EvaluationArm.SYSTEM_2, "resume", "jd", rubric)
+    assert "custom description" in prompt
+    assert '"rubric"' not in prompt
+
+
+def test_rubric_validation_keeps_fixed_weights():
+    generated = [dict(r, weight=1) for r in DEFAULT_RUBRIC]
+    validated = GeminiAnalyzer.validate_rubric(generated)
+    assert sum(r["weight"] for r in validated) == 100
+    assert resume_analyzer.job_description_hash("A  b") == resume_analyzer.job_description_hash("a b")
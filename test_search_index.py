@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the inverted-index candidate search
+"""
+
+import pytest
+
+from search_index import QuerySyntaxError, SearchIndex, tokenize
+
+RESUMES = {
+    'resume_1': "Go developer with Kubernetes and Docker. Built microservices in Go and C++.",
+    'resume_2': "Python developer and Kubernetes operator; machine learning pipelines.",
+    'resume_3': "Java and Spring engineer, some Go. Interested in learning machine tooling.",
+}
+
+
+def make_index():
+    index = SearchIndex()
+    for resume_id, text in RESUMES.items():
+        index.update(resume_id, text)
+    return index
+
+
+def ids(results):
+    return [resume_id for resume_id, _ in results]
+
+
+def test_tokenizer_keeps_skill_symbols():
+    assert tokenize("C++, C# and .NET; Node.js!") == ['c++', 'c#', 'and', '.net', 'node.js']
+
+
+def test_boolean_and_phrase_queries():
+    index = make_index()
+    assert ids(index.search("kubernetes go")) == ['resume_1']
+    assert set(ids(index.search("python OR java"))) == {'resume_2', 'resume_3'}
+    assert ids(index.search('"machine learning"')) == ['resume_2']
+    assert ids(index.search('go -"c++"')) == ['resume_3']
+    assert ids(index.search("(go OR python) AND NOT kubernetes")) == ['resume_3']
+    with pytest.raises(QuerySyntaxError):
+        index.search("(go OR java")
+
+
+def test_bm25_ranks_repeated_terms_higher():
+    index = make_index()
+    results = index.search("go")
+    assert ids(results) == ['resume_1', 'resume_3']
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_incremental_updates_and_compaction():
+    index = make_index()
+    index.update('resume_3', "Rust systems programmer")
+    assert ids(index.search("go")) == ['resume_1']
+    assert ids(index.search("rust")) == ['resume_3']
+
+    index.remove('resume_1')
+    assert index.search("docker") == []
+    for i in range(200):
+        index.update(f'extra_{i}', f"Go engineer number {i}")
+        index.remove(f'extra_{i}')
+    assert len(index) == 2
+    assert ids(index.search('"kubernetes operator"')) == ['resume_2']
+
+
+def test_phrase_query_for_terms_dropped_by_compaction():
+    index = make_index()
+    index.update('resume_2', "Haskell functional programmer")
+    index.update('resume_2', "Python developer")
+    for i in range(70):
+        index.update('resume_1', f"Go developer revision {i}")
+    assert index.search('"haskell functional"') == []
+    assert ids(index.search('"python developer"')) == ['resume_2']
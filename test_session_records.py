@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact per-session resume records
+"""
+
+import math
+
+from dummy_data import get_dummy_data_by_arm
+from session_records import ALL_ARMS_MASK, ARM_NAMES, ResumeRecord
+
+
+def test_text_is_compressed_and_round_trips():
+    text = "Senior backend engineer, Python and Kubernetes. " * 100
+    record = ResumeRecord('Alice', text)
+    assert record.text == text
+    assert len(record._text) < len(text) // 10
+
+    record.text = ''
+    assert record.text == ''
+
+
+def test_completed_mask_tracks_arm_progress():
+    record = ResumeRecord('Bob')
+    assert record.next_arm() == 'SYSTEM_1'
+    assert math.isnan(record.score_row()[0])
+
+    record.record_result('SYSTEM_1', 4.0, True)
+    record.record_result('SYSTEM_2', 3.5, False)
+    assert record.completed_mask == 0b0011
+    assert record.completed_arms == {'SYSTEM_1', 'SYSTEM_2'}
+    assert record.next_arm() == 'SYSTEM_2_PERSONA'
+    assert record.arm_scores == {'SYSTEM_1': 4.0, 'SYSTEM_2': 3.5}
+
+    for arm_name in ARM_NAMES[2:]:
+        record.record_result(arm_name, 3.0)
+    assert record.completed_mask == ALL_ARMS_MASK and record.completed_count == 4
+    assert record.next_arm() is None
+
+
+def test_payload_held_compressed_or_offloaded():
+    result = get_dummy_data_by_arm('SYSTEM_2')
+    record = ResumeRecord('Carol')
+    record.record_result('SYSTEM_2', 3.0, False, payload=result)
+    assert record.result('SYSTEM_2').payload() == result
+
+    record.record_result('SYSTEM_2', 3.0, False)
+    assert record.result('SYSTEM_2').offloaded
+    assert record.result('SYSTEM_2').payload() is None
+
+
+def test_fallback_results_are_flagged():
+    record = ResumeRecord('Dana')
+    record.record_result('SYSTEM_1', 3.0, False, payload=get_dummy_data_by_arm('SYSTEM_1'), fallback=True)
+    record.record_result('SYSTEM_2', 4.0, True)
+    assert record.result('SYSTEM_1').fallback and not record.result('SYSTEM_1').offloaded
+    assert not record.result('SYSTEM_2').fallback
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-level shared cache
+"""
+
+import sys
+import time
+
+from shared_cache import SharedCache
+
+
+def entry_size(value):
+    return sys.getsizeof(value)
+
+
+def test_namespace_budget_evicts_least_recently_used():
+    value = "x" * 100
+    cache = SharedCache(max_bytes=10_000, namespaces={'text': (3 * entry_size(value), None)})
+    for key in 'abc':
+        cache.put('text', key, value)
+    assert cache.get('text', 'a') == value  # 'b' is now the least recently used
+    cache.put('text', 'd', value)
+
+    assert cache.get('text', 'b') is None
+    stats = cache.stats()[0]
+    assert stats['entries'] == 3 and stats['evictions'] == 1
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+
+def test_total_footprint_never_exceeds_ceiling():
+    value = "y" * 1000
+    ceiling = 5 * entry_size(value)
+    cache = SharedCache(max_bytes=ceiling, namespaces={'a': (ceiling, None), 'b': (ceiling, None)})
+    for i in range(10):
+        cache.put('a', f'a{i}', value)
+        cache.put('b', f'b{i}', value)
+        assert cache.total_bytes <= ceiling
+
+    # Oldest entries overall went first, from whichever namespace held them
+    assert cache.get('a', 'a9') == value and cache.get('b', 'b9') == value
+    assert cache.get('a', 'a0') is None
+
+    cache.put('a', 'huge', "z" * ceiling)
+    assert cache.stats()[0]['rejected'] == 1
+
+
+def test_ttl_expiry_and_json_copies():
+    cache = SharedCache(namespaces={'results': (10_000, 0.05)})
+    cache.put_json('results', 'k', {'score': 4})
+    first = cache.get_json('results', 'k')
+    first['score'] = 1
+    assert cache.get_json('results', 'k') == {'score': 4}
+
+    time.sleep(0.06)
+    assert cache.get_json('results', 'k') is None
+    assert cache.stats()[0]['expirations'] == 1
+    assert cache.total_bytes == 0
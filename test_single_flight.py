@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight coalescing of identical in-flight calls
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import FakeResponse
+from resume_analyzer import EvaluationArm
+from single_flight import SingleFlight, prompt_key
+from telemetry import telemetry
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight(max_workers=2)
+    calls = []
+    release = threading.Event()
+
+    def call():
+        calls.append(1)
+        release.wait(5)
+        return {'score': 4}
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flights.do, 'key', call) for _ in range(5)]
+        while len(flights) == 0 or sum(f.running() for f in futures) < 5:
+            time.sleep(0.005)
+        time.sleep(0.02)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0][0] for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert len(flights) == 0
+
+    # Once finished, the next call runs again
+    release.set()
+    assert flights.do('key', call) == ({'score': 4}, False) and len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight(max_workers=1)
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("quota exceeded")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(flights.do, 'key', failing)
+        started.wait(5)
+        others = [pool.submit(flights.do, 'key', failing) for _ in range(2)]
+        for future in [first] + others:
+            with pytest.raises(RuntimeError, match="quota exceeded"):
+                future.result()
+    assert len(flights) == 0
+
+
+def test_last_waiter_leaving_cancels_the_call():
+    flights = SingleFlight(max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    # A running call cannot be stopped; once its only waiter gives up it is forgotten
+    with pytest.raises(TimeoutError):
+        flights.do('busy', lambda: release.wait(5), timeout=0.05)
+    assert len(flights) == 0
+
+    # Queued behind the busy worker; its only waiter gives up, so it never runs
+    with pytest.raises(TimeoutError):
+        flights.do('queued', lambda: ran.append(1), timeout=0.05)
+    assert len(flights) == 0
+
+    # Later callers start a fresh call instead of attaching to the abandoned one
+    release.set()
+    assert flights.do('busy', lambda: 'fresh') == ('fresh', False)
+    assert ran == []
+
+
+class SlowModel:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        time.sleep(0.1)
+        return FakeResponse('{"fit_score_1_to_5": 3}')
+
+
+def test_identical_prompts_from_two_sessions_send_one_request(make_analyzer):
+    model = SlowModel()
+    analyzers = [make_analyzer(model, model_name='flight-test') for _ in range(2)]
+
+    telemetry.clear()
+    prompt = "Evaluate this resume against the job."
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(lambda a: a.generate(prompt, EvaluationArm.SYSTEM_1, 'score'), analyzers))
+
+    assert model.calls == 1 and responses[0] is responses[1]
+    row, = telemetry.summary()
+    assert row['calls'] == 1 and row['coalesced'] == 1
+    assert prompt_key('flight-test', prompt) != prompt_key('flight-lite', prompt)
+    telemetry.clear()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for analyzer call telemetry and its sinks
+"""
+
+import json
+
+from telemetry import Telemetry, percentile
+
+
+def test_summary_percentiles_and_counts():
+    recorder = Telemetry()
+    for latency in [1.0, 2.0, 3.0, 4.0]:
+        recorder.record('SYSTEM_2', 'score', 'gemini-2.5-flash', latency, input_tokens=1000, output_tokens=200)
+    recorder.record('SYSTEM_2', 'rubric', 'gemini-2.5-flash', cache_hit=True)
+    recorder.record('SYSTEM_2', 'fallback', 'gemini-2.5-flash', fallback=True, error='quota')
+
+    (row,) = recorder.summary()
+    assert row['calls'] == 4
+    assert row['p50_s'] == 2.5
+    assert row['p95_s'] == 3.85
+    assert row['input_tokens'] == 4000
+    assert row['cache_hits'] == 1
+    assert row['fallbacks'] == 1
+    assert row['cost_usd'] > 0
+
+
+def test_sinks_write_jsonl_and_prometheus(tmp_path):
+    jsonl_path = tmp_path / 'calls.jsonl'
+    prom_path = tmp_path / 'metrics.prom'
+    recorder = Telemetry(jsonl_path=str(jsonl_path), prom_path=str(prom_path))
+    recorder.record('SYSTEM_1', 'score', 'gemini-2.5-flash', 0.5, input_tokens=10, output_tokens=5)
+
+    lines = jsonl_path.read_text().splitlines()
+    assert json.loads(lines[0])['arm'] == 'SYSTEM_1'
+    metrics = prom_path.read_text()
+    assert 'resume_scorer_llm_latency_seconds{arm="SYSTEM_1",quantile="0.5"} 0.5' in metrics
+    assert 'resume_scorer_llm_output_tokens_total{arm="SYSTEM_1"} 5' in metrics
+
+
+def test_percentile_edge_cases():
+    assert percentile([], 50) == 0.0
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_prometheus_counters_are_running_totals():
+    recorder = Telemetry(max_records=2)
+    for _ in range(5):
+        recorder.record('SYSTEM_1', 'score', 'gemini-2.5-flash', 0.5, input_tokens=10, output_tokens=5)
+
+    (row,) = recorder.summary()
+    assert row['calls'] == 2  # the summary covers the recent window only
+    metrics = recorder.to_prometheus()
+    assert 'resume_scorer_llm_input_tokens_total{arm="SYSTEM_1"} 50' in metrics
+    assert 'resume_scorer_llm_latency_seconds_count{arm="SYSTEM_1"} 5' in metrics
+
+
+def test_prometheus_file_is_rewritten_at_most_once_per_interval(tmp_path):
+    prom_path = tmp_path / 'metrics.prom'
+    recorder = Telemetry(prom_path=str(prom_path), prom_interval_s=60)
+    recorder.record('SYSTEM_1', 'score', 'gemini-2.5-flash', 0.5, output_tokens=5)
+    recorder.record('SYSTEM_1', 'score', 'gemini-2.5-flash', 0.5, output_tokens=5)
+    assert 'resume_scorer_llm_output_tokens_total{arm="SYSTEM_1"} 5' in prom_path.read_text()
+
+    recorder.flush()
+    assert 'resume_scorer_llm_output_tokens_total{arm="SYSTEM_1"} 10' in prom_path.read_text()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for per-phase tracing spans, profiling capture and the JSONL trace sink
+"""
+
+import json
+import time
+
+from dummy_data import get_dummy_data_by_arm
+from job_queue import JobQueue
+from tracing import Tracer, tracer, waterfall_html
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_spans_nest_within_a_trace(tmp_path):
+    sink = tmp_path / 'traces.jsonl'
+    local = Tracer(jsonl_path=str(sink))
+    with local.trace('rerun', owner='session-a'):
+        with local.span('input_panel'):
+            with local.span('extract'):
+                busy(0.002)
+        with local.trace('arm_runner'):  # a section inside a rerun is a span
+            pass
+    with local.span('outside'):
+        pass
+
+    trace, = local.recent('session-a')
+    assert [(s['name'], s['depth']) for s in trace.spans] == [('input_panel', 0), ('extract', 1), ('arm_runner', 0)]
+    assert trace.spans[1]['start_ms'] >= trace.spans[0]['start_ms']
+    assert trace.duration_ms >= trace.spans[0]['duration_ms'] >= 2
+    assert local.recent('session-b') == []
+
+    exported = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert exported[0]['name'] == 'rerun' and len(exported[0]['spans']) == 3
+    assert json.loads(local.to_jsonl('session-a'))['trace_id'] == trace.trace_id
+    assert 'extract' in waterfall_html(trace)
+
+
+def test_disabled_tracer_records_nothing():
+    local = Tracer()
+    with local.trace('rerun', owner='session-a') as trace:
+        with local.span('phase'):
+            pass
+    assert trace is None and len(local.traces) == 0
+
+
+def test_profile_captured_for_one_rerun():
+    local = Tracer(enabled=True)
+    local.request_profile('session-a', 'cprofile')
+    assert local.profile_pending('session-a')
+    with local.trace('rerun', owner='session-a'):
+        busy(0.01)
+    with local.trace('rerun', owner='session-a'):
+        pass
+
+    latest, profiled = local.recent('session-a')
+    assert latest.profile == '' and profiled.profile_mode == 'cprofile'
+    assert 'busy' in profiled.profile
+
+    local.request_profile('session-a', 'sampling')
+    with local.trace('rerun', owner='session-a'):
+        busy(0.05)
+    sampled = local.recent('session-a', 1)[0]
+    assert 'busy (test_tracing.py' in sampled.profile
+
+
+class FakeAnalyzer:
+    def analyze_resume(self, resume_text, job_description, arm, base_result=None):
+        return get_dummy_data_by_arm(arm.name)
+
+
+def test_jobs_are_traced_for_the_submitting_session(monkeypatch):
+    monkeypatch.setattr(tracer, 'enabled', True)
+    tracer.clear()
+    queue = JobQueue(workers=1, analyzer_factory=FakeAnalyzer, store_factory=lambda: None)
+    with tracer.trace('rerun', owner='session-a'):
+        job = queue.submit('resume_1', 'Alice', ['SYSTEM_1', 'SYSTEM_2'], 'resume text', 'job description')
+
+    deadline = time.time() + 5
+    while len(tracer.recent('session-a')) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    job_trace = next(t for t in tracer.recent('session-a') if t.name == 'job Alice')
+    assert job.trace_owner == 'session-a'
+    assert [s['name'] for s in job_trace.spans] == ['ARM A', 'ARM B']
+    tracer.clear()
@@ -0,0 +1,258 @@
+"""Per-phase timing spans for reruns and evaluation jobs, with on-demand profiling
+
+Tracing is off unless TRACING=1 or TRACE_JSONL (a local file path that every
+finished trace is appended to) is set; disabled spans cost about two microseconds.
+A trace is one rerun, fragment rerun or background job. Spans opened while
+it is active, in the same context, are recorded in it with their nesting
+depth; work handed to a thread pool joins the trace when it is run in a copy
+of the submitting context (contextvars.copy_context().run). Traces carry an owner (the browser session), so a session's debug
+panel can show its own reruns and the jobs it submitted.
+"""
+
+import contextvars
+import html
+import io
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+MAX_TRACES = 500
+SAMPLE_INTERVAL_S = 0.005
+PROFILE_ROWS = 25
+PROFILE_MODES = ('cprofile', 'sampling')
+
+_current = contextvars.ContextVar('trace', default=None)
+# Nesting depth per context rather than per trace, so spans running in parallel keep their own
+_depth = contextvars.ContextVar('span_depth', default=0)
+
+
+class Trace:
+    """One traced rerun or job: named spans with offsets relative to the trace start"""
+
+    def __init__(self, name: str, owner: Optional[str] = None):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.owner = owner
+        self.ts = time.time()
+        self.start = time.perf_counter()
+        self.duration_ms = 0.0
+        self.spans: List[Dict] = []
+        self.profile_mode: Optional[str] = None
+        self.profile = ''
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'owner': self.owner,
+            'ts': self.ts,
+            'duration_ms': round(self.duration_ms, 3),
+            'spans': self.spans,
+            'profile_mode': self.profile_mode,
+        }
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer; cheaper than cProfile on long reruns"""
+
+    def __init__(self, thread_id: int, interval_s: float = SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.own = Counter()
+        self.total = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='trace-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[self._where(frame)] += 1
+            seen = set()
+            while frame is not None:
+                seen.add(self._where(frame))
+                frame = frame.f_back
+            self.total.update(seen)
+
+    @staticmethod
+    def _where(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def report(self, rows: int = PROFILE_ROWS) -> str:
+        if not self.samples:
+            return "No samples (the traced section was shorter than the sampling interval)."
+        lines = [f"{self.samples} samples every {self.interval_s * 1000:.0f} ms",
+                 f"{'own %':>7} {'total %':>8}  function"]
+        for where, count in self.total.most_common(rows):
+            lines.append(f"{self.own[where] / self.samples:7.1%} {count / self.samples:8.1%}  {where}")
+        return '\n'.join(lines)
+
+
+class Tracer:
+    """Process-wide recorder of traces, kept in memory and optionally appended to a JSONL file"""
+
+    def __init__(self, enabled: bool = False, jsonl_path: Optional[str] = None, max_traces: int = MAX_TRACES):
+        self.enabled = enabled or bool(jsonl_path)
+        self.jsonl_path = jsonl_path
+        self.traces = deque(maxlen=max_traces)
+        self._profile_requests: Dict[Optional[str], str] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, name: str, owner: Optional[str] = None):
+        """Trace a rerun or job; inside an active trace this is just a span"""
+        if not self.enabled:
+            yield None
+            return
+        if _current.get() is not None:
+            with self.span(name):
+                yield _current.get()
+            return
+
+        trace = Trace(name, owner)
+        with self._lock:
+            mode = self._profile_requests.pop(owner, None)
+        profiler = self._start_profiler(mode)
+        token = _current.set(trace)
+        depth_token = _depth.set(0)
+        try:
+            yield trace
+        finally:
+            _depth.reset(depth_token)
+            _current.reset(token)
+            trace.duration_ms = (time.perf_counter() - trace.start) * 1000
+            if profiler is not None:
+                trace.profile_mode = mode
+                trace.profile = self._stop_profiler(profiler)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str):
+        """Time one phase of the active trace (a no-op outside a trace)"""
+        trace = _current.get()
+        if trace is None:
+            yield
+            return
+        start = time.perf_counter()
+        depth = _depth.get()
+        token = _depth.set(depth + 1)
+        try:
+            yield
+        finally:
+            _depth.reset(token)
+            end = time.perf_counter()
+            trace.spans.append({
+                'name': name,
+                'start_ms': round((start - trace.start) * 1000, 3),
+                'duration_ms': round((end - start) * 1000, 3),
+                'depth': depth,
+            })
+
+    def current_owner(self) -> Optional[str]:
+        """Owner of the trace active in this context, handed to work started from it"""
+        trace = _current.get()
+        return trace.owner if trace is not None else None
+
+    def request_profile(self, owner: Optional[str], mode: str = 'cprofile'):
+        """Profile the next trace started by this owner"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        with self._lock:
+            self._profile_requests[owner] = mode
+
+    def profile_pending(self, owner: Optional[str]) -> bool:
+        with self._lock:
+            return owner in self._profile_requests
+
+    @staticmethod
+    def _start_profiler(mode: Optional[str]):
+        if mode == 'cprofile':
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if mode == 'sampling':
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            return sampler
+        return None
+
+    @staticmethod
+    def _stop_profiler(profiler) -> str:
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+            return profiler.report()
+        import pstats
+
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_ROWS)
+        return out.getvalue()
+
+    def _finish(self, trace: Trace):
+        # Spans are appended as they close; order them as a waterfall
+        trace.spans.sort(key=lambda span: (span['start_ms'], span['depth']))
+        with self._lock:
+            self.traces.append(trace)
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(trace.to_dict()) + '\n')
+
+    def recent(self, owner: Optional[str] = None, limit: int = 10) -> List[Trace]:
+        """The owner's most recent traces, newest first"""
+        with self._lock:
+            traces = [t for t in self.traces if owner is None or t.owner == owner]
+        return traces[::-1][:limit]
+
+    def to_jsonl(self, owner: Optional[str] = None) -> str:
+        return ''.join(json.dumps(t.to_dict()) + '\n' for t in reversed(self.recent(owner, len(self.traces))))
+
+    def clear(self):
+        with self._lock:
+            self.traces.clear()
+            self._profile_requests.clear()
+
+
+def waterfall_html(trace: Trace) -> str:
+    """One trace as rows of offset bars, one per span"""
+    total = max(trace.duration_ms, 0.001)
+    rows = [
+        f'<div style="font-weight:bold;margin-top:0.5rem">{html.escape(trace.name)} · {trace.duration_ms:.1f} ms'
+        f' · {time.strftime("%H:%M:%S", time.localtime(trace.ts))}</div>'
+    ]
+    for span in trace.spans:
+        left = span['start_ms'] / total * 100
+        width = max(span['duration_ms'] / total * 100, 0.5)
+        rows.append(
+            '<div style="display:flex;align-items:center;font-size:0.75rem;line-height:1.2rem">'
+            f'<div style="width:40%;padding-left:{span["depth"] * 0.75}rem;overflow:hidden;white-space:nowrap">'
+            f'{html.escape(span["name"])} {span["duration_ms"]:.1f} ms</div>'
+            '<div style="width:60%;position:relative;height:0.8rem">'
+            f'<div style="position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:100%;'
+            'background:#4ecdc4;border-radius:2px"></div></div></div>'
+        )
+    return '\n'.join(rows)
+
+
+tracer = Tracer(
+    enabled=os.getenv('TRACING') == '1',
+    jsonl_path=os.getenv('TRACE_JSONL') or None,
+)